@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class PulseConfig(AppConfig):
+    name = 'Pulse'
+
+    def ready(self):
+        from . import checks  # noqa: F401
@@ -0,0 +1,21 @@
+from django.core.checks import Tags, Warning, register
+
+from .etags import shared_cache
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if shared_cache():
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process.",
+            hint=(
+                "ETag version counters and the revoked-token cache are kept in "
+                "it, so with more than one worker clients get stale 304 "
+                "responses and revocations reach other workers only on their "
+                "periodic rebuild. Set DJANGO_CACHE_URL to a Redis server."
+            ),
+            id="pulse.W001",
+        )
+    ]
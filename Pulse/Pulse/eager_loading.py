@@ -0,0 +1,153 @@
+"""
+Serializer-driven eager loading for DRF viewsets.
+
+Walks the readable fields of a serializer and works out which relations
+have to be joined (``select_related``) or batch loaded (``prefetch_related``)
+so that rendering a page costs a fixed number of queries instead of 1 + N.
+"""
+from dataclasses import dataclass, field
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+@dataclass
+class EagerLoadingPlan:
+    select_related: set = field(default_factory=set)
+    prefetch_related: set = field(default_factory=set)
+    annotations: dict = field(default_factory=dict)
+
+    def apply(self, queryset):
+        # A path that has to be prefetched makes joining its prefix redundant
+        select = {
+            path
+            for path in self.select_related
+            if not any(p == path or p.startswith(path + "__") for p in self.prefetch_related)
+        }
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*sorted(self.prefetch_related))
+        if self.annotations:
+            queryset = queryset.annotate(**self.annotations)
+        return queryset
+
+
+def _resolve(model, attrs):
+    """
+    Follow ``attrs`` through ``model`` relations.
+
+    Returns ``(kind, related_model)`` where kind is ``"select"`` when every hop
+    is single-valued, ``"prefetch"`` when any hop is multi-valued, or ``None``
+    when the path does not cross a relation at all.
+    """
+    kind = None
+    for attr in attrs:
+        if model is None:
+            return kind, None
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return kind, None
+        if not model_field.is_relation:
+            return kind, None
+        if model_field.many_to_many or model_field.one_to_many:
+            kind = "prefetch"
+        elif kind is None:
+            kind = "select"
+        model = model_field.related_model
+    return kind, model
+
+
+def _add(plan, kind, path):
+    if kind == "select":
+        plan.select_related.add(path)
+    elif kind == "prefetch":
+        plan.prefetch_related.add(path)
+
+
+def build_plan(serializer, model=None, prefix="", plan=None):
+    """
+    Build an :class:`EagerLoadingPlan` for a (bound) serializer instance.
+
+    ``Meta.eager_loading`` may add fixed ``select_related`` /
+    ``prefetch_related`` paths, and ``Meta.eager_loading_annotations`` maps
+    field names to callables returning the expression to annotate them with.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    if plan is None:
+        plan = EagerLoadingPlan()
+    if model is None:
+        model = getattr(getattr(serializer, "Meta", None), "model", None)
+    if model is None:
+        return plan
+
+    meta = getattr(serializer, "Meta", None)
+    extra = getattr(meta, "eager_loading", {})
+    for path in extra.get("select_related", ()):
+        plan.select_related.add(prefix + path)
+    for path in extra.get("prefetch_related", ()):
+        plan.prefetch_related.add(prefix + path)
+
+    # Per-field annotations, only added when the field is rendered
+    if not prefix:
+        annotations = getattr(meta, "eager_loading_annotations", {})
+        for name in annotations.keys() & serializer.fields.keys():
+            plan.annotations[name] = annotations[name]()
+
+    for serializer_field in serializer.fields.values():
+        if serializer_field.write_only:
+            continue
+
+        if serializer_field.source == "*":
+            if isinstance(serializer_field, serializers.BaseSerializer):
+                build_plan(serializer_field, model, prefix, plan)
+            continue
+
+        attrs = serializer_field.source_attrs
+        path = prefix + "__".join(attrs)
+
+        if isinstance(serializer_field, serializers.BaseSerializer):
+            kind, related_model = _resolve(model, attrs)
+            if isinstance(serializer_field, serializers.ListSerializer):
+                kind = "prefetch" if kind else None
+            _add(plan, kind, path)
+            if kind:
+                build_plan(serializer_field, related_model, path + "__", plan)
+            continue
+
+        if isinstance(serializer_field, ManyRelatedField):
+            kind, _ = _resolve(model, attrs)
+            _add(plan, "prefetch" if kind else None, path)
+            continue
+
+        if isinstance(serializer_field, RelatedField):
+            # Hyperlinks and primary keys on a direct foreign key only need
+            # the ``<name>_id`` column that is already on the row.
+            if len(attrs) == 1 and serializer_field.use_pk_only_optimization():
+                continue
+            kind, _ = _resolve(model, attrs)
+            _add(plan, kind, path)
+            continue
+
+        # Plain fields sourced across a relation, e.g. ``source="user.email"``
+        if len(attrs) > 1:
+            kind, _ = _resolve(model, attrs[:-1])
+            _add(plan, kind, prefix + "__".join(attrs[:-1]))
+
+    return plan
+
+
+class EagerLoadingMixin:
+    """
+    Applies the eager loading plan of the view's serializer to ``get_queryset``.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, "request", None) is None:
+            return queryset
+        plan = build_plan(self.get_serializer(), queryset.model)
+        return plan.apply(queryset)
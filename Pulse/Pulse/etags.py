@@ -0,0 +1,171 @@
+"""
+Version counters and conditional GET for DRF viewsets.
+
+Every tracked model has a counter in the Django cache that is bumped on
+save, delete and many-to-many change. A viewset's ETag is derived from the
+counters of the models its responses depend on, so ``If-None-Match`` can be
+answered with ``304 Not Modified`` before any query or serializer runs.
+
+Counters live in the configured cache; with several worker processes it has
+to be a shared backend (Redis, Memcached, database) rather than locmem.
+Without counters (``DummyCache``) responses carry no ETag and are not
+cached. Writes that bypass signals (``update()``, ``bulk_update()``) have to
+call ``bump_version`` themselves.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import rendered_models
+
+VERSION_KEY = "pulse:version:{}"
+RESPONSE_KEY = "pulse:response:{}"
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def shared_cache():
+    """
+    Whether the default cache is seen by every worker process, which the
+    version counters need to be consistent between them.
+    """
+    return settings.CACHES["default"]["BACKEND"] not in LOCAL_CACHE_BACKENDS
+
+
+def _version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def get_versions(models):
+    """
+    Current counter per model; missing counters start from the clock so a
+    restarted cache never repeats a version an old ETag was built from.
+    """
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _bump(models):
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_version(*models):
+    """
+    Bump now and again once the surrounding transaction commits, so a read
+    that raced the write and cached the old rows under the intermediate
+    version is not served after the commit.
+    """
+    _bump(models)
+    transaction.on_commit(lambda: _bump(models))
+
+
+def track_versions(*models):
+    """
+    Bump the counter of each model on save, delete and M2M change.
+    """
+    for model in models:
+        def bump(sender, _model=model, **kwargs):
+            bump_version(_model)
+
+        post_save.connect(bump, sender=model, weak=False)
+        post_delete.connect(bump, sender=model, weak=False)
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(bump, sender=field.remote_field.through, weak=False)
+
+
+def _matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ConditionalGetMixin:
+    """
+    Strong ETags and ``304 Not Modified`` for ``list`` and ``retrieve``.
+
+    ``etag_models`` lists every model whose changes can alter the response;
+    the models of serializers nested through ``?expand=`` are added to it.
+    When ``settings.RESPONSE_CACHE_TIMEOUT`` is set, list pages are also
+    cached under their ETag and served without touching the database.
+    """
+
+    etag_models = ()
+
+    def get_etag_models(self):
+        models = set(self.etag_models) | rendered_models(self.get_serializer())
+        return sorted(models, key=lambda model: model._meta.label_lower)
+
+    def get_etag(self, request):
+        """
+        ETag of the response to ``request``, or None when the cache keeps no
+        counters (``DummyCache``) and changes could not be told apart.
+        """
+        versions = get_versions(self.get_etag_models())
+        if None in versions:
+            return None
+        key = json.dumps([
+            versions,
+            request.build_absolute_uri(),
+            request.headers.get("Accept", ""),
+        ])
+        return '"{}"'.format(hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, request, args, kwargs, cacheable=True)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, args, kwargs)
+
+    def _conditional(self, handler, request, args, kwargs, cacheable=False):
+        if not self.etag_models:
+            return handler(request, *args, **kwargs)
+
+        etag = self.get_etag(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        if _matches(request.headers.get("If-None-Match"), etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response["ETag"] = etag
+            return response
+
+        timeout = getattr(settings, "RESPONSE_CACHE_TIMEOUT", None) if cacheable else None
+        if timeout:
+            cached = cache.get(RESPONSE_KEY.format(etag))
+            if cached is not None:
+                response = Response(json.loads(cached))
+                response["ETag"] = etag
+                return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+            if timeout:
+                cache.set(
+                    RESPONSE_KEY.format(etag),
+                    json.dumps(response.data, cls=JSONEncoder),
+                    timeout,
+                )
+        return response
@@ -0,0 +1,425 @@
+"""
+History helpers shared by the Pulse apps.
+
+Besides the indexed ``HistoricalRecords``, this holds the retention policies
+run by ``manage.py prune_history``:
+
+* ``compact`` deletes updates that recorded no change (saves that only
+  touched excluded fields, or nothing at all), keeping the first row of
+  every run of identical rows;
+* ``archive`` moves rows older than the policy's ``days`` to a gzipped
+  NDJSON file and deletes them, always keeping the newest ``keep`` rows of
+  every object so its current state stays on record.
+
+Both work in batches of bounded size and yield the number of rows removed
+per batch, each batch in its own transaction.
+
+``HistoryDiffMixin`` adds ``?diff=true`` to the history endpoints and
+``AsOfMixin`` ``?as_of=`` to the list endpoints of history-tracked models.
+"""
+import gzip
+import hashlib
+import json
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Q, Subquery, Window, prefetch_related_objects
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import now
+from django_filters.filterset import filterset_factory
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from simple_history.models import HistoricalRecords
+from simple_history.utils import get_m2m_reverse_field_name
+
+from Pulse.eager_loading import build_plan
+from Pulse.etags import bump_version, get_versions
+
+BATCH_SIZE = 1000
+DEFAULT_POLICY = {"days": 365, "keep": 1}
+AS_OF_KEY = "pulse:as-of:{}"
+META_FIELDS = (
+    "history_id", "history_date", "history_type", "history_user", "history_change_reason",
+)
+
+RetentionPolicy = namedtuple("RetentionPolicy", ["model", "days", "keep"])
+
+
+class IndexedHistoricalRecords(HistoricalRecords):
+    """
+    ``HistoricalRecords`` whose table is also indexed on
+    ``(id, history_date, history_id)``, the key the history endpoints filter
+    and order by, so one object's history is a range scan instead of a sort.
+    """
+
+    def get_meta_options(self, model):
+        meta_fields = super().get_meta_options(model)
+        meta_fields["indexes"] = (
+            *meta_fields.get("indexes", ()),
+            models.Index(fields=(model._meta.pk.attname, "history_date", "history_id")),
+        )
+        return meta_fields
+
+
+def _installed(label):
+    try:
+        apps.get_app_config(label.partition(".")[0])
+    except LookupError:
+        return False
+    return True
+
+
+def retention_policies(labels=None):
+    """
+    The policies of ``settings.HISTORY_RETENTION`` (``{"app.Model": {"days",
+    "keep"}}``), restricted to ``labels`` when given. ``days=None`` keeps
+    every row; compaction still applies. Configured models of apps that
+    are not installed are skipped unless named in ``labels``.
+    """
+    configured = getattr(settings, "HISTORY_RETENTION", {})
+    policies = []
+    for label in labels or configured:
+        if not labels and not _installed(label):
+            continue
+        options = {**DEFAULT_POLICY, **configured.get(label, {})}
+        model = apps.get_model(label)
+        if not hasattr(model, "history"):
+            raise LookupError(f"{label} does not track history.")
+        policies.append(RetentionPolicy(model, options["days"], max(1, options["keep"])))
+    return policies
+
+
+def _delete(history_model, ids):
+    # Removing history can change past snapshots, see AsOfMixin
+    with transaction.atomic():
+        history_model._default_manager.filter(history_id__in=ids).delete()
+        bump_version(history_model)
+
+
+def compact(history_model, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Remove no-op updates from ``history_model``, ``batch_size`` objects at a
+    time. Rows with a change reason are kept.
+    """
+    pk = history_model.instance_type._meta.pk.attname
+    fields = [field.attname for field in history_model.tracked_fields]
+    rows = history_model._default_manager.order_by(pk)
+
+    last = None
+    while True:
+        objects = rows.values_list(pk, flat=True).distinct()
+        if last is not None:
+            objects = objects.filter(**{f"{pk}__gt": last})
+        objects = list(objects[:batch_size])
+        if not objects:
+            return
+        last = objects[-1]
+
+        redundant, previous = [], None
+        for history_id, history_type, reason, *values in (
+            rows.filter(**{f"{pk}__in": objects})
+            .order_by(pk, "history_date", "history_id")
+            .values_list("history_id", "history_type", "history_change_reason", *fields)
+        ):
+            if history_type == "~" and not reason and values == previous:
+                redundant.append(history_id)
+            previous = values
+
+        for start in range(0, len(redundant), batch_size):
+            ids = redundant[start:start + batch_size]
+            if not dry_run:
+                _delete(history_model, ids)
+            yield len(ids)
+
+
+def archive_candidates(policy):
+    """
+    Rows of ``policy.model``'s history older than ``policy.days`` that are
+    not among the newest ``policy.keep`` rows of their object.
+    """
+    history_model = policy.model.history.model
+    pk = policy.model._meta.pk.attname
+    manager = history_model._default_manager
+    newest = (
+        manager.filter(**{pk: OuterRef(pk)})
+        .order_by("-history_date", "-history_id")[policy.keep - 1:policy.keep]
+    )
+    return (
+        manager.filter(history_date__lt=now() - timedelta(days=policy.days))
+        .alias(
+            kept_date=Subquery(newest.values("history_date")),
+            kept_id=Subquery(newest.values("history_id")),
+        )
+        .filter(
+            Q(history_date__lt=F("kept_date"))
+            | Q(history_date=F("kept_date"), history_id__lt=F("kept_id"))
+        )
+    )
+
+
+def archive_path(history_model, directory, started):
+    return Path(directory) / (
+        f"{history_model._meta.db_table}-{started:%Y%m%dT%H%M%S}.ndjson.gz"
+    )
+
+
+def archive(policy, directory, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Move the ``archive_candidates`` of ``policy`` to a gzipped NDJSON file
+    in ``directory``, oldest first. Every batch is appended as a complete
+    gzip member before its rows are deleted, so an interrupted run loses
+    nothing and the file stays readable.
+    """
+    if policy.days is None:
+        return
+    history_model = policy.model.history.model
+    candidates = archive_candidates(policy).order_by("history_id")
+    if dry_run:
+        count = candidates.count()
+        if count:
+            yield count
+        return
+
+    path = archive_path(history_model, directory, now())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    while batch := list(candidates.values()[:batch_size]):
+        with gzip.open(path, "at", encoding="utf-8") as archive_file:
+            for row in batch:
+                archive_file.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+        _delete(history_model, [row["history_id"] for row in batch])
+        yield len(batch)
+
+
+def previous_record(queryset, record):
+    """
+    The record of ``queryset`` right before ``record``, or None.
+    """
+    return (
+        queryset.filter(
+            Q(history_date__lt=record.history_date)
+            | Q(history_date=record.history_date, history_id__lt=record.history_id)
+        )
+        .order_by("-history_date", "-history_id")
+        .first()
+    )
+
+
+def m2m_snapshots(records):
+    """
+    ``{history_id: {field: sorted ids}}`` for the many-to-many fields the
+    history model tracks, with one query per field; empty when it tracks
+    none.
+    """
+    if not records:
+        return {}
+    fields = getattr(type(records[0]), "_history_m2m_fields", ())
+    if not fields:
+        return {}
+    prefetch_related_objects(records, *(field.name for field in fields))
+    return {
+        record.history_id: {
+            field.name: sorted(
+                getattr(row, f"{get_m2m_reverse_field_name(field)}_id")
+                for row in getattr(record, field.name).all()
+            )
+            for field in fields
+        }
+        for record in records
+    }
+
+
+def diff_records(records, serializer, previous=None):
+    """
+    Render ``records`` (one object's history, any order) as their
+    ``META_FIELDS`` plus ``changes``, ``{field: {"old", "new"}}`` for every
+    field that differs from the record before it. ``previous`` is the record
+    preceding the oldest of ``records``; without one, the oldest record
+    lists all its fields as changed from None.
+
+    Records are rendered with ``serializer``, so the diff covers the same
+    fields and representation as a full snapshot.
+    """
+    chronological = sorted(records, key=lambda record: (record.history_date, record.history_id))
+    if previous is not None:
+        chronological.insert(0, previous)
+    m2m = m2m_snapshots(chronological)
+
+    diffs, before = {}, None
+    for record in chronological:
+        data = serializer.to_representation(record)
+        data.update(m2m.get(record.history_id, {}))
+        meta = {field: data.pop(field) for field in META_FIELDS if field in data}
+        meta["changes"] = {
+            field: {"old": None if before is None else before.get(field), "new": value}
+            for field, value in data.items()
+            if before is None or before.get(field) != value
+        }
+        diffs[record.history_id] = meta
+        before = data
+    return [diffs[record.history_id] for record in records]
+
+
+class HistoryDiffMixin:
+    """
+    ``?diff=true`` on a history list: every record carries only the fields
+    that changed since the record before it, instead of a full snapshot.
+    The page and the record preceding it are read with one query each.
+    """
+
+    diff_query_param = "diff"
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.diff_query_param, "").lower() not in ("1", "true"):
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.get_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        records = list(queryset) if page is None else page
+
+        previous = None
+        if page is not None and records:
+            oldest = min(records, key=lambda record: (record.history_date, record.history_id))
+            previous = previous_record(queryset, oldest)
+        data = diff_records(records, serializer, previous)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+def parse_as_of(value):
+    """
+    An aware datetime from an ISO 8601 datetime, or a date meaning the end
+    of that day. Naive values are in the current time zone.
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time.max)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def as_of_queryset(model, timestamp):
+    """
+    The history rows of ``model`` that were current at ``timestamp``: the
+    latest row of every object at or before it, unless that row records
+    its deletion. One query, ranking rows per object with a window
+    function over the ``(id, history_date, history_id)`` index.
+    """
+    manager = model.history.model._default_manager
+    latest = (
+        manager.filter(history_date__lte=timestamp)
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=F(model._meta.pk.attname),
+                order_by=[F("history_date").desc(), F("history_id").desc()],
+            )
+        )
+        .filter(rank=1)
+        .values("history_id")
+    )
+    return manager.filter(history_id__in=latest).exclude(history_type="-")
+
+
+class AsOfMixin:
+    """
+    ``?as_of=<date or datetime>`` on ``list``: the objects as they were at
+    that moment, rendered from their history rows with
+    ``as_of_serializer_class``.
+
+    The view's ``filterset_fields`` that exist on the history model, its
+    search and its ordering apply as usual. Filters the history rows cannot
+    answer, such as many-to-many fields whose changes are not recorded, are
+    rejected with a 400 rather than ignored. Snapshots of past moments only
+    change when history is pruned, so their pages are cached for
+    ``settings.AS_OF_CACHE_TIMEOUT`` seconds under the history model's
+    version counter.
+    """
+
+    as_of_query_param = "as_of"
+    as_of_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        value = request.query_params.get(self.as_of_query_param)
+        if value is None:
+            return super().list(request, *args, **kwargs)
+        try:
+            as_of = parse_as_of(value)
+        except ValueError:
+            raise ValidationError(
+                {self.as_of_query_param: "Expected an ISO 8601 date or datetime."}
+            )
+
+        history_model = self.queryset.model.history.model
+        # Before the cache, so a request with filters that cannot be applied
+        # is never answered
+        queryset = self.filter_as_of(request, as_of_queryset(self.queryset.model, as_of))
+        timeout = getattr(settings, "AS_OF_CACHE_TIMEOUT", 0) if as_of < now() else 0
+        key = None
+        if timeout:
+            key = AS_OF_KEY.format(hashlib.sha1(json.dumps([
+                get_versions([history_model]), request.build_absolute_uri(),
+            ]).encode("utf-8")).hexdigest())
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+
+        context = self.get_serializer_context()
+        plan = build_plan(self.as_of_serializer_class(context=context), history_model)
+        queryset = plan.apply(queryset)
+        page = self.paginate_queryset(queryset)
+        data = self.as_of_serializer_class(
+            queryset if page is None else page, many=True, context=context
+        ).data
+        response = Response(data) if page is None else self.get_paginated_response(data)
+        if key is not None:
+            cache.set(key, response.data, timeout)
+        return response
+
+    def filter_as_of(self, request, queryset):
+        history_model = queryset.model
+        fields, unsupported = [], {}
+        for name in getattr(self, "filterset_fields", ()):
+            if any(field.name == name and field.concrete and not field.many_to_many
+                   for field in history_model._meta.get_fields()):
+                fields.append(name)
+            elif name in request.query_params:
+                unsupported[name] = f"Cannot be combined with {self.as_of_query_param}."
+        if unsupported:
+            raise ValidationError(unsupported)
+        if fields:
+            filterset = filterset_factory(history_model, fields=fields)(
+                request.query_params, queryset=queryset, request=request
+            )
+            if not filterset.is_valid():
+                raise ValidationError(filterset.errors)
+            queryset = filterset.qs
+
+        for backend in self.filter_backends:
+            if issubclass(backend, filters.SearchFilter):
+                try:
+                    queryset = backend().filter_queryset(request, queryset, self)
+                except FieldError:
+                    raise ValidationError({
+                        backend.search_param: f"Cannot be combined with {self.as_of_query_param}."
+                    })
+
+        queryset = queryset.order_by(*getattr(self, "keyset_ordering", ("pk",)))
+        if filters.OrderingFilter in self.filter_backends:
+            queryset = filters.OrderingFilter().filter_queryset(request, queryset, self)
+        return queryset
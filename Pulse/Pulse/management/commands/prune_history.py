@@ -0,0 +1,89 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from Pulse import history
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply settings.HISTORY_RETENTION to the history tables: remove no-op "
+        "saves, then move rows past their retention period to gzipped NDJSON "
+        "archives. Every batch commits on its own, so the command can be "
+        "stopped and re-run at any time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            metavar="app_label.Model",
+            help="Only prune these models (default: every configured policy)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=history.BATCH_SIZE,
+            help="Rows (or objects, when compacting) handled per transaction",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop each model after this many batches, to bound the run time",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=None,
+            help="Directory for the archive files (default: settings.HISTORY_ARCHIVE_DIR)",
+        )
+        parser.add_argument(
+            "--no-compact",
+            action="store_true",
+            help="Only archive; keep no-op saves",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be removed without changing anything",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        try:
+            policies = history.retention_policies(options["models"])
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        directory = options["archive_dir"] or settings.HISTORY_ARCHIVE_DIR
+        suffix = " (dry run)" if options["dry_run"] else ""
+        for policy in policies:
+            started = time.monotonic()
+            history_model = policy.model.history.model
+            compacted = 0
+            if not options["no_compact"]:
+                compacted = self._run(
+                    history.compact(history_model, options["batch_size"], options["dry_run"]),
+                    options["max_batches"],
+                )
+            archived = self._run(
+                history.archive(policy, directory, options["batch_size"], options["dry_run"]),
+                options["max_batches"],
+            )
+            self.stdout.write(
+                f"{policy.model._meta.label}: {compacted} no-op row(s) removed, "
+                f"{archived} row(s) archived in {time.monotonic() - started:.2f}s{suffix}"
+            )
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    @staticmethod
+    def _run(batches, max_batches):
+        total = 0
+        for done, count in enumerate(batches, 1):
+            total += count
+            if max_batches is not None and done >= max_batches:
+                batches.close()
+                break
+        return total
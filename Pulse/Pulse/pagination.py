@@ -0,0 +1,243 @@
+"""
+Pagination classes shared by the Pulse apps.
+"""
+import base64
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination with an opt-in keyset (cursor) mode.
+
+    Requests are paginated with ``limit``/``offset`` as before unless they
+    pass ``?pagination=cursor`` or a ``cursor``. In cursor mode the page is
+    fetched with a ``WHERE (key) > (last seen key)`` condition instead of an
+    ``OFFSET``, so deep pages cost the same as the first one and no
+    ``COUNT(*)`` is issued.
+
+    The key is the ordering requested through ``OrderingFilter``, or the
+    view's ``keyset_ordering``, followed by the primary key as tie-breaker.
+    NULLs always sort before any value so the key stays totally ordered.
+    """
+
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    keyset_ordering = ("pk",)
+
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.ordering = self.get_keyset_ordering(request, queryset, view)
+        self.nullable = [self._is_nullable(queryset.model, field) for field, _ in self.ordering]
+        self.fields = [self._field(queryset.model, field) for field, _ in self.ordering]
+        position, self.reverse = self.decode_cursor(request)
+
+        ordering = [(field, desc != self.reverse) for field, desc in self.ordering]
+        queryset = queryset.order_by(
+            *(
+                F(field).desc(nulls_last=True) if desc else F(field).asc(nulls_first=True)
+                for field, desc in ordering
+            )
+        )
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        rows = list(queryset[: self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[: self.limit]
+        if self.reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not self.reverse else position is not None
+        self.has_previous = position is not None if not self.reverse else has_more
+        self.first_position = self._position(rows[0]) if rows else position
+        self.last_position = self._position(rows[-1]) if rows else position
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or self.last_position is None:
+            return None
+        return self._link(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self._link(self.first_position, reverse=True)
+
+    def get_html_context(self):
+        if not self.keyset:
+            return super().get_html_context()
+        return {
+            "previous_url": self.get_previous_link(),
+            "next_url": self.get_next_link(),
+        }
+
+    def get_keyset_ordering(self, request, queryset, view):
+        """
+        Return the key as a list of ``(field, descending)`` pairs.
+        """
+        ordering = None
+        for backend in getattr(view, "filter_backends", []):
+            if hasattr(backend, "get_ordering"):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, "keyset_ordering", self.keyset_ordering)
+
+        pk_name = queryset.model._meta.pk.name
+        key = []
+        for item in ordering:
+            field = item.lstrip("-")
+            key.append((pk_name if field == "pk" else field, item.startswith("-")))
+        if not any(field == pk_name for field, _ in key):
+            key.append((pk_name, key[-1][1] if key else False))
+        return key
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            position = payload["p"]
+            reverse = bool(payload.get("r", False))
+            if (
+                payload.get("o") != self._ordering_token()
+                or not isinstance(position, list)
+                or len(position) != len(self.ordering)
+            ):
+                raise ValueError("Cursor does not match the ordering")
+            position = [
+                self._to_python(field, value) for field, value in zip(self.fields, position)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        payload = {"o": self._ordering_token(), "p": position}
+        if reverse:
+            payload["r"] = 1
+        data = json.dumps(payload, separators=(",", ":"), default=str)
+        return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+    def _link(self, position, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position, reverse)
+        )
+
+    def _ordering_token(self):
+        return ",".join(("-" if desc else "") + field for field, desc in self.ordering)
+
+    def _position(self, obj):
+        values = []
+        for field, _ in self.ordering:
+            value = obj
+            for attr in field.split("__"):
+                value = getattr(value, attr, None)
+                if value is None:
+                    break
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return values
+
+    def _after(self, ordering, position):
+        """
+        Build ``(k1, k2, ...) > (v1, v2, ...)`` for the given directions.
+        """
+        terms = []
+        equal = []
+        for (field, desc), value, nullable in zip(ordering, position, self.nullable):
+            if value is None:
+                beyond = Q(pk__in=[]) if desc else Q(**{f"{field}__isnull": False})
+                same = Q(**{f"{field}__isnull": True})
+            else:
+                beyond = Q(**{f"{field}__{'lt' if desc else 'gt'}": value})
+                if desc and nullable:
+                    beyond |= Q(**{f"{field}__isnull": True})
+                same = Q(**{field: value})
+            terms.append(reduce(and_, equal + [beyond]))
+            equal.append(same)
+        condition = reduce(or_, terms)
+
+        # Redundant bound on the leading column lets the database seek into
+        # an index instead of evaluating the OR for every row.
+        (field, desc), value = ordering[0], position[0]
+        if value is not None and not self.nullable[0]:
+            condition &= Q(**{f"{field}__{'lte' if desc else 'gte'}": value})
+        return condition
+
+    @staticmethod
+    def _to_python(field, value):
+        if isinstance(value, (list, dict)):
+            raise ValueError("Cursor values must be scalars")
+        if value is None or field is None:
+            return value
+        return field.to_python(value)
+
+    @staticmethod
+    def _field(model, path):
+        """
+        The model field at the end of ``path``, or None for annotations and
+        reverse relations, whose values are used as they are.
+        """
+        field = None
+        for attr in path.split("__"):
+            if model is None:
+                return None
+            try:
+                field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model
+        return field if hasattr(field, "to_python") else None
+
+    @staticmethod
+    def _is_nullable(model, path):
+        field = None
+        for attr in path.split("__"):
+            if model is None:
+                return True
+            try:
+                field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return True
+            if field.is_relation and (field.null or not field.concrete):
+                return True
+            model = field.related_model
+        return field is None or field.null
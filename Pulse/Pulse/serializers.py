@@ -0,0 +1,136 @@
+"""
+Serializer helpers shared by the Pulse apps.
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import (
+    HyperlinkedIdentityField,
+    HyperlinkedRelatedField,
+    ManyRelatedField,
+)
+
+
+class DynamicFieldsMixin:
+    """
+    Lets read requests shape the top-level representation:
+
+    * ``?fields=title,status`` renders only the named fields.
+    * ``?repr=compact`` renders relations as primary keys instead of
+      hyperlinks, ``url`` as ``id``, and drops the other identity links
+      (``history``, ``task_comments``...), skipping ``reverse()`` entirely.
+    * ``?expand=supervisor,supervisor.user`` embeds the relations listed in
+      ``Meta.expandable_fields`` (name to serializer class or dotted path)
+      instead of linking them, at most ``settings.EXPAND_MAX_DEPTH`` deep.
+
+    Fields that are not rendered are not part of ``fields`` either, so the
+    eager loading plan built from the serializer skips their prefetches,
+    and expanded relations are joined or prefetched once per page.
+    """
+
+    fields_query_param = "fields"
+    repr_query_param = "repr"
+    expand_query_param = "expand"
+
+    def __init__(self, *args, expand=None, **kwargs):
+        self._expand = expand
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self._expand:
+            return self._expanded(fields, self._expand)
+
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS or not self._is_top_level():
+            return fields
+
+        params = getattr(request, "query_params", request.GET)
+        if params.get(self.repr_query_param) == "compact":
+            fields = self._compact(fields)
+
+        expand = parse_expand(params.get(self.expand_query_param, ""))
+        if expand:
+            fields = self._expanded(fields, expand)
+
+        requested = params.get(self.fields_query_param)
+        if requested:
+            names = {name.strip() for name in requested.split(",") if name.strip()}
+            fields = {name: field for name, field in fields.items() if name in names}
+        return fields
+
+    def _expanded(self, fields, expand):
+        expandable = getattr(getattr(self, "Meta", None), "expandable_fields", {})
+        for name, nested in expand.items():
+            field = fields.get(name)
+            if name not in expandable or field is None or field.write_only:
+                continue
+            serializer_class = expandable[name]
+            if isinstance(serializer_class, str):
+                serializer_class = import_string(serializer_class)
+            kwargs = {"read_only": True, "expand": nested}
+            if field.source != name:
+                kwargs["source"] = field.source
+            if isinstance(field, ManyRelatedField):
+                kwargs["many"] = True
+            fields[name] = serializer_class(**kwargs)
+        return fields
+
+    def _is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    @staticmethod
+    def _compact(fields):
+        compact = {}
+        for name, field in fields.items():
+            if isinstance(field, HyperlinkedIdentityField):
+                if name == "url":
+                    compact["id"] = serializers.ReadOnlyField()
+                continue
+            if isinstance(field, HyperlinkedRelatedField):
+                field = serializers.PrimaryKeyRelatedField(read_only=True, source=field.source)
+            elif isinstance(field, ManyRelatedField) and isinstance(
+                field.child_relation, HyperlinkedRelatedField
+            ):
+                field = serializers.PrimaryKeyRelatedField(
+                    many=True, read_only=True, source=field.source
+                )
+            compact[name] = field
+        return compact
+
+
+def parse_expand(value):
+    """
+    Turn ``"supervisor.user,designation"`` into
+    ``{"supervisor": {"user": {}}, "designation": {}}``.
+    """
+    max_depth = getattr(settings, "EXPAND_MAX_DEPTH", 2)
+    tree = {}
+    for path in value.split(","):
+        names = [name.strip() for name in path.split(".") if name.strip()]
+        if len(names) > max_depth:
+            raise serializers.ValidationError(
+                {"expand": f"Relations can be expanded at most {max_depth} level(s) deep."}
+            )
+        node = tree
+        for name in names:
+            node = node.setdefault(name, {})
+    return tree
+
+
+def rendered_models(serializer):
+    """
+    Models of ``serializer`` and of every serializer nested in it.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    models = {model} if model is not None else set()
+    for field in serializer.fields.values():
+        if isinstance(field, serializers.BaseSerializer) and not field.write_only:
+            models |= rendered_models(field)
+    return models
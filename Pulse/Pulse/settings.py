@@ -27,6 +27,11 @@ ENV_DB_USER = os.getenv("DB_USER")
 ENV_DB_PASSWORD = os.getenv("DB_PASSWORD")
 ENV_DB_HOST = os.getenv("DB_HOST")
 
+ENV_CACHE_URL = os.getenv("DJANGO_CACHE_URL")
+ENV_JWT_USER_MODE = os.getenv("JWT_USER_MODE")
+ENV_RESPONSE_CACHE_TIMEOUT = os.getenv("RESPONSE_CACHE_TIMEOUT")
+ENV_HISTORY_ARCHIVE_DIR = os.getenv("HISTORY_ARCHIVE_DIR")
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -67,6 +72,7 @@ THIRD_PARTY_APPS = [
 
 
 LOCAL_APPS = [
+    'Pulse',
     'users',
     'organization',
     'projects',
@@ -213,6 +219,68 @@ SIMPLE_JWT = {
     'JTI_CLAIM': 'jti',
 }
 
+# How CookieJWTAuthentication finds the user of an access token: "database"
+# on every request, "cached" per process for JWT_USER_CACHE_TTL seconds, or
+# "claims" from the token while the user is unchanged (authentication.users).
+# The last two need the shared cache of DJANGO_CACHE_URL (see CACHES below).
+JWT_USER_MODE = ENV_JWT_USER_MODE or "database"
+JWT_USER_CACHE_TTL = 60
+
+# Only claims mode reads the claims these serializers stamp into tokens;
+# stamping them costs a user load on every refresh.
+if JWT_USER_MODE == "claims":
+    SIMPLE_JWT['TOKEN_OBTAIN_SERIALIZER'] = (
+        'authentication.serializers.ClaimsTokenObtainPairSerializer'
+    )
+    SIMPLE_JWT['TOKEN_REFRESH_SERIALIZER'] = (
+        'authentication.serializers.ClaimsTokenRefreshSerializer'
+    )
+
+# ETag version counters (Pulse.etags) and the revoked-token cache
+# (authentication.revocation) keep their state in the default cache, which
+# must be shared between workers when running more than one process. Set
+# DJANGO_CACHE_URL to a Redis server (redis://host:6379/0) for that;
+# without it every process has its own cache, which check --deploy reports.
+if ENV_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': ENV_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds to cache list responses under their ETag (0 disables the cache).
+RESPONSE_CACHE_TIMEOUT = int(ENV_RESPONSE_CACHE_TIMEOUT or 0)
+
+# How many levels of relations ?expand= may embed (e.g. supervisor.user is 2).
+EXPAND_MAX_DEPTH = 2
+
+# History retention for manage.py prune_history: rows older than "days" are
+# moved to gzipped NDJSON files in HISTORY_ARCHIVE_DIR, except the newest
+# "keep" rows of every object. "days": None only compacts no-op saves.
+HISTORY_RETENTION = {
+    "projects.Project": {"days": 365, "keep": 1},
+    "projects.Task": {"days": 180, "keep": 1},
+    "organization.Employee": {"days": 730, "keep": 1},
+    "organization.Designation": {"days": None},
+    "organization.Level": {"days": None},
+}
+HISTORY_ARCHIVE_DIR = Path(ENV_HISTORY_ARCHIVE_DIR or BASE_DIR / "history_archive")
+
+# Seconds to cache ?as_of= list pages for past moments; their history only
+# changes when prune_history removes rows, which invalidates the cache.
+AS_OF_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Age after which purge_auth deletes a LoginSession: by then the refresh
+# token it was created with has expired.
+LOGIN_SESSION_RETENTION = SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
+
 # Cookie settings (for production)
 SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SECURE = True
@@ -0,0 +1,20 @@
+from django.test import SimpleTestCase, override_settings
+
+from .checks import check_shared_cache
+
+REDIS_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/0",
+    }
+}
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+
+    def test_deploy_check_warns_about_process_local_cache(self):
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ["pulse.W001"])
+
+    @override_settings(CACHES=REDIS_CACHES)
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        from Pulse.etags import track_versions
+        from . import checks, signals  # noqa: F401
+
+        track_versions(BlacklistedToken)
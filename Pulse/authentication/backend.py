@@ -1,10 +1,20 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 from rest_framework.authentication import get_authorization_header
 
+from .users import claims_user, users
+
 
 class CookieJWTAuthentication(JWTAuthentication):
     """
     Reads JWT access token from HttpOnly cookie if no Authorization header exists.
+
+    The user is resolved as ``settings.JWT_USER_MODE`` says, see
+    ``authentication.users``.
     """
     def authenticate(self, request):
         auth = get_authorization_header(request).split()
@@ -16,3 +26,32 @@ class CookieJWTAuthentication(JWTAuthentication):
                 request.META["HTTP_AUTHORIZATION"] = f"Bearer {access}"
 
         return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        mode = getattr(settings, "JWT_USER_MODE", "database")
+        if mode == "database":
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if mode == "claims":
+            user = claims_user(validated_token)
+            if user is not None:
+                return user
+
+        # The same checks as JWTAuthentication.get_user, on a cached user
+        user = users.get(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
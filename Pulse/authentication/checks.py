@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from Pulse.etags import shared_cache
+
+USER_MODES = ("database", "cached", "claims")
+
+
+@register(Tags.security)
+def check_user_mode(app_configs, **kwargs):
+    mode = getattr(settings, "JWT_USER_MODE", "database")
+    if mode not in USER_MODES:
+        return [
+            Error(
+                f"JWT_USER_MODE must be one of {', '.join(USER_MODES)}, not {mode!r}.",
+                id="authentication.E001",
+            )
+        ]
+    if mode != "database" and not shared_cache():
+        return [
+            Error(
+                f"JWT_USER_MODE = {mode!r} needs a cache shared between workers.",
+                hint=(
+                    "User version counters live in the default cache. With a "
+                    "process-local cache, a user deactivated or demoted through "
+                    "one worker keeps their old privileges on the others until "
+                    "their access token expires. Set DJANGO_CACHE_URL, or use "
+                    "JWT_USER_MODE = 'database'."
+                ),
+                id="authentication.E002",
+            )
+        ]
+    return []
@@ -0,0 +1,235 @@
+import http.client
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from authentication.views import ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME
+
+PREFIX = "/api/v1/auth/"
+ENDPOINTS = {
+    f"{PREFIX}login/": "login",
+    f"{PREFIX}status/": "status",
+    f"{PREFIX}refresh/": "refresh",
+    f"{PREFIX}logout/": "logout",
+}
+USERNAME = "authbench-{}"
+MAX_REPORTED_FAILURES = 10
+
+
+class _Server(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _QueryCounter:
+    """
+    WSGI middleware recording the number of queries of every request, by
+    endpoint.
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self.lock = threading.Lock()
+        self.counts = defaultdict(list)
+
+    def __call__(self, environ, start_response):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            response = self.application(environ, start_response)
+            try:
+                body = b"".join(response)
+            finally:
+                response.close()
+        with self.lock:
+            self.counts[ENDPOINTS.get(environ["PATH_INFO"], "other")].append(queries)
+        return [body]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test login, status, refresh and logout against an in-process WSGI "
+        "server and report throughput, p50/p95/p99 latency and queries per "
+        "request for each. Seeds its own users and removes them, with their "
+        "tokens, afterwards; run against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=20,
+            help="Number of users to seed and log in as",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Number of clients running cycles at the same time",
+        )
+        parser.add_argument(
+            "--cycles",
+            type=int,
+            default=10,
+            help="Login, status, refresh, status, logout cycles per client",
+        )
+        parser.add_argument(
+            "--password",
+            default="bench-password-1",
+            help="Password of the seeded users",
+        )
+        parser.add_argument(
+            "--keep-users",
+            action="store_true",
+            help="Keep the seeded users and their tokens",
+        )
+
+    def handle(self, *args, **options):
+        for option in ("users", "concurrency", "cycles"):
+            if options[option] < 1:
+                raise CommandError(f"--{option} must be at least 1.")
+
+        users = self._seed(options["users"], options["password"])
+        counter = _QueryCounter(get_wsgi_application())
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "127.0.0.1"]):
+            server = make_server("127.0.0.1", 0, counter, _Server, _QuietHandler)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                timings, errors, elapsed = self._drive(server.server_port, users, options)
+            finally:
+                server.shutdown()
+                server.server_close()
+
+        if not options["keep_users"]:
+            seeded = User.objects.filter(username__in=users)
+            OutstandingToken.objects.filter(user__in=seeded).delete()
+            seeded.delete()
+
+        self._report(timings, errors, counter.counts, elapsed)
+
+    # ---------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------
+
+    @staticmethod
+    def _seed(count, password):
+        # One hash for everyone; logins still pay the full hasher cost
+        hashed = make_password(password)
+        usernames = [USERNAME.format(i) for i in range(count)]
+        User.objects.bulk_create(
+            [User(username=username, password=hashed) for username in usernames],
+            ignore_conflicts=True,
+        )
+        User.objects.filter(username__in=usernames).update(password=hashed, is_active=True)
+        return usernames
+
+    def _drive(self, port, users, options):
+        timings = defaultdict(list)
+        errors = defaultdict(list)
+        lock = threading.Lock()
+
+        def client(number):
+            for cycle in range(options["cycles"]):
+                username = users[(number * options["cycles"] + cycle) % len(users)]
+                for name, status, body, seconds in self._cycle(port, username, options["password"]):
+                    with lock:
+                        timings[name].append(seconds)
+                        if status != 200:
+                            errors[name].append((status, body))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            for future in [pool.submit(client, n) for n in range(options["concurrency"])]:
+                future.result()
+        return timings, errors, time.perf_counter() - started
+
+    @staticmethod
+    def _cycle(port, username, password):
+        cookies = {}
+
+        def request(name, method, body=None):
+            headers = {"Content-Type": "application/json"}
+            if cookies:
+                headers["Cookie"] = "; ".join(f"{key}={value}" for key, value in cookies.items())
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+            started = time.perf_counter()
+            conn.request(method, f"{PREFIX}{name}/", json.dumps(body) if body else None, headers)
+            response = conn.getresponse()
+            body = response.read()
+            seconds = time.perf_counter() - started
+            for header in response.headers.get_all("Set-Cookie") or ():
+                for key, morsel in SimpleCookie(header).items():
+                    cookies[key] = morsel.value
+            conn.close()
+            return name, response.status, body, seconds
+
+        yield request("login", "POST", {"username": username, "password": password})
+        if ACCESS_COOKIE_NAME not in cookies:
+            return
+        yield request("status", "GET")
+        yield request("refresh", "POST")
+        if REFRESH_COOKIE_NAME in cookies:
+            yield request("status", "GET")
+            yield request("logout", "POST")
+
+    def _report(self, timings, errors, queries, elapsed):
+        total = sum(len(seconds) for seconds in timings.values())
+        self.stdout.write(
+            f"{'endpoint':<10}{'requests':>10}{'errors':>8}{'req/s':>10}"
+            f"{'p50':>10}{'p95':>10}{'p99':>10}{'queries':>10}"
+        )
+        for name in ENDPOINTS.values():
+            if name not in timings:
+                continue
+            ordered = sorted(timings[name])
+            counts = queries.get(name) or [0]
+            self.stdout.write(
+                f"{name:<10}{len(ordered):>10}{len(errors[name]):>8}"
+                f"{len(ordered) / elapsed:>10.1f}"
+                + "".join(
+                    f"{self._percentile(ordered, p) * 1000:>8.1f}ms" for p in (50, 95, 99)
+                )
+                + f"{sum(counts) / len(counts):>10.1f}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} request(s) in {elapsed:.2f}s ({total / elapsed:.1f} req/s)")
+        )
+
+        failures = [(name, *failure) for name, failed in errors.items() for failure in failed]
+        for name, status, body in failures[:MAX_REPORTED_FAILURES]:
+            text = body.decode("utf-8", "replace").strip()[:500]
+            self.stdout.write(self.style.ERROR(f"{name} returned {status}: {text}"))
+        if len(failures) > MAX_REPORTED_FAILURES:
+            self.stdout.write(
+                self.style.ERROR(f"... and {len(failures) - MAX_REPORTED_FAILURES} more failure(s)")
+            )
+
+    @staticmethod
+    def _percentile(ordered, percent):
+        # Nearest rank
+        return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
@@ -0,0 +1,108 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from authentication import purge
+from authentication.models import LoginSession
+
+TABLES = (OutstandingToken, BlacklistedToken, LoginSession)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired refresh tokens with their blacklist entries, and login "
+        "sessions older than settings.LOGIN_SESSION_RETENTION. Every batch "
+        "commits on its own, so the command can be stopped and re-run at any "
+        "time; --every keeps it running as a scheduler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=purge.BATCH_SIZE,
+            help="Rows deleted per transaction",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop each purge after this many batches, to bound the run time",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches, to leave room for other writers",
+        )
+        parser.add_argument(
+            "--every",
+            type=float,
+            default=None,
+            metavar="SECONDS",
+            help="Repeat the purge every SECONDS until interrupted",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be removed without changing anything",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if options["every"] is not None and options["every"] <= 0:
+            raise CommandError("--every must be positive.")
+
+        if options["every"] is None:
+            self._purge(options)
+            return
+        try:
+            while True:
+                started = time.monotonic()
+                self._purge(options)
+                time.sleep(max(0.0, options["every"] - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
+
+    def _purge(self, options):
+        suffix = " (dry run)" if options["dry_run"] else ""
+        before = {model: purge.table_size(model) for model in TABLES}
+        for label, batches in (
+            ("Expired tokens", purge.expired_tokens(options["batch_size"], options["dry_run"])),
+            ("Stale sessions", purge.stale_sessions(options["batch_size"], options["dry_run"])),
+        ):
+            started = time.monotonic()
+            removed = self._run(batches, options["max_batches"], options["pause"])
+            elapsed = time.monotonic() - started
+            rate = removed / elapsed if elapsed else 0
+            self.stdout.write(
+                f"{label}: {removed} row(s) removed in {elapsed:.2f}s "
+                f"({rate:.0f} rows/s){suffix}"
+            )
+        for model in TABLES:
+            self.stdout.write(
+                f"{model._meta.db_table}: {self._size(before[model])} -> "
+                f"{self._size(purge.table_size(model))}"
+            )
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    @staticmethod
+    def _run(batches, max_batches, pause):
+        total = 0
+        for done, count in enumerate(batches, 1):
+            total += count
+            if max_batches is not None and done >= max_batches:
+                batches.close()
+                break
+            if pause:
+                time.sleep(pause)
+        return total
+
+    @staticmethod
+    def _size(size):
+        rows, size_bytes = size
+        if size_bytes is None:
+            return f"{rows} rows"
+        return f"{rows} rows, {size_bytes / 1024:.0f} KiB"
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_remove_loginsession_revoked'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loginsession',
+            index=models.Index(fields=['created_at', 'id'], name='loginsession_created_at_idx'),
+        ),
+    ]
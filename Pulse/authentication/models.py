@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
-from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .revocation import is_revoked
 
 
 class LoginSession(models.Model):
@@ -14,9 +15,14 @@ class LoginSession(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="loginsession_created_at_idx"),
+        ]
+
     @property
     def is_revoked(self) -> bool:
-        return BlacklistedToken.objects.filter(token__jti=self.jti).exists()
+        return is_revoked(self.jti)
 
     def __str__(self):
         return f"{self.user} | {self.jti}"
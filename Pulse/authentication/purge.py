@@ -0,0 +1,105 @@
+"""
+Removing expired refresh tokens and stale login sessions, run by
+``manage.py purge_auth``.
+
+With ``ROTATE_REFRESH_TOKENS`` and ``BLACKLIST_AFTER_ROTATION`` every refresh
+adds an ``OutstandingToken`` and a ``BlacklistedToken``, and every login a
+``LoginSession``. An expired token can no longer be used or rotated, so
+neither it nor its blacklist entry is needed. A session is stale once it is
+older than ``settings.LOGIN_SESSION_RETENTION``, by default the lifetime of
+the refresh token it was created with.
+
+Both purges delete in batches of bounded size, each in its own short
+transaction, and yield the number of rows removed per batch:
+
+* ``OutstandingToken`` has no index on ``expires_at``, but ids are issued in
+  expiry order, so ``expired_tokens`` walks the primary key and stops at the
+  first batch with nothing expired. Tokens issued under a longer lifetime
+  than their successors are removed by a later run.
+* ``stale_sessions`` range-scans the ``LoginSession.created_at`` index.
+"""
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils.timezone import now
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .models import LoginSession
+
+BATCH_SIZE = 1000
+
+
+def session_retention():
+    return getattr(settings, "LOGIN_SESSION_RETENTION", api_settings.REFRESH_TOKEN_LIFETIME)
+
+
+def _delete_tokens(ids):
+    # Blacklist entries first, so deleting the tokens has nothing left to
+    # cascade to
+    with transaction.atomic():
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(pk__in=ids).delete()
+
+
+def expired_tokens(batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Delete outstanding tokens that have expired, with their blacklist
+    entries, oldest first.
+    """
+    cutoff = now()
+    last = 0
+    while True:
+        rows = list(
+            OutstandingToken.objects.filter(pk__gt=last)
+            .order_by("pk")
+            .values_list("pk", "expires_at")[:batch_size]
+        )
+        expired = [pk for pk, expires_at in rows if expires_at <= cutoff]
+        if not expired:
+            return
+        last = rows[-1][0]
+        if not dry_run:
+            _delete_tokens(expired)
+        yield len(expired)
+
+
+def stale_sessions(batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Delete login sessions older than ``session_retention()``, oldest first.
+    """
+    sessions = LoginSession.objects.filter(created_at__lt=now() - session_retention())
+    if dry_run:
+        count = sessions.count()
+        if count:
+            yield count
+        return
+
+    ordered = sessions.order_by("created_at", "pk").values_list("pk", flat=True)
+    while ids := list(ordered[:batch_size]):
+        LoginSession.objects.filter(pk__in=ids).delete()
+        yield len(ids)
+
+
+def table_size(model):
+    """
+    ``(rows, bytes)`` of the table of ``model`` including its indexes;
+    ``bytes`` is None where the database does not report it.
+    """
+    rows = model._default_manager.count()
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT pg_total_relation_size(%s)", [table])
+            return rows, cursor.fetchone()[0]
+        if connection.vendor == "sqlite":
+            try:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                    "(SELECT name FROM sqlite_master WHERE tbl_name = %s)",
+                    [table],
+                )
+            except DatabaseError:
+                # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+                return rows, None
+            return rows, cursor.fetchone()[0]
+    return rows, None
@@ -0,0 +1,195 @@
+"""
+In-process cache of revoked (blacklisted) token ids.
+
+Every worker keeps a Bloom filter of the unexpired blacklisted ``jti`` values
+plus a small exact set of the ones blacklisted since the filter was built.
+A token that is in neither is not revoked, which answers the common case
+without a query. A token in the exact set is revoked; a Bloom filter hit is
+confirmed against the database, since it may be a false positive.
+
+Workers notice new revocations through the ``BlacklistedToken`` version
+counter in the shared cache (see ``Pulse.etags``), which is bumped whenever a
+token is blacklisted. On a new version the worker reads the rows above its
+``floor``: the highest id blacklisted more than ``SYNC_MARGIN`` seconds ago.
+Re-reading that recent window picks up rows whose transaction committed after
+a higher id had been read, while the primary key keeps the query a short
+range scan. The filter is rebuilt from scratch once the exact set grows past
+``EXACT_SET_LIMIT`` and every ``SYNC_INTERVAL`` seconds, which also covers
+transactions open for longer than the margin.
+
+Writes that bypass ``post_save`` (``bulk_create``) must call
+``bump_version(BlacklistedToken)`` themselves, as ``revoke`` does.
+
+Rotation in ``TokenRefreshSerializer`` keeps simplejwt's own query: it writes
+to the blacklist anyway and must not rotate a token revoked a moment ago.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils.timezone import now
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from Pulse.etags import bump_version, get_versions
+
+EXACT_SET_LIMIT = 4096
+FALSE_POSITIVE_RATE = 0.001
+SYNC_INTERVAL = 60
+SYNC_MARGIN = 10
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter over strings.
+    """
+
+    def __init__(self, capacity, error_rate=FALSE_POSITIVE_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big")
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(value))
+
+
+class RevocationCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.recent = set()
+        self.floor = 0
+        self.version = None
+        self.synced_at = 0.0
+
+    def is_revoked(self, jti):
+        """
+        True when the token with this ``jti`` has been blacklisted.
+        """
+        jti = str(jti)
+        self.sync()
+        if jti in self.recent:
+            return True
+        if jti in self.bloom:
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+        return False
+
+    def add(self, *jtis):
+        """
+        Record tokens this process has just blacklisted.
+        """
+        with self.lock:
+            self.recent.update(str(jti) for jti in jtis)
+
+    def sync(self):
+        [version] = get_versions([BlacklistedToken])
+        if (
+            self.bloom is not None
+            and version == self.version
+            and time.monotonic() - self.synced_at < SYNC_INTERVAL
+        ):
+            return
+        with self.lock:
+            if (
+                self.bloom is None
+                or len(self.recent) > EXACT_SET_LIMIT
+                or time.monotonic() - self.synced_at >= SYNC_INTERVAL
+            ):
+                self._rebuild()
+            else:
+                self._load_new()
+            self.version = version
+            self.synced_at = time.monotonic()
+
+    def clear(self):
+        with self.lock:
+            self.bloom = None
+            self.recent = set()
+            self.floor = 0
+            self.version = None
+
+    def _rebuild(self):
+        rows = list(
+            BlacklistedToken.objects.filter(token__expires_at__gt=now())
+            .values_list("pk", "token__jti", "blacklisted_at")
+        )
+        bloom = BloomFilter(len(rows))
+        for _, jti, _ in rows:
+            bloom.add(jti)
+        self.bloom, self.recent, self.floor = bloom, set(), self._floor(rows, 0)
+
+    def _load_new(self):
+        rows = list(
+            BlacklistedToken.objects.filter(pk__gt=self.floor)
+            .values_list("pk", "token__jti", "blacklisted_at")
+        )
+        self.recent.update(jti for _, jti, _ in rows)
+        self.floor = self._floor(rows, self.floor)
+
+    @staticmethod
+    def _floor(rows, floor):
+        # Rows older than the margin are taken as committed, and so is
+        # everything below them
+        cutoff = now() - timedelta(seconds=SYNC_MARGIN)
+        return max([floor, *(pk for pk, _, blacklisted_at in rows if blacklisted_at < cutoff)])
+
+
+revocations = RevocationCache()
+
+
+def is_revoked(jti):
+    return revocations.is_revoked(jti)
+
+
+def revoke(tokens):
+    """
+    Blacklist the unexpired tokens of the ``OutstandingToken`` queryset
+    ``tokens`` in one transaction and return how many were revoked.
+    """
+    with transaction.atomic():
+        rows = list(
+            tokens.filter(expires_at__gt=now(), blacklistedtoken__isnull=True)
+            .order_by()
+            .values_list("pk", "jti")
+        )
+        if not rows:
+            return 0
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_id=pk) for pk, _ in rows],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        bump_version(BlacklistedToken)
+        jtis = [jti for _, jti in rows]
+        transaction.on_commit(lambda: revocations.add(*jtis))
+    return len(rows)
+
+
+class TokenRevoked(TokenError):
+    pass
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    ``RefreshToken`` whose blacklist check goes through the revocation cache.
+    """
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenRevoked("Token is blacklisted")
@@ -1,8 +1,82 @@
+from django.contrib.auth.models import User
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
 from .models import LoginSession
+from .users import ClaimsRefreshToken
 
 
 class LoginSessionSerializer(serializers.ModelSerializer):
+    is_revoked = serializers.SerializerMethodField()
+
     class Meta:
         model = LoginSession
         fields = ['jti', 'user_agent', 'ip_address', 'created_at', 'is_revoked']
+
+    def get_is_revoked(self, obj) -> bool:
+        # Annotated by SessionsListView; other querysets use the property
+        revoked = getattr(obj, "revoked", None)
+        if revoked is None:
+            revoked = obj.is_revoked
+        return revoked
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class RevokeOtherSessionsSerializer(serializers.Serializer):
+    refresh = serializers.CharField(
+        required=False,
+        help_text="Refresh token of the session to keep, when not sent as a cookie",
+    )
+
+
+class BulkRevokeSerializer(serializers.Serializer):
+    """
+    Selects refresh tokens to revoke: those of ``users`` and the members of
+    ``groups`` (everyone when both are omitted), issued within the optional
+    date range.
+    """
+    # Plain ids: unknown ones match nothing, and thousands of them cost no
+    # lookup each
+    users = serializers.ListField(child=serializers.IntegerField(), required=False)
+    groups = serializers.ListField(child=serializers.IntegerField(), required=False)
+    issued_after = serializers.DateTimeField(required=False)
+    issued_before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(
+                "Give at least one of users, groups, issued_after or issued_before."
+            )
+        return attrs
+
+    def tokens(self):
+        data = self.validated_data
+        tokens = OutstandingToken.objects.all()
+        if "users" in data or "groups" in data:
+            members = User.groups.through.objects.filter(group_id__in=data.get("groups", []))
+            tokens = tokens.filter(
+                Q(user_id__in=data.get("users", []))
+                | Q(user_id__in=members.values("user_id"))
+            )
+        if "issued_after" in data:
+            tokens = tokens.filter(created_at__gte=data["issued_after"])
+        if "issued_before" in data:
+            tokens = tokens.filter(created_at__lt=data["issued_before"])
+        return tokens
+
+
+class RevokedSessionsSerializer(serializers.Serializer):
+    detail = serializers.CharField()
+    revoked = serializers.IntegerField()
@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from organization.models import Employee
+from .revocation import revocations
+from .users import bump_user
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def remember_revocation(sender, instance, created, **kwargs):
+    """
+    Make a token revoked in this process visible here right away; other
+    workers pick it up through the version counter.
+    """
+    if created:
+        jti = instance.token.jti
+        transaction.on_commit(lambda: revocations.add(jti))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    bump_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            bump_user(instance.pk)
+    elif action == "pre_clear":
+        # group.user_set.clear() does not say which users it removes
+        bump_user(*instance.user_set.values_list("pk", flat=True))
+    elif action in ("post_add", "post_remove"):
+        bump_user(*pk_set)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_employee_user(sender, instance, **kwargs):
+    # The employee_id claim
+    bump_user(instance.user_id)
@@ -1,3 +1,332 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from organization.models import Designation
+from Pulse.etags import get_versions
+from .checks import check_user_mode
+from .revocation import BloomFilter, RevocationCache, is_revoked, revocations
+from .users import ClaimsRefreshToken, users
+
+REDIS_CACHES = {'default': {
+    'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+    'LOCATION': 'redis://localhost:6379/0',
+}}
+
+
+class BloomFilterTest(TestCase):
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        values = [f"jti-{i}" for i in range(1000)]
+        for value in values:
+            bloom.add(value)
+        self.assertTrue(all(value in bloom for value in values))
+        misses = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(misses, 50)
+
+
+class RevocationCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        revocations.clear()
+        self.user = User.objects.create_user(username='alice', password='pass123')
+        self.client = APIClient()
+
+    def _status(self, access):
+        return self.client.get(
+            '/api/v1/auth/status/', HTTP_AUTHORIZATION=f'Bearer {access}'
+        ).data['authenticated']
+
+    def test_status_needs_no_blacklist_query_for_live_tokens(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.assertTrue(self._status(refresh.access_token))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(self._status(refresh.access_token))
+        self.assertFalse(
+            [q for q in ctx.captured_queries if 'token_blacklist' in q['sql']]
+        )
+
+    def test_revocations_reach_other_workers(self):
+        refresh = RefreshToken.for_user(self.user)
+        other_worker = RevocationCache()
+        self.assertFalse(other_worker.is_revoked(refresh['jti']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh.blacklist()
+
+        self.assertTrue(revocations.is_revoked(refresh['jti']))
+        self.assertTrue(other_worker.is_revoked(refresh['jti']))
+
+    def test_late_commits_below_a_synced_id_are_seen(self):
+        late, early = RefreshToken.for_user(self.user), RefreshToken.for_user(self.user)
+        late_row, _ = late.blacklist()
+        early.blacklist()
+        late_pk = late_row.pk
+        late_row.delete()
+
+        other_worker = RevocationCache()
+        self.assertFalse(other_worker.is_revoked(late['jti']))
+        # Committed after a higher id was already read
+        BlacklistedToken.objects.create(pk=late_pk, token=late_row.token)
+        self.assertTrue(other_worker.is_revoked(late['jti']))
+
+    def test_refresh_rejects_revoked_token(self):
+        refresh = RefreshToken.for_user(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh.blacklist()
+
+        response = self.client.post('/api/v1/auth/refresh/', {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['detail'], 'Token revoked')
+
+
+class SessionsListTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        revocations.clear()
+        self.user = User.objects.create_user(username='alice', password='pass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _login(self, count, revoke_every=3):
+        from .models import LoginSession
+
+        for i in range(count):
+            refresh = RefreshToken.for_user(self.user)
+            LoginSession.objects.create(user=self.user, jti=refresh['jti'])
+            if i % revoke_every == 0:
+                refresh.blacklist()
+
+    def _query_count(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/v1/auth/session/', {'limit': 100, **params})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data['results']
+
+    def test_query_count_is_constant(self):
+        self._login(3)
+        few, rows = self._query_count()
+        self.assertEqual([row['is_revoked'] for row in rows], [False, False, True])
+
+        self._login(30)
+        many, rows = self._query_count()
+        self.assertEqual(len(rows), 33)
+        self.assertEqual(few, many)
+        self.assertEqual(sum(row['is_revoked'] for row in rows), 11)
+
+    def test_cursor_pagination(self):
+        self._login(5)
+        queries, _ = self._query_count(pagination='cursor')
+        self.assertEqual(queries, 1)
+
+        response = self.client.get('/api/v1/auth/session/', {'pagination': 'cursor', 'limit': 2})
+        jtis = [row['jti'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            jtis += [row['jti'] for row in response.data['results']]
+        self.assertEqual(len(set(jtis)), 5)
+
+
+@override_settings(JWT_USER_MODE='claims')
+class ClaimsAuthenticationTest(TestCase):
+    url = '/api/v1/organization/designations/'
+
+    def setUp(self):
+        cache.clear()
+        users.clear()
+        self.user = User.objects.create_user(username='alice', password='pass123', is_staff=True)
+        self.client = APIClient()
+        self.access = ClaimsRefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def _user_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [q for q in ctx.captured_queries if 'FROM "auth_user"' in q['sql']]
+
+    def test_claims_replace_the_user_query(self):
+        self.assertEqual(self.access['employee_id'], None)
+        self.assertTrue(self.access['is_staff'])
+        self.assertEqual(self._user_queries(), [])
+
+        with override_settings(JWT_USER_MODE='database'):
+            self.assertEqual(len(self._user_queries()), 1)
+
+    def test_writes_get_the_real_user(self):
+        response = self.client.post(self.url, {'title': 'Engineer'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Designation.objects.get().created_by, self.user)
+
+    def test_claims_need_a_shared_cache(self):
+        self.assertEqual(
+            [error.id for error in check_user_mode(None)], ['authentication.E002']
+        )
+        with override_settings(JWT_USER_MODE='database'):
+            self.assertEqual(check_user_mode(None), [])
+        with override_settings(CACHES=REDIS_CACHES):
+            self.assertEqual(check_user_mode(None), [])
+
+    def test_user_changes_invalidate_claims(self):
+        self._user_queries()
+        self.user.is_active = False
+        self.user.save()
+        # 403 rather than 401: SessionAuthentication comes first and sends
+        # no WWW-Authenticate header
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.user.is_active = True
+        self.user.save()
+        # Claims issued before the change are no longer trusted; the cached
+        # user is read once and then served from memory
+        self.assertEqual(len(self._user_queries()), 1)
+        with override_settings(JWT_USER_MODE='cached'):
+            self.assertEqual(self._user_queries(), [])
+
+
+class PurgeTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        revocations.clear()
+        self.user = User.objects.create_user(username='alice', password='pass123')
+
+    def _login(self, count, age):
+        from .models import LoginSession
+
+        for _ in range(count):
+            refresh = RefreshToken.for_user(self.user)
+            refresh.blacklist()
+            session = LoginSession.objects.create(user=self.user, jti=refresh['jti'])
+            OutstandingToken.objects.filter(jti=refresh['jti']).update(
+                expires_at=timezone.now() + timedelta(days=7) - age,
+            )
+            LoginSession.objects.filter(pk=session.pk).update(created_at=timezone.now() - age)
+
+    def _purge(self, *args):
+        out = StringIO()
+        call_command('purge_auth', '--batch-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_removes_expired_tokens_and_stale_sessions(self):
+        from .models import LoginSession
+
+        self._login(5, age=timedelta(days=8))
+        self._login(3, age=timedelta(days=1))
+
+        output = self._purge('--dry-run')
+        self.assertIn('Expired tokens: 5 row(s) removed', output)
+        self.assertEqual(OutstandingToken.objects.count(), 8)
+
+        version = get_versions([BlacklistedToken])
+        output = self._purge()
+        self.assertIn('Expired tokens: 5 row(s) removed', output)
+        self.assertIn('Stale sessions: 5 row(s) removed', output)
+        self.assertIn('token_blacklist_outstandingtoken: 8 rows', output)
+        self.assertEqual(OutstandingToken.objects.count(), 3)
+        self.assertEqual(BlacklistedToken.objects.count(), 3)
+        self.assertEqual(LoginSession.objects.count(), 3)
+        self.assertNotEqual(get_versions([BlacklistedToken]), version)
+
+    def test_max_batches_bounds_the_run(self):
+        self._login(5, age=timedelta(days=8))
+        self.assertIn('Expired tokens: 2 row(s) removed', self._purge('--max-batches', '1'))
+        self.assertEqual(OutstandingToken.objects.count(), 3)
+
+
+class BulkRevokeTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        revocations.clear()
+        self.user = User.objects.create_user(username='alice', password='pass123')
+        self.client = APIClient()
+
+    def _tokens(self, user, count):
+        return [RefreshToken.for_user(user) for _ in range(count)]
+
+    def test_revoke_other_sessions(self):
+        current, *others = self._tokens(self.user, 4)
+        other_user = self._tokens(User.objects.create_user(username='bob'), 1)
+        self.client.force_authenticate(user=self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/v1/auth/session/revoke-others/', {'refresh': str(current)}
+            )
+        self.assertEqual(response.data['revoked'], 3)
+        self.assertFalse(is_revoked(current['jti']))
+        self.assertTrue(all(is_revoked(token['jti']) for token in others))
+        self.assertFalse(is_revoked(other_user[0]['jti']))
+
+        # Already revoked tokens are skipped
+        response = self.client.post('/api/v1/auth/session/revoke-others/', {'refresh': str(current)})
+        self.assertEqual(response.data['revoked'], 0)
+
+    def test_bulk_revoke_by_group_and_users(self):
+        group = Group.objects.create(name='support')
+        members = [User.objects.create_user(username=f'member{i}') for i in range(3)]
+        group.user_set.add(*members)
+        outsider = User.objects.create_user(username='outsider')
+        for user in [*members, outsider, self.user]:
+            self._tokens(user, 2)
+
+        url = '/api/v1/auth/session/revoke-bulk/'
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.post(url, {'groups': [group.pk]}, format='json').status_code, 403)
+
+        self.client.force_authenticate(user=User.objects.create_user(username='admin', is_staff=True))
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, 400)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                url, {'groups': [group.pk], 'users': [self.user.pk]}, format='json'
+            )
+        self.assertEqual(response.data['revoked'], 8)
+        self.assertEqual(
+            len([q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]), 1
+        )
+        revoked = set(BlacklistedToken.objects.values_list('token__user__username', flat=True))
+        self.assertEqual(revoked, {'member0', 'member1', 'member2', 'alice'})
+
+    def test_bulk_revoke_by_issue_date(self):
+        old = self._tokens(self.user, 2)
+        OutstandingToken.objects.filter(jti__in=[token['jti'] for token in old]).update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+        self._tokens(self.user, 1)
+
+        self.client.force_authenticate(user=User.objects.create_user(username='admin', is_staff=True))
+        response = self.client.post(
+            '/api/v1/auth/session/revoke-bulk/',
+            {'issued_before': (timezone.now() - timedelta(days=1)).isoformat()},
+            format='json',
+        )
+        self.assertEqual(response.data['revoked'], 2)
+
+
+class BenchmarkAuthTest(TransactionTestCase):
+
+    def test_reports_every_endpoint(self):
+        out = StringIO()
+        # One client: the in-memory SQLite test database takes no concurrent
+        # writers
+        call_command('benchmark_auth', users=2, concurrency=1, cycles=2, stdout=out)
+        output = out.getvalue()
+        for endpoint in ('login', 'status', 'refresh', 'logout'):
+            self.assertRegex(output, rf'{endpoint}\s+\d+\s+0\s', output)
+        self.assertFalse(User.objects.filter(username__startswith='authbench-').exists())
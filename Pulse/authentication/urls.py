@@ -10,7 +10,9 @@ from .views import (
     LogoutView,
     AuthStatusView,
     SessionsListView,
-    RevokeSessionView
+    RevokeSessionView,
+    RevokeOtherSessionsView,
+    BulkRevokeView,
 )
 
 
@@ -29,6 +31,8 @@ class AuthRootView(APIView):
             "logout": reverse("auth-logout", request=request),
             "sessions_list": reverse("auth-sessions", request=request),
             "session_revoke_example": reverse("auth-revoke-session", args=["<jti>"], request=request),
+            "session_revoke_others": reverse("auth-revoke-other-sessions", request=request),
+            "session_revoke_bulk": reverse("auth-revoke-bulk", request=request),
         })
 
 
@@ -39,5 +43,7 @@ urlpatterns = [
     path("refresh/", RefreshView.as_view(), name="auth-refresh"),
     path("logout/", LogoutView.as_view(), name="auth-logout"),
     path("session/", SessionsListView.as_view(), name="auth-sessions"),
-    path("session/revoke/<jti>", RevokeSessionView.as_view(), name="auth-revoke-session")
+    path("session/revoke-others/", RevokeOtherSessionsView.as_view(), name="auth-revoke-other-sessions"),
+    path("session/revoke-bulk/", BulkRevokeView.as_view(), name="auth-revoke-bulk"),
+    path("session/revoke/<jti>", RevokeSessionView.as_view(), name="auth-revoke-session"),
 ]
@@ -0,0 +1,187 @@
+"""
+Resolving the user of an access token without loading it on every request.
+
+``settings.JWT_USER_MODE`` selects how ``CookieJWTAuthentication`` does it:
+
+* ``"database"`` (the default): simplejwt's behaviour, one query per request;
+* ``"cached"``: the ``User`` comes from a per-process cache that keeps users
+  for ``JWT_USER_CACHE_TTL`` seconds, or until they change;
+* ``"claims"``: tokens issued through ``ClaimsRefreshToken`` carry the
+  user's ``username``, ``is_staff``, ``is_superuser`` and ``employee_id``,
+  and while the user is unchanged the request gets a ``ClaimsUser`` that
+  answers those from the token. Anything else loads the real ``User``
+  through the cache on first use. Only this mode switches login and
+  refresh to the ``Claims*`` serializers, see ``Pulse.settings``.
+
+Every user has a version counter in the shared cache, bumped when the user,
+its groups or permissions, or its employee record change. Cached users and
+token claims are only trusted while the counter matches, so a deactivated,
+demoted or deleted user is re-read on its next request and checked exactly
+like simplejwt does. That only holds when every worker sees the same
+counters, so ``"cached"`` and ``"claims"`` need a shared cache; the
+``authentication.E002`` system check refuses them otherwise.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+USER_VERSION_KEY = "pulse:user-version:{}"
+CLAIMS = ("username", "is_staff", "is_superuser", "employee_id")
+VERSION_CLAIM = "user_version"
+MAX_CACHED_USERS = 1024
+
+
+def user_version(user_id):
+    key = USER_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(user_ids):
+    for user_id in user_ids:
+        try:
+            cache.incr(USER_VERSION_KEY.format(user_id))
+        except ValueError:
+            pass
+
+
+def bump_user(*user_ids):
+    """
+    Invalidate cached copies and token claims of these users, now and again
+    once the surrounding transaction commits.
+    """
+    _bump(user_ids)
+    transaction.on_commit(lambda: _bump(user_ids))
+
+
+class UserCache:
+    """
+    Recently authenticated users of this process, by id.
+    """
+
+    def __init__(self, size=MAX_CACHED_USERS):
+        self.size = size
+        self.lock = threading.Lock()
+        self.users = OrderedDict()
+
+    def get(self, user_id):
+        """
+        A private copy of the user, or None if it does not exist.
+        """
+        version = user_version(user_id)
+        with self.lock:
+            entry = self.users.get(user_id)
+            if entry is not None:
+                self.users.move_to_end(user_id)
+        if entry is not None:
+            user, cached_version, expires = entry
+            if cached_version == version and time.monotonic() < expires:
+                return copy.copy(user)
+
+        User = get_user_model()
+        try:
+            user = User._default_manager.get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            return None
+        ttl = getattr(settings, "JWT_USER_CACHE_TTL", 60)
+        with self.lock:
+            self.users[user_id] = (user, version, time.monotonic() + ttl)
+            self.users.move_to_end(user_id)
+            while len(self.users) > self.size:
+                self.users.popitem(last=False)
+        return copy.copy(user)
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+
+
+users = UserCache()
+
+
+def stamp_claims(token, user):
+    try:
+        employee_id = user.employee.pk
+    except ObjectDoesNotExist:
+        employee_id = None
+    token["username"] = user.get_username()
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token["employee_id"] = employee_id
+    token[VERSION_CLAIM] = user_version(user.pk)
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    ``RefreshToken`` that embeds the claims ``ClaimsUser`` reads, refreshed
+    from the current user for every access token it issues.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        stamp_claims(token, user)
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = users.get(self[api_settings.USER_ID_CLAIM])
+        if user is not None:
+            stamp_claims(access, user)
+        return access
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    The user of a verified access token. ``pk``, ``id``, the authentication
+    flags and ``CLAIMS`` come from the token; other attributes, and using it
+    as a model instance, load the real ``User`` once.
+    """
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        self.__dict__["_claims"] = {
+            **{claim: token[claim] for claim in CLAIMS},
+            "pk": user_id,
+            "id": user_id,
+            "is_active": True,
+            "is_authenticated": True,
+            "is_anonymous": False,
+        }
+        super().__init__(lambda: users.get(user_id))
+
+    def __getattr__(self, name):
+        claims = self.__dict__["_claims"]
+        if name in claims:
+            return claims[name]
+        return super().__getattr__(name)
+
+    def __bool__(self):
+        # ``IsAuthenticated`` tests ``request.user and ...``
+        return True
+
+
+def claims_user(token):
+    """
+    A ``ClaimsUser`` for ``token``, or None when it carries no claims or
+    the user changed since they were issued.
+    """
+    if VERSION_CLAIM not in token or any(claim not in token for claim in CLAIMS):
+        return None
+    if token[VERSION_CLAIM] != user_version(token[api_settings.USER_ID_CLAIM]):
+        return None
+    return ClaimsUser(token)
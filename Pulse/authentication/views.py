@@ -1,5 +1,7 @@
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
+from drf_spectacular.utils import extend_schema
 from rest_framework import status, permissions, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -16,8 +18,16 @@ from rest_framework_simplejwt.token_blacklist.models import (
 
 from rest_framework.permissions import AllowAny
 
+from Pulse.pagination import KeysetPagination
+
 from .models import LoginSession
-from authentication.serializers import LoginSessionSerializer
+from .revocation import CachedRefreshToken, TokenRevoked, is_revoked, revoke
+from authentication.serializers import (
+    BulkRevokeSerializer,
+    LoginSessionSerializer,
+    RevokedSessionsSerializer,
+    RevokeOtherSessionsSerializer,
+)
 
 
 ACCESS_COOKIE_NAME = "access_token"
@@ -61,7 +71,7 @@ class AuthStatusView(APIView):
             )
 
         # Optional but recommended if you blacklist access tokens
-        if BlacklistedToken.objects.filter(token__jti=token["jti"]).exists():
+        if is_revoked(token["jti"]):
             return Response(
                 {"authenticated": False},
                 status=status.HTTP_200_OK
@@ -126,18 +136,18 @@ class RefreshView(TokenRefreshView):
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
+        # Blacklist check through the revocation cache; rotation below
+        # repeats it against the database
         try:
-            token = RefreshToken(refresh_token)
-        except TokenError:
+            CachedRefreshToken(refresh_token)
+        except TokenRevoked:
             return Response(
-                {"detail": "Invalid token"},
+                {"detail": "Token revoked"},
                 status=status.HTTP_401_UNAUTHORIZED
             )
-
-        # Blacklist check (authoritative)
-        if BlacklistedToken.objects.filter(token__jti=token["jti"]).exists():
+        except TokenError:
             return Response(
-                {"detail": "Token revoked"},
+                {"detail": "Invalid token"},
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
@@ -195,11 +205,14 @@ class LogoutView(APIView):
 class SessionsListView(generics.ListAPIView):
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = LoginSessionSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
+        blacklisted = BlacklistedToken.objects.filter(token__jti=OuterRef("jti"))
         return LoginSession.objects.filter(
             user=self.request.user
-        ).order_by("-created_at")
+        ).annotate(revoked=Exists(blacklisted)).order_by("-created_at", "-id")
 
 
 class RevokeSessionView(APIView):
@@ -217,13 +230,62 @@ class RevokeSessionView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        try:
-            outstanding = OutstandingToken.objects.get(jti=jti)
-            BlacklistedToken.objects.get_or_create(token=outstanding)
-        except OutstandingToken.DoesNotExist:
-            pass
+        revoke(OutstandingToken.objects.filter(jti=jti))
 
         return Response(
             {"detail": "Session revoked"},
             status=status.HTTP_200_OK
         )
+
+
+class RevokeOtherSessionsView(generics.GenericAPIView):
+    """
+    Sign out everywhere else: revoke every refresh token of the user except
+    the one of this session (cookie or ``refresh``). Without a valid one,
+    this session is revoked as well.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    serializer_class = RevokeOtherSessionsSerializer
+
+    @extend_schema(responses=RevokedSessionsSerializer)
+    def post(self, request):
+        refresh_token = (
+            request.COOKIES.get(REFRESH_COOKIE_NAME)
+            or request.data.get("refresh")
+        )
+        keep = None
+        if refresh_token:
+            try:
+                token = RefreshToken(refresh_token)
+            except TokenError:
+                pass
+            else:
+                if str(token["user_id"]) == str(request.user.pk):
+                    keep = token["jti"]
+
+        revoked = revoke(
+            OutstandingToken.objects.filter(user_id=request.user.pk).exclude(jti=keep)
+        )
+        return Response(
+            {"detail": "Sessions revoked", "revoked": revoked},
+            status=status.HTTP_200_OK
+        )
+
+
+class BulkRevokeView(generics.GenericAPIView):
+    """
+    Revoke the refresh tokens of many users at once, by user, group and
+    issue date; see ``BulkRevokeSerializer``.
+    """
+    permission_classes = (permissions.IsAdminUser,)
+    serializer_class = BulkRevokeSerializer
+
+    @extend_schema(responses=RevokedSessionsSerializer)
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        revoked = revoke(serializer.tokens())
+        return Response(
+            {"detail": "Sessions revoked", "revoked": revoked},
+            status=status.HTTP_200_OK
+        )
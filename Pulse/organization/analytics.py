@@ -0,0 +1,106 @@
+"""
+Organization analytics: headcount, span of control and depth rollups.
+
+Headcounts are grouped aggregate queries. Span of control and the headcount
+below every manager come from one pass over ``(id, supervisor, depth)``
+rows, deepest first, each employee adding its subtree to its supervisor.
+
+Results are cached under the version counters of the models they read, so
+any employee, designation or level change invalidates them.
+"""
+import statistics
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from Pulse.etags import get_versions
+from .models import Designation, Employee, Level
+
+CACHE_KEY = "pulse:org-analytics:{}"
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def headcount_by_designation():
+    rows = (
+        Employee.objects.values("designation", "designation__title")
+        .annotate(headcount=Count("id"))
+        .order_by("-headcount", "designation")
+    )
+    return [
+        {"designation": row["designation"], "title": row["designation__title"],
+         "headcount": row["headcount"]}
+        for row in rows
+    ]
+
+
+def headcount_by_level():
+    rows = (
+        Employee.objects.values("level", "level__level")
+        .annotate(headcount=Count("id"))
+        .order_by("level__level", "level")
+    )
+    return [
+        {"level": row["level"], "rank": row["level__level"], "headcount": row["headcount"]}
+        for row in rows
+    ]
+
+
+def headcount_by_depth():
+    rows = Employee.objects.values("depth").annotate(headcount=Count("id")).order_by("depth")
+    return [{"depth": row["depth"], "headcount": row["headcount"]} for row in rows]
+
+
+def rollups():
+    """
+    Direct and total reports of every employee that has reports, largest
+    organization first.
+    """
+    rows = Employee.objects.values_list("pk", "supervisor_id", "depth").order_by("-depth")
+    direct, total = {}, {}
+    for pk, supervisor_id, _ in rows:
+        if supervisor_id is not None:
+            direct[supervisor_id] = direct.get(supervisor_id, 0) + 1
+            total[supervisor_id] = total.get(supervisor_id, 0) + 1 + total.get(pk, 0)
+    return sorted(
+        (
+            {"employee": pk, "direct_reports": count, "total_reports": total[pk]}
+            for pk, count in direct.items()
+        ),
+        key=lambda row: (-row["total_reports"], row["employee"]),
+    )
+
+
+def span_of_control(managers):
+    spans = [row["direct_reports"] for row in managers]
+    return {
+        "managers": len(spans),
+        "average": round(statistics.fmean(spans), 2) if spans else 0.0,
+        "median": statistics.median(spans) if spans else 0,
+        "max": max(spans, default=0),
+    }
+
+
+def compute():
+    managers = rollups()
+    by_depth = headcount_by_depth()
+    return {
+        "headcount": sum(row["headcount"] for row in by_depth),
+        "depth": by_depth[-1]["depth"] + 1 if by_depth else 0,
+        "by_designation": headcount_by_designation(),
+        "by_level": headcount_by_level(),
+        "by_depth": by_depth,
+        "span_of_control": span_of_control(managers),
+        "managers": managers,
+    }
+
+
+def organization_analytics():
+    """
+    The cached analytics for the current state of the organization.
+    """
+    key = CACHE_KEY.format(":".join(map(str, get_versions([Employee, Designation, Level]))))
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result, CACHE_TIMEOUT)
+    return result
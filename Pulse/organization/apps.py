@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class OrganizationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'organization'
+
+    def ready(self):
+        from Pulse.etags import track_versions
+        from . import signals  # noqa: F401
+        from .models import Designation, Employee, Level
+
+        track_versions(Employee, Designation, Level)
@@ -0,0 +1,134 @@
+"""
+Materialized path index for the employee supervisor tree.
+
+Every employee stores ``path``, the ids from the root of its tree down to
+itself (``"1/5/12/"``), and ``depth``, the number of supervisors above it.
+A subtree is then the paths starting with its root's path and the
+management chain is the ids in one row's path, so both are answered with a
+single indexed query.
+
+Paths are kept current by the signal handlers in ``organization.signals``.
+Moving an employee rewrites the paths of its whole subtree with one
+``UPDATE``. Writes that bypass signals (``bulk_create``, ``update()``) have
+to call ``rebuild`` or ``move`` themselves; both bump the Employee version,
+which the ETags and the cached analytics are keyed on.
+"""
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, Substr
+
+from Pulse.etags import bump_version
+
+SEPARATOR = "/"
+
+
+def below(path):
+    """
+    ``Q`` matching the paths strictly below ``path``; nothing for an
+    employee without a path yet.
+    """
+    if not path:
+        return Q(pk__in=[])
+    if connection.vendor == "sqlite":
+        # SQLite's LIKE cannot use the index, so the prefix is a range there:
+        # under its byte-order comparison "0" sorts right after the separator
+        return Q(path__gt=path, path__lt=path[: -len(SEPARATOR)] + "0")
+    # Other collations need not order "/" and "0" that way; LIKE 'path%'
+    # uses the varchar_pattern_ops index Django adds for db_index fields
+    return Q(path__startswith=path) & ~Q(path=path)
+
+
+def descendants(queryset, employee, depth=None):
+    """
+    Filter ``queryset`` to the employees below ``employee``, at most
+    ``depth`` levels down when given.
+    """
+    queryset = queryset.filter(below(employee.path))
+    if depth is not None:
+        queryset = queryset.filter(depth__lte=employee.depth + depth)
+    return queryset
+
+
+def ancestor_ids(employee):
+    """
+    Ids of the supervisors of ``employee``, root first.
+    """
+    return [int(pk) for pk in employee.path.split(SEPARATOR)[:-2]]
+
+
+def is_descendant(employee, candidate):
+    """
+    True when ``candidate`` is ``employee`` or anywhere below it.
+    """
+    if candidate.pk == employee.pk:
+        return True
+    return bool(employee.path) and candidate.path.startswith(employee.path)
+
+
+def path_for(supervisor, pk):
+    prefix = supervisor.path if supervisor is not None else ""
+    return f"{prefix}{pk}{SEPARATOR}"
+
+
+def move(model, old_path, new_path):
+    """
+    Re-root the subtree stored under ``old_path`` at ``new_path`` with one
+    statement. Returns the number of descendants updated.
+    """
+    if old_path == new_path:
+        return 0
+    delta = new_path.count(SEPARATOR) - old_path.count(SEPARATOR)
+    moved = model._default_manager.filter(below(old_path)).update(
+        path=Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+        depth=F("depth") + delta,
+    )
+    if moved:
+        bump_version(model)
+    return moved
+
+
+def rebuild(model=None, batch_size=1000):
+    """
+    Recompute every path from ``supervisor_id``. Employees caught in a
+    supervisor cycle are treated as roots. Returns the number of rows changed.
+    """
+    if model is None:
+        from .models import Employee
+
+        model = Employee
+
+    current = {}
+    rows = {}
+    for pk, supervisor_id, path in model._default_manager.values_list(
+        "pk", "supervisor_id", "path"
+    ):
+        rows[pk] = supervisor_id
+        current[pk] = path
+
+    children = {}
+    for pk, supervisor_id in rows.items():
+        children.setdefault(supervisor_id if supervisor_id in rows else None, []).append(pk)
+
+    paths = {}
+    pending = [(pk, "") for pk in children.get(None, [])]
+    while len(paths) < len(rows):
+        if not pending:
+            # Only cycles are left; cut each at its smallest id
+            root = min(pk for pk in rows if pk not in paths)
+            pending = [(root, "")]
+        while pending:
+            pk, prefix = pending.pop()
+            if pk in paths:
+                continue
+            paths[pk] = f"{prefix}{pk}{SEPARATOR}"
+            pending.extend((child, paths[pk]) for child in children.get(pk, []))
+
+    changed = [
+        model(pk=pk, path=path, depth=path.count(SEPARATOR) - 1)
+        for pk, path in paths.items()
+        if current[pk] != path
+    ]
+    model._default_manager.bulk_update(changed, ["path", "depth"], batch_size=batch_size)
+    if changed:
+        bump_version(model)
+    return len(changed)
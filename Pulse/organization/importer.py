@@ -0,0 +1,307 @@
+"""
+Batched import of a nested employee tree.
+
+The tree is flattened into ``ImportRow`` records, parents before children,
+without recursion. Rows are then written in batches:
+
+* one query preloads the users and one the employees a batch refers to;
+* new users are inserted with ``bulk_create`` and share one password hash;
+* employees are inserted depth by depth with ``bulk_create_with_history``,
+  so every supervisor already has a primary key when its reports are written;
+* changed users and supervisor links are written with ``bulk_update``.
+
+Bulk writes bypass the signal handlers, so each batch reindexes the search
+tokens of the employees it touched and supervisor paths are rebuilt once at
+the end.
+
+With an ``ImportRun`` checkpoint every batch commits on its own together
+with the number of rows done and an ``ImportRunRow`` per row recording the
+employee it was written to. A resumed run skips the committed rows, reading
+the employee ids of their nodes back from those records with one query per
+batch; they are deleted once the run completes.
+"""
+import time
+from collections import namedtuple
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+
+from Pulse.etags import bump_version
+from . import hierarchy, search
+from .models import Employee, ImportRunRow
+
+BATCH_SIZE = 1000
+DEFAULT_PASSWORD = "InitialPassword123!"
+
+ImportRow = namedtuple(
+    "ImportRow",
+    ["key", "parent_key", "depth", "username", "email", "first_name", "last_name"],
+)
+
+
+def node_row(node, parent_key, depth):
+    """
+    Turn one JSON node into an ``ImportRow``.
+    """
+    raw_name = (node.get("name") or "").replace("\n", " ")
+    name_parts = raw_name.split()
+    email = node.get("email") or ""
+    key = str(node.get("id", ""))
+    return ImportRow(
+        key=key,
+        parent_key=parent_key,
+        depth=depth,
+        # Fallback username if email is empty
+        username=email.split("@")[0] if email else f"emp_{key[:8]}",
+        email=email,
+        first_name=name_parts[0] if name_parts else "",
+        last_name=" ".join(name_parts[1:]),
+    )
+
+
+def walk_rows(nodes, parent_key=None, depth=0):
+    """
+    Flatten a list of sibling nodes and their ``children`` into rows,
+    parents first.
+    """
+    stack = [(node, parent_key, depth) for node in reversed(nodes)]
+    while stack:
+        node, parent_key, depth = stack.pop()
+        row = node_row(node, parent_key, depth)
+        yield row
+        stack.extend(
+            (child, row.key, depth + 1) for child in reversed(node.get("children", []))
+        )
+
+
+def iter_rows(tree):
+    """
+    Flatten a nested ``{"id", "name", "email", "children"}`` tree into rows,
+    parents first. A top-level node with ``"id": "root"`` stands for the
+    company and is not imported itself.
+    """
+    if tree.get("id") == "root":
+        return walk_rows(tree.get("children", []))
+    return walk_rows([tree])
+
+
+class EmployeeImporter:
+    """
+    Writes ``ImportRow`` records in batches; see the module docstring.
+
+    ``password=None`` gives new users an unusable password. Counters for the
+    report are kept in ``self.counts``; ``on_batch`` is called with the
+    importer after every batch.
+    """
+
+    def __init__(self, password=DEFAULT_PASSWORD, batch_size=BATCH_SIZE,
+                 checkpoint=None, on_batch=None):
+        self.password_hash = make_password(password)
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.on_batch = on_batch
+        self.employee_ids = {}
+        self.skipped_keys = set()
+        self.seen_usernames = set()
+        self.skipped = []
+        self.counts = dict.fromkeys(
+            ["rows", "users_created", "users_updated", "employees_created",
+             "employees_updated", "skipped"],
+            0,
+        )
+        self.resumed_rows = 0
+        self.started = time.monotonic()
+
+    def run(self, rows):
+        rows = iter(rows)
+        if self.checkpoint is not None and self.checkpoint.rows_committed:
+            self.resume(rows, self.checkpoint.rows_committed)
+
+        while batch := list(islice(rows, self.batch_size)):
+            if self.checkpoint is None:
+                self.write_batch(batch)
+            else:
+                with transaction.atomic():
+                    self.write_batch(batch)
+                    self.record_batch(batch)
+                    self.checkpoint.rows_committed += len(batch)
+                    self.checkpoint.counts = self.counts
+                    self.checkpoint.save(update_fields=["rows_committed", "counts", "updated_at"])
+            if self.on_batch is not None:
+                self.on_batch(self)
+
+        self.finish()
+        return self.counts
+
+    def resume(self, rows, done):
+        """
+        Skip the ``done`` rows committed by an earlier run, rebuilding the
+        node to employee mapping their reports need.
+        """
+        self.counts.update(self.checkpoint.counts)
+        while done > 0:
+            batch = list(islice(rows, min(self.batch_size, done)))
+            if not batch:
+                break
+            self.replay_batch(batch)
+            done -= len(batch)
+            self.resumed_rows += len(batch)
+
+    def finish(self):
+        hierarchy.rebuild()
+        bump_version(Employee, User)
+        if self.checkpoint is not None:
+            self.checkpoint.rows.all().delete()
+            self.checkpoint.status = "completed"
+            self.checkpoint.save(update_fields=["status", "updated_at"])
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.monotonic() - self.started
+        processed = self.counts["rows"] - self.resumed_rows
+        return processed / elapsed if elapsed else 0.0
+
+    def replay_batch(self, rows):
+        recorded = {
+            key: (employee_id, username)
+            for key, employee_id, username in ImportRunRow.objects.filter(
+                run=self.checkpoint, key__in={row.key for row in rows}
+            ).values_list("key", "employee_id", "employee__user__username")
+        }
+        for row in rows:
+            employee_id, username = recorded.get(row.key, (None, None))
+            if employee_id is None or row.parent_key in self.skipped_keys:
+                self.skipped_keys.add(row.key)
+                continue
+            self.seen_usernames.add(username)
+            self.employee_ids[row.key] = employee_id
+
+    def record_batch(self, rows):
+        """
+        Record the employee every row of a batch was written to.
+        """
+        ImportRunRow.objects.bulk_create(
+            [
+                ImportRunRow(
+                    run=self.checkpoint,
+                    key=row.key,
+                    employee_id=(
+                        None if row.key in self.skipped_keys else self.employee_ids.get(row.key)
+                    ),
+                )
+                for row in rows
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+    def write_batch(self, rows):
+        users_by_email, users_by_username = self._preload_users(rows)
+        employees = self._preload_employees(users_by_email, users_by_username)
+
+        new_users, changed_users, accepted = [], [], []
+        for row in rows:
+            self.counts["rows"] += 1
+            if row.parent_key in self.skipped_keys:
+                self._skip(row, f"supervisor {row.parent_key} was skipped")
+                continue
+
+            user = self._match_user(row, users_by_email, users_by_username)
+            username = user.username if user else row.username
+            if username in self.seen_usernames:
+                self._skip(row, f"{username!r} appears more than once")
+                continue
+            if user is None:
+                if row.username in users_by_username:
+                    self._skip(row, f"username {row.username!r} is already taken")
+                    continue
+                user = User(
+                    username=row.username,
+                    email=row.email,
+                    first_name=row.first_name,
+                    last_name=row.last_name,
+                    password=self.password_hash,
+                )
+                new_users.append(user)
+            elif (user.first_name, user.last_name) != (row.first_name, row.last_name):
+                user.first_name, user.last_name = row.first_name, row.last_name
+                changed_users.append(user)
+            self.seen_usernames.add(user.username)
+            accepted.append((row, user))
+
+        User.objects.bulk_create(new_users, batch_size=self.batch_size)
+        User.objects.bulk_update(
+            changed_users, ["first_name", "last_name"], batch_size=self.batch_size
+        )
+        self.counts["users_created"] += len(new_users)
+        self.counts["users_updated"] += len(changed_users)
+
+        touched = {
+            employees[user.pk].pk for user in changed_users if user.pk in employees
+        }
+        changed_employees = []
+        for depth in sorted({row.depth for row, _ in accepted}):
+            new_employees = []
+            for row, user in accepted:
+                if row.depth != depth:
+                    continue
+                supervisor_id = self.employee_ids.get(row.parent_key)
+                employee = employees.get(user.pk)
+                if employee is None:
+                    employee = Employee(user=user, supervisor_id=supervisor_id)
+                    new_employees.append((row, employee))
+                else:
+                    if employee.supervisor_id != supervisor_id:
+                        employee.supervisor_id = supervisor_id
+                        changed_employees.append(employee)
+                    self.employee_ids[row.key] = employee.pk
+
+            bulk_create_with_history(
+                [employee for _, employee in new_employees], Employee,
+                batch_size=self.batch_size,
+            )
+            for row, employee in new_employees:
+                self.employee_ids[row.key] = employee.pk
+                touched.add(employee.pk)
+            self.counts["employees_created"] += len(new_employees)
+
+        bulk_update_with_history(
+            changed_employees, Employee, ["supervisor"], batch_size=self.batch_size
+        )
+        self.counts["employees_updated"] += len(changed_employees)
+        search.reindex(touched)
+
+    @staticmethod
+    def _match_user(row, users_by_email, users_by_username):
+        if row.email:
+            return users_by_email.get(row.email)
+        return users_by_username.get(row.username)
+
+    @staticmethod
+    def _preload_employees(users_by_email, users_by_username):
+        users = {user.pk for user in users_by_email.values()}
+        users.update(user.pk for user in users_by_username.values())
+        return {
+            employee.user_id: employee
+            for employee in Employee.objects.filter(user__in=users)
+        }
+
+    def _preload_users(self, rows):
+        emails = {row.email for row in rows if row.email}
+        usernames = {row.username for row in rows}
+        users = User.objects.filter(Q(email__in=emails) | Q(username__in=usernames))
+        users_by_email, users_by_username = {}, {}
+        for user in users:
+            if user.email:
+                users_by_email.setdefault(user.email, user)
+            users_by_username[user.username] = user
+        return users_by_email, users_by_username
+
+    def _skip(self, row, reason):
+        self.skipped_keys.add(row.key)
+        self.skipped.append((row, reason))
+        self.counts["skipped"] += 1
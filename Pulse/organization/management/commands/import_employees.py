@@ -1,8 +1,19 @@
+import hashlib
 import json
+import os
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from organization.models import Employee
-from organization.serializers import EmployeeSerializer
+from organization.importer import BATCH_SIZE, DEFAULT_PASSWORD, EmployeeImporter, iter_rows
+from organization.models import ImportRun
+from organization.streaming import iter_stream_rows
+
+
+def file_fingerprint(path, head_bytes=1024 * 1024):
+    """Size plus a hash of the first megabyte, to recognise the same file on resume."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        digest.update(f.read(head_bytes))
+    return f"{os.path.getsize(path)}:{digest.hexdigest()}"
 
 
 class Command(BaseCommand):
@@ -10,69 +21,110 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('json_file', type=str, help='Path to the json file')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Number of employees written per batch',
+        )
+        parser.add_argument(
+            '--password',
+            type=str,
+            default=DEFAULT_PASSWORD,
+            help='Initial password of new users',
+        )
+        parser.add_argument(
+            '--unusable-passwords',
+            action='store_true',
+            help='Give new users an unusable password instead',
+        )
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help='Read the file incrementally and commit every batch with a checkpoint',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue the last unfinished streaming import of this file (implies --stream)',
+        )
 
     def handle(self, *args, **options):
         file_path = options['json_file']
+        password = None if options['unusable_passwords'] else options['password']
 
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-
-            self.stdout.write(self.style.SUCCESS('Starting import...'))
-
-            with transaction.atomic():
-                self.process_node(data)
-
-            self.stdout.write(self.style.SUCCESS('Import completed successfully!'))
+            if options['stream'] or options['resume']:
+                importer = self.stream(file_path, password, options)
+            else:
+                with open(file_path, 'r') as f:
+                    data = json.load(f)
+
+                self.stdout.write(self.style.SUCCESS('Starting import...'))
+
+                importer = EmployeeImporter(password=password, batch_size=options['batch_size'])
+                with transaction.atomic():
+                    importer.run(iter_rows(data))
+
+            counts = importer.counts
+            for row, reason in importer.skipped:
+                self.stdout.write(self.style.WARNING(f"Skip {row.username}: {reason}"))
+            self.stdout.write(self.style.SUCCESS(
+                f"Import completed successfully! {counts['rows']} rows "
+                f"({importer.rows_per_second:.0f} rows/s): "
+                f"{counts['users_created']} users created, "
+                f"{counts['users_updated']} updated, "
+                f"{counts['employees_created']} employees created, "
+                f"{counts['employees_updated']} updated, "
+                f"{counts['skipped']} skipped"
+            ))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Import failed: {str(e)}'))
 
-    def process_node(self, node, supervisor_instance=None):
-        """Recursively processes JSON nodes."""
-
-        # Skip the root company node
-        if node.get('id') == 'root':
-            for child in node.get('children', []):
-                self.process_node(child, None)
-            return
-
-        # Clean name and prep data
-        raw_name = node.get('name', '').replace('\n', ' ')
-        clean_name = " ".join(raw_name.split()) # Remove extra whitespace
-        name_parts = clean_name.split()
-
-        first_name = name_parts[0] if name_parts else ""
-        last_name = " ".join(name_parts[1:]) if len(name_parts) > 1 else ""
-        email = node.get('email')
-
-        # Fallback username if email is empty
-        username = email.split('@')[0] if email else f"emp_{node['id'][:8]}"
-
-        payload = {
-            "user": {
-                "username": username,
-                "password": "InitialPassword123!", # Set a temporary password
-                "first_name": first_name,
-                "last_name": last_name,
-                "email": email
-            },
-            "supervisor": supervisor_instance.id if supervisor_instance else None
-        }
-
-        # Check if employee already exists to prevent duplicates
-        existing = Employee.objects.filter(user__email=email).first() if email else None
-
-        if existing:
-            serializer = EmployeeSerializer(existing, data=payload, partial=True)
+    def stream(self, file_path, password, options):
+        source = os.path.abspath(file_path)
+        fingerprint = file_fingerprint(source)
+
+        run = None
+        if options['resume']:
+            run = (
+                ImportRun.objects.filter(source=source, fingerprint=fingerprint)
+                .exclude(status="completed")
+                .order_by('-pk')
+                .first()
+            )
+            if run is None:
+                self.stdout.write(self.style.WARNING('Nothing to resume, starting a new import.'))
+        if run is None:
+            run = ImportRun.objects.create(
+                source=source, fingerprint=fingerprint, batch_size=options['batch_size']
+            )
         else:
-            serializer = EmployeeSerializer(data=payload)
-
-        if serializer.is_valid():
-            employee = serializer.save()
-            self.stdout.write(f"Processed: {clean_name}")
-
-            # Recurse into children
-            for child in node.get('children', []):
-                self.process_node(child, employee)
-        else:
-            self.stdout.write(self.style.WARNING(f"Skip {clean_name}: {serializer.errors}"))
+            run.status = "running"
+            run.save(update_fields=["status", "updated_at"])
+            self.stdout.write(self.style.SUCCESS(
+                f'Resuming import {run.pk} after {run.rows_committed} rows...'
+            ))
+
+        importer = EmployeeImporter(
+            password=password,
+            batch_size=options['batch_size'],
+            checkpoint=run,
+            on_batch=self.report_progress,
+        )
+        self.stdout.write(self.style.SUCCESS('Starting import...'))
+        try:
+            with open(file_path, 'r') as f:
+                importer.run(iter_stream_rows(f))
+        except Exception as e:
+            run.status = "failed"
+            run.error = str(e)
+            run.save(update_fields=["status", "error", "updated_at"])
+            raise
+        return importer
+
+    def report_progress(self, importer):
+        self.stdout.write(
+            f"Committed {importer.checkpoint.rows_committed} rows "
+            f"({importer.rows_per_second:.0f} rows/s)"
+        )
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from organization.hierarchy import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized supervisor paths of all employees"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        changed = rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated {changed} employee path(s) in {time.monotonic() - started:.2f}s"
+            )
+        )
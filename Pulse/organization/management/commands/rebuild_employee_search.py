@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from organization.search import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the employee directory search tokens"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        tokens = rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {tokens} search token(s) in {time.monotonic() - started:.2f}s"
+            )
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:52
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    from organization.hierarchy import rebuild
+
+    rebuild(apps.get_model("organization", "Employee"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0012_alter_designation_created_by_alter_level_created_by'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=1024),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0013_employee_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=1024)),
+                ('fingerprint', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('failed', 'Failed'), ('completed', 'Completed')], default='running', max_length=20)),
+                ('batch_size', models.PositiveIntegerField()),
+                ('rows_committed', models.PositiveBigIntegerField(default=0)),
+                ('counts', models.JSONField(default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
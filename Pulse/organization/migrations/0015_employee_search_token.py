@@ -0,0 +1,35 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_tokens(apps, schema_editor):
+    from organization.search import rebuild
+
+    rebuild(
+        apps.get_model("organization", "Employee"),
+        apps.get_model("organization", "EmployeeSearchToken"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0014_importrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=150)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='organization.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'employee'], name='employee_search_token_idx')],
+            },
+        ),
+        migrations.RunPython(populate_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-18 09:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0015_employee_search_token'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historicaldesignation',
+            index=models.Index(fields=['id', 'history_date', 'history_id'], name='organizatio_id_e7db85_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalemployee',
+            index=models.Index(fields=['id', 'history_date', 'history_id'], name='organizatio_id_7a7e20_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicallevel',
+            index=models.Index(fields=['id', 'history_date', 'history_id'], name='organizatio_id_b5dc2f_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.10 on 2026-10-18 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0016_history_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='employeesearchtoken',
+            name='employee_search_token_idx',
+        ),
+        migrations.AddIndex(
+            model_name='employeesearchtoken',
+            index=models.Index(fields=['token', 'employee'], name='employee_search_prefix_idx', opclasses=['varchar_pattern_ops', 'int8_ops']),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-18 10:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0017_search_token_prefix_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRunRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('employee', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='organization.employee')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='organization.importrun')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('run', 'key'), name='import_run_row_key_uniq')],
+            },
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.conf import settings
-from simple_history.models import HistoricalRecords
+
+from Pulse.history import IndexedHistoricalRecords
 
 
 class Designation(models.Model):
@@ -16,7 +17,7 @@ class Designation(models.Model):
         blank=True,
         related_name="designation_created_by",
     )
-    history = HistoricalRecords()
+    history = IndexedHistoricalRecords()
 
     def __str__(self):
         return self.title
@@ -33,7 +34,7 @@ class Level(models.Model):
         blank=True,
         related_name="levels_created",
     )
-    history = HistoricalRecords()
+    history = IndexedHistoricalRecords()
 
     def __str__(self):
         return str(f"Level - {self.level}")
@@ -67,7 +68,77 @@ class Employee(models.Model):
         related_name="report_to",
     )
 
-    history = HistoricalRecords()
+    # Materialized supervisor path, maintained by organization.hierarchy
+    path = models.CharField(max_length=1024, default="", editable=False, db_index=True)
+    depth = models.PositiveIntegerField(default=0, editable=False)
+
+    history = IndexedHistoricalRecords(excluded_fields=["path", "depth"])
 
     def __str__(self):
         return self.user.get_full_name() or self.user.username
+
+
+class EmployeeSearchToken(models.Model):
+    """
+    Normalized directory search key of an employee, see ``organization.search``.
+    """
+    employee = models.ForeignKey(
+        Employee, on_delete=models.CASCADE, related_name="search_tokens"
+    )
+    token = models.CharField(max_length=150)
+
+    class Meta:
+        indexes = [
+            # Pattern opclasses let PostgreSQL use it for LIKE 'term%' under any
+            # collation; other databases ignore them
+            models.Index(
+                fields=["token", "employee"],
+                name="employee_search_prefix_idx",
+                opclasses=["varchar_pattern_ops", "int8_ops"],
+            ),
+        ]
+
+    def __str__(self):
+        return self.token
+
+
+class ImportRun(models.Model):
+    """
+    Checkpoint of a streaming ``import_employees`` run, so an interrupted
+    import can resume after the last committed batch.
+    """
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("failed", "Failed"),
+        ("completed", "Completed"),
+    ]
+
+    source = models.CharField(max_length=1024)
+    fingerprint = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
+    batch_size = models.PositiveIntegerField()
+    rows_committed = models.PositiveBigIntegerField(default=0)
+    counts = models.JSONField(default=dict)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Import of {self.source} ({self.status}, {self.rows_committed} rows)"
+
+
+class ImportRunRow(models.Model):
+    """
+    The employee a row of an ``ImportRun`` was written to, or None when it
+    was skipped, so a resumed run links reports to the same employees.
+    """
+    run = models.ForeignKey(ImportRun, on_delete=models.CASCADE, related_name="rows")
+    key = models.CharField(max_length=255)
+    employee = models.ForeignKey(
+        Employee, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["run", "key"], name="import_run_row_key_uniq"),
+        ]
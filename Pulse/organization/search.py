@@ -0,0 +1,109 @@
+"""
+Prefix search over the employee directory.
+
+Every employee has a handful of normalized tokens in ``EmployeeSearchToken``:
+username, email and the words of the first and last name, lowercased with
+accents stripped. A query term matches an employee when it is a prefix of
+one of its tokens, which is an index range scan instead of ``icontains``
+over a join.
+
+Tokens are rewritten by the signal handlers in ``organization.signals``
+whenever an ``Employee`` or its ``User`` is saved; ``rebuild`` recomputes
+all of them.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Min, Q
+from django.db.models.functions import Length
+
+MAX_TOKEN_LENGTH = 150
+_WORD = re.compile(r"[^\W_]+")
+
+
+def normalize(value):
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return value.casefold().strip()
+
+
+def tokens_for(username, email, first_name, last_name):
+    tokens = {normalize(username), normalize(email)}
+    for name in (first_name, last_name):
+        tokens.update(_WORD.findall(normalize(name)))
+    return {token[:MAX_TOKEN_LENGTH] for token in tokens if token}
+
+
+def _prefix(term):
+    # SQLite's LIKE is case-insensitive and cannot use a plain index, so the
+    # prefix is a range there, which its byte-order comparison keeps exact.
+    # On PostgreSQL a range would depend on the collation; LIKE 'term%' uses
+    # the varchar_pattern_ops index of EmployeeSearchToken instead.
+    if connection.vendor == "sqlite":
+        return Q(token__gte=term, token__lt=term + "\U0010ffff")
+    return Q(token__startswith=term)
+
+
+def search(query, limit=10):
+    """
+    Ids of the best ``limit`` employees matching every term of ``query``,
+    employees whose matching token is shortest (closest to the term) first.
+    """
+    from .models import EmployeeSearchToken
+
+    terms = sorted({normalize(term) for term in query.split()} - {""}, key=len, reverse=True)
+    if not terms:
+        return []
+
+    matches = EmployeeSearchToken.objects.filter(_prefix(terms[0]))
+    for term in terms[1:]:
+        matches = matches.filter(
+            employee__in=EmployeeSearchToken.objects.filter(_prefix(term)).values("employee")
+        )
+    rows = (
+        matches.values("employee")
+        .annotate(best=Min(Length("token")))
+        .order_by("best", "employee")[:limit]
+    )
+    return [row["employee"] for row in rows]
+
+
+def reindex(employee_ids, employee_model=None, token_model=None):
+    """
+    Rewrite the tokens of the given employees.
+    """
+    if employee_model is None:
+        from .models import Employee, EmployeeSearchToken
+
+        employee_model, token_model = Employee, EmployeeSearchToken
+
+    employee_ids = list(employee_ids)
+    rows = employee_model._default_manager.filter(pk__in=employee_ids).values_list(
+        "pk", "user__username", "user__email", "user__first_name", "user__last_name"
+    )
+    tokens = [
+        token_model(employee_id=pk, token=token)
+        for pk, *fields in rows
+        for token in tokens_for(*fields)
+    ]
+    token_model._default_manager.filter(employee_id__in=employee_ids).delete()
+    token_model._default_manager.bulk_create(tokens, batch_size=1000)
+    return len(tokens)
+
+
+def rebuild(employee_model=None, token_model=None, batch_size=1000):
+    """
+    Recompute the tokens of every employee. Returns the number of tokens.
+    """
+    if employee_model is None:
+        from .models import Employee, EmployeeSearchToken
+
+        employee_model, token_model = Employee, EmployeeSearchToken
+
+    token_model._default_manager.all().delete()
+    ids = list(employee_model._default_manager.values_list("pk", flat=True).order_by("pk"))
+    return sum(
+        reindex(ids[start:start + batch_size], employee_model, token_model)
+        for start in range(0, len(ids), batch_size)
+    )
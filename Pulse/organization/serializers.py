@@ -1,10 +1,13 @@
 from django.db import transaction
 from django.contrib.auth.models import User
 from rest_framework import serializers
+
+from Pulse.serializers import DynamicFieldsMixin
+from . import hierarchy
 from .models import Employee, Designation, Level
 
 
-class DesignationSerializer(serializers.ModelSerializer):
+class DesignationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     history = serializers.HyperlinkedIdentityField(
         view_name="designation-history-list",
         lookup_field="pk",
@@ -32,7 +35,7 @@ class DesignationSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class DesignationHistorySerializer(serializers.ModelSerializer):
+class DesignationHistorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     history_user = serializers.StringRelatedField(read_only=True)
     history_date = serializers.DateTimeField(read_only=True)
 
@@ -51,7 +54,7 @@ class DesignationHistorySerializer(serializers.ModelSerializer):
         return obj.history_user.username if obj.history_user else None
 
 
-class LevelSerializer(serializers.ModelSerializer):
+class LevelSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     history = serializers.HyperlinkedIdentityField(
         view_name="level-history-list",
         lookup_field="pk",
@@ -79,7 +82,7 @@ class LevelSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class LevelHistorySerializer(serializers.ModelSerializer):
+class LevelHistorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     history_user = serializers.StringRelatedField(read_only=True)
     history_date = serializers.DateTimeField(read_only=True)
 
@@ -97,7 +100,7 @@ class LevelHistorySerializer(serializers.ModelSerializer):
         return obj.history_user.username if obj.history_user else None
 
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     history = serializers.HyperlinkedIdentityField(
         view_name="employee-history-list",
         lookup_field="pk",
@@ -152,7 +155,7 @@ class EmployeeSerializer(serializers.ModelSerializer):
 
     supervisor_id = serializers.PrimaryKeyRelatedField(
         queryset=Employee.objects.all(),
-        source="employee",
+        source="supervisor",
         write_only=True,
         required=False,
         allow_null=True,
@@ -173,9 +176,37 @@ class EmployeeSerializer(serializers.ModelSerializer):
             "supervisor_id",
             "history",
         )
+        expandable_fields = {
+            "user": "users.serializers.UserSerializer",
+            "designation": DesignationSerializer,
+            "level": LevelSerializer,
+            "supervisor": "organization.serializers.EmployeeSerializer",
+        }
+
+    def validate_supervisor_id(self, supervisor):
+        if (
+            supervisor is not None
+            and self.instance is not None
+            and hierarchy.is_descendant(self.instance, supervisor)
+        ):
+            raise serializers.ValidationError(
+                "An employee cannot report to themselves or to one of their reports."
+            )
+        return supervisor
+
+
+class EmployeeAutocompleteSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name="employee-detail")
+    username = serializers.CharField(source="user.username", read_only=True)
+    name = serializers.CharField(source="user.get_full_name", read_only=True)
+    email = serializers.EmailField(source="user.email", read_only=True)
+
+    class Meta:
+        model = Employee
+        fields = ("id", "url", "employee_id", "username", "name", "email")
 
 
-class EmployeeHistorySerializer(serializers.ModelSerializer):
+class EmployeeHistorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     history_user = serializers.StringRelatedField(read_only=True)
     history_date = serializers.DateTimeField(read_only=True)
 
@@ -185,3 +216,43 @@ class EmployeeHistorySerializer(serializers.ModelSerializer):
 
     def get_changed_by(self, obj):
         return obj.history_user.username if obj.history_user else None
+
+
+class DesignationHeadcountSerializer(serializers.Serializer):
+    designation = serializers.IntegerField(allow_null=True)
+    title = serializers.CharField(allow_null=True)
+    headcount = serializers.IntegerField()
+
+
+class LevelHeadcountSerializer(serializers.Serializer):
+    level = serializers.IntegerField(allow_null=True)
+    rank = serializers.IntegerField(allow_null=True)
+    headcount = serializers.IntegerField()
+
+
+class DepthHeadcountSerializer(serializers.Serializer):
+    depth = serializers.IntegerField()
+    headcount = serializers.IntegerField()
+
+
+class SpanOfControlSerializer(serializers.Serializer):
+    managers = serializers.IntegerField()
+    average = serializers.FloatField()
+    median = serializers.FloatField()
+    max = serializers.IntegerField()
+
+
+class ManagerRollupSerializer(serializers.Serializer):
+    employee = serializers.IntegerField()
+    direct_reports = serializers.IntegerField()
+    total_reports = serializers.IntegerField()
+
+
+class OrganizationAnalyticsSerializer(serializers.Serializer):
+    headcount = serializers.IntegerField()
+    depth = serializers.IntegerField(help_text="Number of levels in the deepest reporting line")
+    by_designation = DesignationHeadcountSerializer(many=True)
+    by_level = LevelHeadcountSerializer(many=True)
+    by_depth = DepthHeadcountSerializer(many=True)
+    span_of_control = SpanOfControlSerializer()
+    managers = ManagerRollupSerializer(many=True)
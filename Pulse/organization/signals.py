@@ -0,0 +1,92 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import hierarchy, search
+from .models import Employee
+
+
+@receiver(post_init, sender=Employee)
+def remember_supervisor(sender, instance, **kwargs):
+    if instance.get_deferred_fields().intersection(("supervisor_id", "path")):
+        instance._hierarchy_state = None
+    else:
+        instance._hierarchy_state = (instance.supervisor_id, instance.path)
+
+
+@receiver(pre_save, sender=Employee)
+def check_supervisor(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.pk is None:
+        return
+    # Instances loaded with deferred fields have no snapshot to diff against
+    if getattr(instance, "_hierarchy_state", None) is None:
+        instance._hierarchy_state = (
+            Employee.objects.filter(pk=instance.pk).values_list("supervisor_id", "path").first()
+        )
+    state = instance._hierarchy_state
+    if instance.supervisor_id is None or (state and state[0] == instance.supervisor_id):
+        return
+    supervisor = instance.supervisor
+    old_path = state[1] if state else ""
+    if supervisor.pk == instance.pk or (old_path and supervisor.path.startswith(old_path)):
+        raise ValueError("An employee cannot report to themselves or to one of their reports.")
+
+
+@receiver(post_save, sender=Employee)
+def update_path(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    state = getattr(instance, "_hierarchy_state", None)
+    old_supervisor, old_path = state if state and not created else (None, "")
+    if not created and old_supervisor == instance.supervisor_id and old_path:
+        return
+
+    new_path = hierarchy.path_for(instance.supervisor, instance.pk)
+    if new_path != old_path:
+        Employee.objects.filter(pk=instance.pk).update(
+            path=new_path, depth=new_path.count(hierarchy.SEPARATOR) - 1
+        )
+        if old_path:
+            hierarchy.move(Employee, old_path, new_path)
+    instance.path = new_path
+    instance.depth = new_path.count(hierarchy.SEPARATOR) - 1
+    instance._hierarchy_state = (instance.supervisor_id, new_path)
+
+
+@receiver(post_delete, sender=Employee)
+def reroot_reports(sender, instance, **kwargs):
+    # The reports were detached by SET_NULL; their subtrees become roots
+    if instance.path:
+        hierarchy.move(Employee, instance.path, "")
+
+
+SEARCH_USER_FIELDS = {"username", "email", "first_name", "last_name"}
+
+
+@receiver(post_init, sender=Employee)
+def remember_user(sender, instance, **kwargs):
+    deferred = "user_id" in instance.get_deferred_fields()
+    instance._search_user_id = None if deferred else instance.user_id
+
+
+@receiver(post_save, sender=Employee)
+def index_employee(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or instance._search_user_id != instance.user_id:
+        search.reindex([instance.pk])
+        instance._search_user_id = instance.user_id
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created:
+        return
+    # Logins only touch last_login
+    if update_fields is not None and not SEARCH_USER_FIELDS.intersection(update_fields):
+        return
+    employee_ids = list(Employee.objects.filter(user=instance).values_list("pk", flat=True))
+    if employee_ids:
+        search.reindex(employee_ids)
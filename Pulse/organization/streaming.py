@@ -0,0 +1,134 @@
+"""
+Incremental reader for nested employee JSON files.
+
+``iter_stream_rows`` walks the ``children`` arrays of the tree while reading
+the file in chunks and yields the same ``ImportRow`` records as
+``importer.iter_rows``, so memory stays flat regardless of the file size.
+
+A node is emitted as soon as its ``children`` key is reached, provided its
+``id``, ``name`` and ``email`` have been read by then (the usual key order).
+Otherwise that node's children are read into memory and walked after the
+node closes, so unusual key orders cost memory but not correctness.
+"""
+import json
+
+from .importer import node_row, walk_rows
+
+CHUNK_SIZE = 64 * 1024
+REQUIRED_KEYS = frozenset(("id", "name", "email"))
+WHITESPACE = " \t\r\n"
+
+_decoder = json.JSONDecoder()
+
+
+class _Scanner:
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=None):
+        chunk = self.fp.read(max(size or 0, self.chunk_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self):
+        """
+        Decode one complete JSON value, reading more of the file as needed.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                end = None
+            # A number that touches the end of the buffer may continue
+            if end is not None and (end < len(self.buf) or self.eof):
+                self.pos = end
+                return value
+            if not self._fill(len(self.buf) - self.pos):
+                if end is not None:
+                    self.pos = end
+                    return value
+                raise ValueError("Unexpected end of file")
+
+
+def _nodes(scanner, parent_key, depth):
+    scanner.expect("[")
+    if scanner.peek() == "]":
+        scanner.pos += 1
+        return
+    while True:
+        yield from _node(scanner, parent_key, depth)
+        if scanner.peek() == ",":
+            scanner.pos += 1
+            continue
+        scanner.expect("]")
+        return
+
+
+def _node(scanner, parent_key, depth, top=False):
+    scanner.expect("{")
+    fields = {}
+    row = None
+    buffered = None
+    first = True
+    while True:
+        if scanner.peek() == "}":
+            scanner.pos += 1
+            break
+        if not first:
+            scanner.expect(",")
+        first = False
+        key = scanner.value()
+        scanner.expect(":")
+        if key != "children":
+            fields[key] = scanner.value()
+        elif top and fields.get("id") == "root":
+            yield from _nodes(scanner, None, 0)
+        elif row is None and REQUIRED_KEYS <= fields.keys():
+            row = node_row(fields, parent_key, depth)
+            yield row
+            yield from _nodes(scanner, row.key, depth + 1)
+        else:
+            buffered = scanner.value()
+
+    if top and fields.get("id") == "root":
+        yield from walk_rows(buffered or [])
+        return
+    if row is None:
+        row = node_row(fields, parent_key, depth)
+        yield row
+    if buffered:
+        yield from walk_rows(buffered, row.key, depth + 1)
+
+
+def iter_stream_rows(fp, chunk_size=CHUNK_SIZE):
+    """
+    Yield ``ImportRow`` records from the JSON tree in the open text file ``fp``.
+    """
+    scanner = _Scanner(fp, chunk_size)
+    yield from _node(scanner, None, 0, top=True)
+    if scanner.peek():
+        raise ValueError("Unexpected data after the employee tree")
@@ -0,0 +1,182 @@
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from organization.importer import EmployeeImporter, iter_rows
+from organization.models import Employee, ImportRun, ImportRunRow
+from organization.search import search
+from organization.streaming import iter_stream_rows
+
+
+def org_tree(managers=3, reports=4):
+    return {
+        "id": "root",
+        "children": [
+            {
+                "id": "ceo",
+                "name": "Chief\nExecutive",
+                "email": "ceo@example.com",
+                "children": [
+                    {
+                        "id": f"m{i}",
+                        "name": f"Manager {i}",
+                        "email": f"manager{i}@example.com",
+                        "children": [
+                            {"id": f"e{i}-{j}", "name": f"Engineer {i} {j}", "email": ""}
+                            for j in range(reports)
+                        ],
+                    }
+                    for i in range(managers)
+                ],
+            }
+        ],
+    }
+
+
+class EmployeeImportTest(TestCase):
+
+    def test_rows_are_flattened_parents_first(self):
+        rows = list(iter_rows(org_tree(managers=1, reports=2)))
+        self.assertEqual([row.key for row in rows], ["ceo", "m0", "e0-0", "e0-1"])
+        self.assertEqual(rows[0].first_name, "Chief")
+        self.assertEqual(rows[2].username, "emp_e0-0")
+        self.assertEqual(rows[3].parent_key, "m0")
+
+    def test_import_builds_hierarchy(self):
+        counts = EmployeeImporter(batch_size=5).run(iter_rows(org_tree()))
+
+        self.assertEqual(counts["employees_created"], 16)
+        ceo = Employee.objects.get(user__username="ceo")
+        engineer = Employee.objects.get(user__username="emp_e2-3")
+        self.assertEqual(engineer.supervisor.user.username, "manager2")
+        self.assertEqual(engineer.path.split("/")[0], str(ceo.pk))
+        self.assertEqual(engineer.depth, 2)
+        # The initial password is hashed once and shared
+        self.assertEqual(User.objects.values("password").distinct().count(), 1)
+        self.assertTrue(User.objects.get(username="ceo").check_password("InitialPassword123!"))
+        self.assertEqual(search("manager engineer"), [])
+        self.assertEqual(len(search("engineer", limit=100)), 12)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def import_queries(managers):
+            Employee.objects.all().delete()
+            User.objects.all().delete()
+            with CaptureQueriesContext(connection) as ctx:
+                EmployeeImporter(batch_size=1000).run(iter_rows(org_tree(managers=managers)))
+            return len(ctx.captured_queries)
+
+        # Both sizes stay below SQLite's limit of bound parameters per INSERT
+        self.assertEqual(import_queries(2), import_queries(8))
+
+    def test_reimport_updates_in_place(self):
+        EmployeeImporter(password=None).run(iter_rows(org_tree()))
+        self.assertFalse(User.objects.get(username="ceo").has_usable_password())
+
+        tree = org_tree()
+        moved = tree["children"][0]["children"][0]["children"].pop()
+        tree["children"][0]["children"][1]["children"].append(moved)
+        counts = EmployeeImporter().run(iter_rows(tree))
+
+        self.assertEqual(counts["users_created"], 0)
+        self.assertEqual(counts["employees_created"], 0)
+        self.assertEqual(counts["employees_updated"], 1)
+        self.assertEqual(Employee.objects.count(), 16)
+        self.assertEqual(
+            Employee.objects.get(user__username="emp_e0-3").supervisor.user.username,
+            "manager1",
+        )
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(org_tree(), f)
+        self.addCleanup(os.unlink, f.name)
+
+        out = io.StringIO()
+        call_command("import_employees", f.name, "--batch-size", "4", stdout=out)
+        self.assertIn("16 employees created", out.getvalue())
+        self.assertEqual(Employee.objects.filter(supervisor__isnull=True).count(), 1)
+
+
+class StreamingImportTest(TestCase):
+
+    def test_stream_matches_in_memory_walk(self):
+        tree = org_tree()
+        # Key order where children come before the email of a node
+        tree["children"][0]["children"][1] = {
+            "children": tree["children"][0]["children"][1]["children"],
+            "id": "m1", "name": "Manager 1", "email": "manager1@example.com",
+        }
+        text = json.dumps(tree, indent=2)
+        expected = list(iter_rows(json.loads(text)))
+
+        self.assertEqual(list(iter_stream_rows(io.StringIO(text), chunk_size=7)), expected)
+
+        with self.assertRaises(ValueError):
+            list(iter_stream_rows(io.StringIO(text[:-20])))
+
+    def test_resume_after_failure(self):
+        rows = list(iter_rows(org_tree()))
+
+        def interrupted():
+            yield from rows[:10]
+            raise RuntimeError("connection lost")
+
+        run = ImportRun.objects.create(source="org.json", fingerprint="x", batch_size=4)
+        with self.assertRaises(RuntimeError):
+            EmployeeImporter(batch_size=4, checkpoint=run).run(interrupted())
+
+        run.refresh_from_db()
+        self.assertEqual(run.rows_committed, 8)
+        self.assertEqual(Employee.objects.count(), 8)
+
+        counts = EmployeeImporter(batch_size=4, checkpoint=run).run(iter(rows))
+        self.assertEqual(counts["rows"], 16)
+        self.assertEqual(counts["employees_created"], 16)
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(
+            Employee.objects.get(user__username="emp_e2-3").supervisor.user.username,
+            "manager2",
+        )
+
+    def test_resume_keeps_the_skips_of_the_earlier_run(self):
+        tree = org_tree()
+        # Skipped as a repeat of manager0, and so are its reports
+        tree["children"][0]["children"][1]["email"] = "manager0@example.com"
+        rows = list(iter_rows(tree))
+
+        def interrupted():
+            yield from rows[:8]
+            raise RuntimeError("connection lost")
+
+        run = ImportRun.objects.create(source="org.json", fingerprint="x", batch_size=4)
+        with self.assertRaises(RuntimeError):
+            EmployeeImporter(batch_size=4, checkpoint=run).run(interrupted())
+        self.assertEqual(run.rows.filter(employee__isnull=True).count(), 2)
+
+        EmployeeImporter(batch_size=4, checkpoint=run).run(iter(rows))
+        manager = Employee.objects.get(user__username="manager0")
+        self.assertEqual(manager.report_to.count(), 4)
+        self.assertFalse(Employee.objects.filter(user__username="emp_e1-3").exists())
+        self.assertFalse(ImportRunRow.objects.exists())
+
+    def test_stream_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(org_tree(), f)
+        self.addCleanup(os.unlink, f.name)
+
+        out = io.StringIO()
+        call_command("import_employees", f.name, "--stream", "--batch-size", "5", stdout=out)
+        self.assertIn("Committed 15 rows", out.getvalue())
+        self.assertIn("16 employees created", out.getvalue())
+        self.assertEqual(ImportRun.objects.get().status, "completed")
+
+        out = io.StringIO()
+        call_command("import_employees", f.name, "--resume", stdout=out)
+        self.assertIn("Nothing to resume", out.getvalue())
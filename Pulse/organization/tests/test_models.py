@@ -28,3 +28,55 @@ class EmployeeModelTest(TestCase):
         )
 
         self.assertEqual(employee.supervisor, supervisor)
+
+
+class EmployeeHierarchyTest(TestCase):
+
+    def make(self, name, supervisor=None):
+        return Employee.objects.create(
+            user=User.objects.create_user(username=name),
+            supervisor=supervisor,
+        )
+
+    def setUp(self):
+        self.vp = self.make('vp')
+        self.manager = self.make('manager', self.vp)
+        self.engineer = self.make('engineer', self.manager)
+        self.other = self.make('other')
+
+    def paths(self):
+        return dict(Employee.objects.values_list('user__username', 'path'))
+
+    def test_paths_follow_supervisor(self):
+        self.assertEqual(self.engineer.path, f'{self.vp.pk}/{self.manager.pk}/{self.engineer.pk}/')
+        self.assertEqual(self.engineer.depth, 2)
+
+    def test_moving_an_employee_moves_its_subtree(self):
+        self.manager.supervisor = self.other
+        self.manager.save()
+
+        self.assertEqual(
+            self.paths()['engineer'],
+            f'{self.other.pk}/{self.manager.pk}/{self.engineer.pk}/',
+        )
+        self.assertEqual(Employee.objects.get(pk=self.engineer.pk).depth, 2)
+
+    def test_cannot_report_to_own_subtree(self):
+        self.vp.supervisor = self.engineer
+        with self.assertRaises(ValueError):
+            self.vp.save()
+
+    def test_deleting_a_supervisor_reroots_reports(self):
+        self.manager.delete()
+
+        engineer = Employee.objects.get(pk=self.engineer.pk)
+        self.assertIsNone(engineer.supervisor_id)
+        self.assertEqual((engineer.path, engineer.depth), (f'{engineer.pk}/', 0))
+
+    def test_rebuild_restores_paths(self):
+        from organization.hierarchy import rebuild
+
+        expected = self.paths()
+        Employee.objects.update(path='', depth=0)
+        self.assertEqual(rebuild(), 4)
+        self.assertEqual(self.paths(), expected)
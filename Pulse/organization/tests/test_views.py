@@ -1,3 +1,6 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth.models import User
@@ -36,3 +39,299 @@ class EmployeeAPITest(APITestCase):
         self.client.logout()
         response = self.client.get('/api/v1/organization/employees/')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_list_employees_query_count_is_constant(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get('/api/v1/organization/employees/', {'limit': 100})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        single = count_queries()
+        for i in range(20):
+            Employee.objects.create(
+                user=User.objects.create_user(username=f'report{i}'),
+                supervisor=self.employee,
+            )
+        self.assertEqual(count_queries(), single)
+
+    def test_list_employees_compact_fields(self):
+        response = self.client.get(
+            '/api/v1/organization/employees/',
+            {'repr': 'compact', 'fields': 'id,user,supervisor'},
+        )
+        self.assertEqual(
+            response.data['results'],
+            [{'id': self.employee.id, 'user': self.user.id, 'supervisor': None}],
+        )
+
+
+class EmployeeHierarchyAPITest(APITestCase):
+
+    def setUp(self):
+        def make(name, supervisor=None):
+            return Employee.objects.create(
+                user=User.objects.create_user(username=name, password='pass123'),
+                supervisor=supervisor,
+            )
+
+        self.vp = make('vp')
+        self.managers = [make(f'manager{i}', self.vp) for i in range(2)]
+        self.engineers = [make(f'engineer{i}', self.managers[i % 2]) for i in range(4)]
+        self.client.login(username='vp', password='pass123')
+
+    def ids(self, response):
+        return [row['id'] for row in response.data['results']]
+
+    def test_reports_by_depth(self):
+        url = f'/api/v1/organization/employees/{self.vp.pk}/reports/'
+        params = {'repr': 'compact', 'limit': 100}
+
+        response = self.client.get(url, params)
+        self.assertEqual(self.ids(response), [e.pk for e in self.managers])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {**params, 'depth': 'all'})
+        self.assertEqual(
+            self.ids(response), [e.pk for e in self.managers + self.engineers]
+        )
+        # Session, user, the employee, COUNT(*) and the subtree, whatever its size
+        self.assertEqual(len(ctx.captured_queries), 5)
+
+        response = self.client.get(url, {'depth': '0'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_chain(self):
+        engineer = self.engineers[3]
+        response = self.client.get(
+            f'/api/v1/organization/employees/{engineer.pk}/chain/', {'repr': 'compact'}
+        )
+        self.assertEqual(
+            [row['id'] for row in response.data], [self.managers[1].pk, self.vp.pk]
+        )
+
+    def test_supervisor_update_rejects_cycles(self):
+        url = f'/api/v1/organization/employees/{self.vp.pk}/'
+        response = self.client.patch(
+            url, {'supervisor_id': self.engineers[0].pk}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.patch(
+            f'/api/v1/organization/employees/{self.managers[0].pk}/',
+            {'supervisor_id': self.managers[1].pk},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            Employee.objects.get(pk=self.engineers[0].pk).depth, 3
+        )
+
+
+class EmployeeAutocompleteAPITest(APITestCase):
+
+    def setUp(self):
+        def make(username, first_name, last_name):
+            return Employee.objects.create(
+                user=User.objects.create_user(
+                    username=username,
+                    password='pass123',
+                    email=f'{username}@example.com',
+                    first_name=first_name,
+                    last_name=last_name,
+                )
+            )
+
+        self.jo = make('jo', 'Jo', 'Smith')
+        self.john = make('jsmithson', 'John', 'Smithson')
+        self.joelle = make('joelle', 'Joëlle', 'Émond')
+        self.other = make('kim', 'Kim', 'Lee')
+        self.client.login(username='kim', password='pass123')
+
+    def search(self, q, **params):
+        response = self.client.get(
+            '/api/v1/organization/employees/autocomplete/', {'q': q, **params}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data]
+
+    def test_prefix_matches_closest_first(self):
+        self.assertEqual(self.search('jo'), [self.jo.pk, self.john.pk, self.joelle.pk])
+        self.assertEqual(self.search('jo', limit=1), [self.jo.pk])
+        self.assertEqual(self.search('smith jo'), [self.jo.pk, self.john.pk])
+        self.assertEqual(self.search('EMO'), [self.joelle.pk])
+        self.assertEqual(self.search('joelle@ex'), [self.joelle.pk])
+        self.assertEqual(self.search(''), [])
+
+    def test_index_follows_user_changes(self):
+        user = self.other.user
+        user.last_name = 'Park'
+        user.save()
+
+        self.assertEqual(self.search('park'), [self.other.pk])
+        self.assertEqual(self.search('lee'), [])
+
+    def test_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.search('smith')
+        # Session, user, the token lookup and the employees
+        self.assertEqual(len(ctx.captured_queries), 4)
+
+
+class EmployeeExpandAPITest(APITestCase):
+
+    def setUp(self):
+        self.boss = Employee.objects.create(
+            user=User.objects.create_user(username='boss', password='pass123')
+        )
+        for i in range(3):
+            Employee.objects.create(
+                user=User.objects.create_user(username=f'report{i}'), supervisor=self.boss
+            )
+        self.client.login(username='boss', password='pass123')
+
+    def test_expand_supervisor_user(self):
+        response = self.client.get(
+            '/api/v1/organization/employees/',
+            {'expand': 'user,supervisor.user', 'limit': 100},
+        )
+        rows = response.data['results']
+        self.assertEqual(rows[0]['supervisor'], None)
+        self.assertEqual(rows[1]['user']['username'], 'report0')
+        self.assertEqual(rows[1]['supervisor']['user']['username'], 'boss')
+
+    def test_expand_query_count_is_constant(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(
+                    '/api/v1/organization/employees/',
+                    {'expand': 'user,designation,level,supervisor.user', 'limit': 100},
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        before = count_queries()
+        for i in range(10):
+            Employee.objects.create(
+                user=User.objects.create_user(username=f'extra{i}'), supervisor=self.boss
+            )
+        self.assertEqual(count_queries(), before)
+
+
+class OrganizationAnalyticsAPITest(APITestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        from organization.models import Designation, Level
+
+        cache.clear()
+        self.engineer = Designation.objects.create(title='Engineer')
+        self.senior = Level.objects.create(level=3, description='Senior')
+
+        def make(name, supervisor=None, **kwargs):
+            return Employee.objects.create(
+                user=User.objects.create_user(username=name, password='pass123'),
+                supervisor=supervisor,
+                **kwargs,
+            )
+
+        self.ceo = make('ceo')
+        self.vps = [make(f'vp{i}', self.ceo, level=self.senior) for i in range(2)]
+        self.engineers = [
+            make(f'eng{i}', self.vps[0], designation=self.engineer) for i in range(3)
+        ]
+        self.client.login(username='ceo', password='pass123')
+
+    def test_rollups(self):
+        data = self.client.get('/api/v1/organization/analytics/').data
+
+        self.assertEqual(data['headcount'], 6)
+        self.assertEqual(data['depth'], 3)
+        self.assertCountEqual(
+            data['by_designation'],
+            [
+                {'designation': self.engineer.pk, 'title': 'Engineer', 'headcount': 3},
+                {'designation': None, 'title': None, 'headcount': 3},
+            ],
+        )
+        self.assertIn({'level': self.senior.pk, 'rank': 3, 'headcount': 2}, data['by_level'])
+        self.assertEqual(
+            data['managers'],
+            [
+                {'employee': self.ceo.pk, 'direct_reports': 2, 'total_reports': 5},
+                {'employee': self.vps[0].pk, 'direct_reports': 3, 'total_reports': 3},
+            ],
+        )
+        self.assertEqual(data['span_of_control']['max'], 3)
+        self.assertEqual(data['span_of_control']['average'], 2.5)
+
+    def test_cached_until_an_employee_changes(self):
+        url = '/api/v1/organization/analytics/'
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        # Only the session and user lookups
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+        self.engineers[0].supervisor = self.vps[1]
+        self.engineers[0].save()
+        managers = self.client.get(url).data['managers']
+        self.assertIn(
+            {'employee': self.vps[1].pk, 'direct_reports': 1, 'total_reports': 1}, managers
+        )
+
+    def test_refreshed_after_a_bulk_move(self):
+        from organization import hierarchy
+
+        url = '/api/v1/organization/analytics/'
+        self.assertEqual(self.client.get(url).data['depth'], 3)
+
+        # Writes that bypass signals, as a bulk reassignment would
+        vp = self.vps[0]
+        Employee.objects.filter(pk=vp.pk).update(supervisor=self.vps[1])
+        hierarchy.rebuild()
+        self.assertEqual(self.client.get(url).data['depth'], 4)
+
+        new_path = hierarchy.path_for(None, vp.pk)
+        Employee.objects.filter(pk=vp.pk).update(supervisor=None, path=new_path, depth=0)
+        hierarchy.move(Employee, f'{self.vps[1].path}{vp.pk}/', new_path)
+        data = self.client.get(url).data
+        self.assertEqual(data['depth'], 2)
+        self.assertEqual(data['by_depth'], [
+            {'depth': 0, 'headcount': 2}, {'depth': 1, 'headcount': 4},
+        ])
+
+
+class EmployeeAsOfAPITest(APITestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.manager = Employee.objects.create(
+            user=User.objects.create_user(username='manager', password='pass123')
+        )
+        self.report = Employee.objects.create(
+            user=User.objects.create_user(username='report', password='pass123'),
+        )
+        self.before = timezone.now()
+        self.report.supervisor = self.manager
+        self.report.save()
+        self.client.login(username='manager', password='pass123')
+
+    def test_org_chart_as_of(self):
+        url = '/api/v1/organization/employees/'
+
+        rows = self.client.get(url, {'as_of': self.before.isoformat()}).data['results']
+        self.assertEqual(
+            [(row['id'], row['supervisor']) for row in rows],
+            [(self.manager.pk, None), (self.report.pk, None)],
+        )
+
+        rows = self.client.get(url, {'as_of': timezone.now().isoformat()}).data['results']
+        self.assertEqual(rows[1]['supervisor'], self.manager.pk)
+
+        rows = self.client.get(
+            url, {'as_of': self.before.isoformat(), 'search': 'report'}
+        ).data['results']
+        self.assertEqual([row['id'] for row in rows], [self.report.pk])
@@ -15,6 +15,7 @@ from .views import (
     LevelViewSet,
     LevelHistoryViewSet,
     DesignationHistoryViewSet,
+    OrganizationAnalyticsView,
 )
 
 
@@ -67,11 +68,13 @@ class OrganizationView(APIView):
                 "employees": request.build_absolute_uri(reverse("employee-list")),
                 "levels": request.build_absolute_uri(reverse("level-list")),
                 "designation": request.build_absolute_uri(reverse("designation-list")),
+                "analytics": request.build_absolute_uri(reverse("organization-analytics")),
             }
         )
 
 
 urlpatterns = [
     path("", OrganizationView.as_view(), name="organization-root"),
+    path("analytics/", OrganizationAnalyticsView.as_view(), name="organization-analytics"),
     path("", include(router.urls)),
 ]
@@ -1,22 +1,38 @@
+from django.contrib.auth.models import User
 from rest_framework import filters
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 
+from Pulse.eager_loading import EagerLoadingMixin
+from Pulse.etags import ConditionalGetMixin
+from Pulse.history import AsOfMixin, HistoryDiffMixin
+from Pulse.pagination import KeysetPagination
+from . import analytics, hierarchy, search
 from .models import Employee, Designation, Level
 from .serializers import (
     EmployeeSerializer,
+    EmployeeAutocompleteSerializer,
     EmployeeHistorySerializer,
     DesignationSerializer,
     DesignationHistorySerializer,
     LevelSerializer,
     LevelHistorySerializer,
+    OrganizationAnalyticsSerializer,
 )
 
 @extend_schema(tags=['Employee'])
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(AsOfMixin, ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
+    as_of_serializer_class = EmployeeHistorySerializer
+    etag_models = (Employee, User)
+    pagination_class = KeysetPagination
+    keyset_ordering = ("id",)
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -34,20 +50,80 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         "user__first_name",
         "user__last_name",
     ]
+    autocomplete_max_limit = 50
+
+    @extend_schema(responses=EmployeeAutocompleteSerializer(many=True))
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """
+        Top matches for the people picker: every word of ``?q=`` must be the
+        start of the employee's username, email, first or last name.
+        """
+        limit = request.query_params.get("limit", "10")
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValidationError({"limit": "Expected a positive integer."})
+
+        ids = search.search(
+            request.query_params.get("q", ""),
+            min(int(limit), self.autocomplete_max_limit),
+        )
+        employees = Employee.objects.select_related("user").in_bulk(ids)
+        serializer = EmployeeAutocompleteSerializer(
+            [employees[pk] for pk in ids if pk in employees],
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        return Response(serializer.data)
+
+    @extend_schema(responses=EmployeeSerializer(many=True))
+    @action(detail=True, methods=["get"])
+    def reports(self, request, pk=None):
+        """
+        Employees below this one: direct reports by default, ``?depth=N``
+        levels down, or the whole subtree with ``?depth=all``.
+        """
+        depth = request.query_params.get("depth", "1")
+        if depth == "all":
+            depth = None
+        elif depth.isdigit() and int(depth) > 0:
+            depth = int(depth)
+        else:
+            raise ValidationError({"depth": "Expected a positive integer or 'all'."})
+
+        employee = self.get_object()
+        queryset = hierarchy.descendants(self.get_queryset(), employee, depth)
+        queryset = self.filter_queryset(queryset.order_by("depth", "id"))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    @extend_schema(responses=EmployeeSerializer(many=True))
+    @action(detail=True, methods=["get"])
+    def chain(self, request, pk=None):
+        """
+        The supervisors above this employee, nearest first.
+        """
+        employee = self.get_object()
+        queryset = self.get_queryset().filter(pk__in=hierarchy.ancestor_ids(employee))
+        return Response(self.get_serializer(queryset.order_by("-depth"), many=True).data)
 
 
 @extend_schema(tags=['Employee History'])
-class EmployeeHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class EmployeeHistoryViewSet(HistoryDiffMixin, EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Employee.history.all()
     serializer_class = EmployeeHistorySerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-history_date", "-history_id")
 
     def get_queryset(self):
-        return Employee.history.filter(id=self.kwargs["employee_pk"]).order_by(
+        return super().get_queryset().filter(id=self.kwargs["employee_pk"]).order_by(
             "-history_date"
         )
 
 
 @extend_schema(tags=['Organization Designation'])
-class DesignationViewSet(viewsets.ModelViewSet):
+class DesignationViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Designation.objects.all()
     serializer_class = DesignationSerializer
     filter_backends = [
@@ -63,17 +139,20 @@ class DesignationViewSet(viewsets.ModelViewSet):
 
 
 @extend_schema(tags=['Organization Designation History'])
-class DesignationHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class DesignationHistoryViewSet(HistoryDiffMixin, EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Designation.history.all()
     serializer_class = DesignationHistorySerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-history_date", "-history_id")
 
     def get_queryset(self):
-        return Designation.history.filter(id=self.kwargs["designation_pk"]).order_by(
+        return super().get_queryset().filter(id=self.kwargs["designation_pk"]).order_by(
             "-history_date"
         )
 
 
 @extend_schema(tags=['Organization Level'])
-class LevelViewSet(viewsets.ModelViewSet):
+class LevelViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Level.objects.all()
     serializer_class = LevelSerializer
     filter_backends = [
@@ -84,10 +163,25 @@ class LevelViewSet(viewsets.ModelViewSet):
 
 
 @extend_schema(tags=['Organization Level History'])
-class LevelHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class LevelHistoryViewSet(HistoryDiffMixin, EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Level.history.all()
     serializer_class = LevelHistorySerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-history_date", "-history_id")
 
     def get_queryset(self):
-        return Level.history.filter(id=self.kwargs["level_pk"]).order_by(
+        return super().get_queryset().filter(id=self.kwargs["level_pk"]).order_by(
             "-history_date"
         )
+
+
+@extend_schema(tags=['Organization Analytics'], responses=OrganizationAnalyticsSerializer)
+class OrganizationAnalyticsView(APIView):
+    """
+    Headcount by designation, level and depth, span of control, and the
+    total headcount below every manager. Cached until an employee,
+    designation or level changes.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return Response(OrganizationAnalyticsSerializer(analytics.organization_analytics()).data)
@@ -0,0 +1,113 @@
+"""
+Task activity feed: history records and comments merged into one timeline.
+
+Both sources are read newest first with the same keyset condition and at
+most ``limit + 1`` rows each, then k-way merged with ``heapq.merge``. A page
+therefore costs one query per source no matter how deep the cursor is.
+
+Entries are ordered by ``(timestamp, kind, id)`` descending; ``kind`` breaks
+ties between a history record and a comment written in the same instant.
+"""
+import base64
+import heapq
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+from .models import Comment, Task
+
+HISTORY = "history"
+COMMENT = "comment"
+
+# Position of each kind in the tie-break; higher sorts first
+KIND_RANK = {HISTORY: 0, COMMENT: 1}
+
+
+class _Source:
+    def __init__(self, kind, queryset, timestamp_field, id_field):
+        self.kind = kind
+        self.queryset = queryset
+        self.timestamp_field = timestamp_field
+        self.id_field = id_field
+
+    def key(self, obj):
+        return (
+            getattr(obj, self.timestamp_field),
+            KIND_RANK[self.kind],
+            getattr(obj, self.id_field),
+        )
+
+    def before(self, position):
+        """
+        Rows whose key sorts after ``position`` in the descending feed.
+        """
+        timestamp, rank, pk = position
+        condition = Q(**{f"{self.timestamp_field}__lt": timestamp})
+        own_rank = KIND_RANK[self.kind]
+        if own_rank < rank:
+            condition |= Q(**{self.timestamp_field: timestamp})
+        elif own_rank == rank:
+            condition |= Q(**{self.timestamp_field: timestamp, f"{self.id_field}__lt": pk})
+        return condition
+
+    def rows(self, position, limit):
+        queryset = self.queryset.order_by(f"-{self.timestamp_field}", f"-{self.id_field}")
+        if position is not None:
+            queryset = queryset.filter(self.before(position))
+        return [(self.key(obj), self.kind, obj) for obj in queryset[: limit + 1]]
+
+
+def task_sources(task_id):
+    return [
+        _Source(
+            HISTORY,
+            Task.history.filter(id=task_id).select_related("history_user"),
+            "history_date",
+            "history_id",
+        ),
+        _Source(
+            COMMENT,
+            Comment.objects.filter(task_id=task_id),
+            "created_at",
+            "id",
+        ),
+    ]
+
+
+def encode_cursor(key):
+    timestamp, rank, pk = key
+    data = json.dumps([timestamp.isoformat(), rank, pk], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(encoded):
+    if not encoded:
+        return None
+    try:
+        timestamp, rank, pk = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        timestamp = parse_datetime(timestamp)
+        if timestamp is None or rank not in KIND_RANK.values() or not isinstance(pk, int):
+            raise ValueError(encoded)
+    except (TypeError, ValueError, UnicodeEncodeError):
+        raise NotFound("Invalid cursor")
+    return timestamp, rank, pk
+
+
+def task_activity(task_id, position=None, limit=10):
+    """
+    Return ``(entries, next_key)`` where entries is a list of ``(kind, obj)``
+    newest first and ``next_key`` is the key to continue from, or None.
+    """
+    merged = heapq.merge(
+        *(source.rows(position, limit) for source in task_sources(task_id)),
+        key=lambda row: row[0],
+        reverse=True,
+    )
+    page = []
+    for row in merged:
+        if len(page) == limit:
+            return [(kind, obj) for _, kind, obj in page], page[-1][0]
+        page.append(row)
+    return [(kind, obj) for _, kind, obj in page], None
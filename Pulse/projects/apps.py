@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        from Pulse.etags import track_versions
+        from . import signals  # noqa: F401
+        from .models import Comment, Project, Task
+
+        track_versions(Project, Task, Comment)
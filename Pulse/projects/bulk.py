@@ -0,0 +1,175 @@
+"""
+Set-based create/update of many tasks in one transaction.
+"""
+from django.db import transaction
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+
+from Pulse.etags import bump_version
+
+from organization.models import Employee
+from . import stats
+from .models import Project, Task
+from .serializers import TaskBulkItemSerializer
+
+
+BATCH_SIZE = 500
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BulkTaskWriter:
+    """
+    Validates a list of task rows with ``TaskSerializer`` semantics and
+    writes them with bulk inserts/updates.
+
+    Rows with an ``id`` are partial updates of that task, rows without one
+    are creates. Nothing is written unless every row is valid.
+    """
+
+    def __init__(self, items, request):
+        self.items = items
+        self.request = request
+        self.results = []
+        self.valid = []
+
+    def validate(self):
+        repeated = self._repeated_ids()
+        preloaded = self._preload()
+        instances = preloaded.pop("instances")
+        context = {"request": self.request, "preloaded": preloaded}
+
+        for index, item in enumerate(self.items):
+            if not isinstance(item, dict):
+                self.results.append({"index": index, "status": "invalid",
+                                     "errors": {"non_field_errors": ["Expected an object."]}})
+                continue
+
+            pk = item.get("id")
+            if index in repeated:
+                self.results.append({"index": index, "status": "invalid",
+                                     "errors": {"id": [f"Task {pk} is already updated "
+                                                       f"by row {repeated[index]}."]}})
+                continue
+
+            instance = None
+            if pk is not None:
+                instance = instances.get(_int_or_none(pk))
+                if instance is None:
+                    self.results.append({"index": index, "status": "invalid",
+                                         "errors": {"id": [f"Task {pk} does not exist."]}})
+                    continue
+
+            serializer = TaskBulkItemSerializer(
+                instance, data=item, partial=instance is not None, context=context
+            )
+            if serializer.is_valid():
+                self.valid.append((index, instance, serializer.validated_data))
+                self.results.append({"index": index, "status": "valid"})
+            else:
+                self.results.append({"index": index, "status": "invalid",
+                                     "errors": serializer.errors})
+
+        return all(result["status"] == "valid" for result in self.results)
+
+    def save(self):
+        creates, updates = [], []
+        assignments = {}
+        update_fields = set()
+        user = self.request.user if self.request.user.is_authenticated else None
+
+        for index, instance, data in self.valid:
+            data = dict(data)
+            assigned_to = data.pop("assigned_to", None)
+            if instance is None:
+                instance = Task(created_by=user, **data)
+                creates.append((index, instance))
+            else:
+                for attr, value in data.items():
+                    setattr(instance, attr, value)
+                update_fields.update(data)
+                updates.append((index, instance))
+            if assigned_to is not None:
+                assignments[index] = (instance, assigned_to)
+
+        with transaction.atomic():
+            if creates:
+                bulk_create_with_history(
+                    [task for _, task in creates], Task,
+                    batch_size=BATCH_SIZE, default_user=user,
+                )
+            if updates:
+                bulk_update_with_history(
+                    [task for _, task in updates], Task, sorted(update_fields),
+                    batch_size=BATCH_SIZE, default_user=user,
+                )
+            if assignments:
+                self._write_assignments(assignments.values())
+            stats.record_changes(
+                (getattr(task, "_stats_state", None), stats.task_state(task))
+                for _, task in creates + updates
+            )
+            bump_version(Task)
+
+        for index, task in creates:
+            self.results[index] = {"index": index, "status": "created", "id": task.pk}
+        for index, task in updates:
+            self.results[index] = {"index": index, "status": "updated", "id": task.pk}
+        return self.results
+
+    def _repeated_ids(self):
+        """
+        ``{index: index of the first row with the same id}`` for every row
+        that updates a task an earlier row already updates.
+        """
+        first, repeated = {}, {}
+        for index, item in enumerate(self.items):
+            if not isinstance(item, dict):
+                continue
+            pk = _int_or_none(item.get("id"))
+            if pk is None:
+                continue
+            if pk in first:
+                repeated[index] = first[pk]
+            else:
+                first[pk] = index
+        return repeated
+
+    def _preload(self):
+        task_ids, project_ids, employee_ids = set(), set(), set()
+        for item in self.items:
+            if not isinstance(item, dict):
+                continue
+            task_ids.add(_int_or_none(item.get("id")))
+            project_ids.add(_int_or_none(item.get("project_id")))
+            employee_ids.add(_int_or_none(item.get("assigned_by_id")))
+            if isinstance(item.get("assigned_to_ids"), list):
+                employee_ids.update(_int_or_none(pk) for pk in item["assigned_to_ids"])
+
+        return {
+            "instances": Task.objects.in_bulk(task_ids - {None}),
+            Project: Project.objects.in_bulk(project_ids - {None}),
+            Employee: Employee.objects.in_bulk(employee_ids - {None}),
+        }
+
+    def _write_assignments(self, assignments):
+        """
+        Replace ``assigned_to`` for the given tasks with two through-table
+        statements instead of a ``set()`` per task.
+        """
+        through = Task.assigned_to.through
+        task_ids = [task.pk for task, _ in assignments]
+        through.objects.filter(task_id__in=task_ids).delete()
+        through.objects.bulk_create(
+            [
+                through(task_id=task.pk, employee_id=employee.pk)
+                for task, employees in assignments
+                for employee in employees
+            ],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
@@ -0,0 +1,257 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.utils.timezone import now
+from simple_history.utils import bulk_create_with_history
+
+from organization.models import Employee
+from projects import stats
+from projects.models import Comment, Project, Task
+
+STATUS_WEIGHTS = {"pending": 3, "in_progress": 2, "completed": 4, "aborted": 1}
+BATCH_SIZE = 10_000
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot task/comment/history queries with and without the workload "
+        "indexes. Runs in a throwaway test database seeded with --seed-tasks, "
+        "unless --in-place measures the configured database. The 'without' pass "
+        "drops the indexes inside a rolled back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed-tasks",
+            type=int,
+            default=0,
+            help="Insert this many synthetic tasks before measuring (e.g. 1000000)",
+        )
+        parser.add_argument(
+            "--employees",
+            type=int,
+            default=200,
+            help="Number of synthetic employees to spread assignments over",
+        )
+        parser.add_argument(
+            "--random-seed",
+            type=int,
+            default=0,
+            help="Seed for the synthetic data, so runs are reproducible",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per query; the median is reported",
+        )
+        parser.add_argument(
+            "--in-place",
+            action="store_true",
+            help=(
+                "Measure the configured database instead of a throwaway one; "
+                "--seed-tasks then adds its rows there"
+            ),
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Print the query plans before and after",
+        )
+
+    def handle(self, *args, **options):
+        if options["employees"] < 1:
+            raise CommandError("--employees must be at least 1.")
+        if options["in_place"]:
+            self._benchmark(options)
+            return
+        if not options["seed_tasks"]:
+            raise CommandError(
+                "The throwaway database starts empty; give --seed-tasks, or "
+                "--in-place to measure the configured database."
+            )
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self._benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _benchmark(self, options):
+        if options["seed_tasks"]:
+            self._seed(options["seed_tasks"], options["employees"], options["random_seed"])
+
+        queries = self._workload()
+        if queries is None:
+            raise CommandError("No tasks found. Use --seed-tasks to create some first.")
+
+        indexed = self._measure(queries, options["repeat"])
+        try:
+            with connection.schema_editor() as editor:
+                for model, index in self._indexes():
+                    editor.remove_index(model, index)
+                unindexed = self._measure(queries, options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(f"{'query':<22}{'without':>12}{'with':>12}{'speedup':>10}")
+        for name in queries:
+            before, after = unindexed[name][0], indexed[name][0]
+            speedup = f"{before / after:.1f}x" if after else "-"
+            self.stdout.write(f"{name:<22}{before:>10.2f}ms{after:>10.2f}ms{speedup:>10}")
+
+        if options["explain"]:
+            for name in queries:
+                self.stdout.write(f"\n{name}\n  without: {unindexed[name][1]}")
+                self.stdout.write(f"  with:    {indexed[name][1]}")
+
+    # ---------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------
+
+    @staticmethod
+    def _indexes():
+        # The auto-created assigned_to table has no Meta.indexes; the index
+        # migration 0010 adds to it is found by its columns instead
+        through = Task.assigned_to.through
+        fields = ["employee", "task"]
+        columns = [through._meta.get_field(field).column for field in fields]
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, through._meta.db_table
+            )
+        for name, info in constraints.items():
+            if info["index"] and not info["unique"] and info["columns"] == columns:
+                yield through, models.Index(fields=fields, name=name)
+        for model in (Project, Task, Comment, Project.history.model, Task.history.model):
+            for index in model._meta.indexes:
+                yield model, index
+
+    @staticmethod
+    def _workload():
+        task = Comment.objects.order_by("pk").values_list("task_id", flat=True).first()
+        task = task or Task.objects.order_by("pk").values_list("pk", flat=True).first()
+        if task is None:
+            return None
+        project = Task.objects.filter(pk=task).values_list("project_id", flat=True).get()
+        employee = (
+            Task.assigned_to.through.objects.order_by("pk")
+            .values_list("employee_id", flat=True)
+            .first()
+        )
+        middle = Task.objects.order_by("pk")[Task.objects.count() // 2 :].first()
+
+        return {
+            "project+status": Task.objects.filter(project_id=project, status="pending"),
+            "assigned_to+status": Task.objects.filter(
+                assigned_to=employee, status="in_progress"
+            ),
+            "overdue": Task.objects.filter(
+                planned_end__lt=now().date(), status__in=stats.OPEN_STATUSES
+            ).order_by("planned_end")[:100],
+            "tasks by created_at": Task.objects.filter(
+                created_at__gte=middle.created_at
+            ).order_by("created_at", "id")[:100],
+            "task comments": Comment.objects.filter(task_id=task).order_by("created_at"),
+            "task history": Task.history.filter(id=task).order_by(
+                "-history_date", "-history_id"
+            )[:100],
+            "projects by created_at": Project.objects.order_by("created_at", "id")[:100],
+        }
+
+    @staticmethod
+    def _measure(queries, repeat):
+        results = {}
+        for name, queryset in queries.items():
+            list(queryset.all())  # warm up
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            plan = " | ".join(queryset.explain().splitlines())
+            results[name] = (statistics.median(timings), plan)
+        return results
+
+    def _seed(self, task_count, employee_count, seed):
+        rng = random.Random(seed)
+        started = time.monotonic()
+        today = now().date()
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+
+        password = make_password(None)
+        User.objects.bulk_create(
+            [User(username=f"bench-{seed}-{i}", password=password) for i in range(employee_count)],
+            ignore_conflicts=True,
+        )
+        users = User.objects.filter(username__startswith=f"bench-{seed}-")
+        Employee.objects.bulk_create(
+            [Employee(user=user) for user in users], ignore_conflicts=True
+        )
+        employees = list(
+            Employee.objects.filter(user__in=users).values_list("pk", flat=True)
+        )
+
+        projects = [
+            project.pk
+            for project in Project.objects.bulk_create(
+                [Project(name=f"Bench {seed}-{i}") for i in range(max(1, task_count // 1000))]
+            )
+        ]
+
+        through = Task.assigned_to.through
+        created = 0
+        while created < task_count:
+            size = min(BATCH_SIZE, task_count - created)
+            with transaction.atomic():
+                tasks = bulk_create_with_history(
+                    [
+                        Task(
+                            project_id=rng.choice(projects),
+                            title=f"Bench task {created + i}",
+                            status=rng.choices(statuses, weights)[0],
+                            planned_end=today + timedelta(days=rng.randint(-365, 365)),
+                        )
+                        for i in range(size)
+                    ],
+                    Task,
+                    batch_size=1000,
+                )
+                through.objects.bulk_create(
+                    [
+                        through(task_id=task.pk, employee_id=employee)
+                        for task in tasks
+                        for employee in rng.sample(employees, min(2, len(employees)))
+                    ],
+                    batch_size=1000,
+                    ignore_conflicts=True,
+                )
+                Comment.objects.bulk_create(
+                    [
+                        Comment(task_id=task.pk, created_by_id=rng.choice(employees), comment="Bench")
+                        for task in rng.sample(tasks, len(tasks) // 10)
+                    ],
+                    batch_size=1000,
+                )
+            created += size
+            self.stdout.write(f"Seeded {created}/{task_count} tasks")
+
+        stats.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {task_count} task(s) in {time.monotonic() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from projects.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-project task statistics from the task table"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        projects, due_dates = rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt stats for {projects} project(s) and {due_dates} due date(s) "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+        )
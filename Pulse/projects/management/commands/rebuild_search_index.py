@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from projects.search import SEARCH_BACKENDS, install_search_indexes
+
+
+class Command(BaseCommand):
+    help = "(Re)install the full-text search index for projects, tasks and comments"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Database alias to rebuild the index on",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor not in SEARCH_BACKENDS:
+            raise CommandError(f"No full-text search backend for '{connection.vendor}'")
+
+        # Idempotent: recreates anything missing (e.g. triggers dropped when
+        # SQLite rebuilds a table during a migration) and reindexes all rows.
+        with connection.schema_editor() as schema_editor:
+            install_search_indexes(schema_editor)
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
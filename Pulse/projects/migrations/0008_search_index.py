@@ -0,0 +1,116 @@
+from django.db import migrations
+
+# The full-text index as first installed; projects.search holds the current
+# definition, reapplied by manage.py rebuild_search_index.
+INSTALL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS projects_project_fts USING fts5("
+        "name, description, content='projects_project', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS projects_project_fts_ai AFTER INSERT ON projects_project "
+        "BEGIN INSERT INTO projects_project_fts(rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS projects_project_fts_ad AFTER DELETE ON projects_project "
+        "BEGIN INSERT INTO projects_project_fts(projects_project_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS projects_project_fts_au "
+        "AFTER UPDATE OF name, description ON projects_project "
+        "BEGIN INSERT INTO projects_project_fts(projects_project_fts, rowid, name, description) "
+        "VALUES ('delete', old.id, old.name, old.description); "
+        "INSERT INTO projects_project_fts(rowid, name, description) "
+        "VALUES (new.id, new.name, new.description); END",
+        "INSERT INTO projects_project_fts(projects_project_fts) VALUES ('rebuild')",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS projects_task_fts USING fts5("
+        "title, description, content='projects_task', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS projects_task_fts_ai AFTER INSERT ON projects_task "
+        "BEGIN INSERT INTO projects_task_fts(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS projects_task_fts_ad AFTER DELETE ON projects_task "
+        "BEGIN INSERT INTO projects_task_fts(projects_task_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS projects_task_fts_au "
+        "AFTER UPDATE OF title, description ON projects_task "
+        "BEGIN INSERT INTO projects_task_fts(projects_task_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO projects_task_fts(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END",
+        "INSERT INTO projects_task_fts(projects_task_fts) VALUES ('rebuild')",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS projects_comment_fts USING fts5("
+        "comment, content='projects_comment', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS projects_comment_fts_ai AFTER INSERT ON projects_comment "
+        "BEGIN INSERT INTO projects_comment_fts(rowid, comment) "
+        "VALUES (new.id, new.comment); END",
+        "CREATE TRIGGER IF NOT EXISTS projects_comment_fts_ad AFTER DELETE ON projects_comment "
+        "BEGIN INSERT INTO projects_comment_fts(projects_comment_fts, rowid, comment) "
+        "VALUES ('delete', old.id, old.comment); END",
+        "CREATE TRIGGER IF NOT EXISTS projects_comment_fts_au "
+        "AFTER UPDATE OF comment ON projects_comment "
+        "BEGIN INSERT INTO projects_comment_fts(projects_comment_fts, rowid, comment) "
+        "VALUES ('delete', old.id, old.comment); "
+        "INSERT INTO projects_comment_fts(rowid, comment) VALUES (new.id, new.comment); END",
+        "INSERT INTO projects_comment_fts(projects_comment_fts) VALUES ('rebuild')",
+    ],
+    "postgresql": [
+        "ALTER TABLE projects_project ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+        "CREATE INDEX IF NOT EXISTS projects_project_search_idx "
+        "ON projects_project USING GIN (search_vector)",
+        "ALTER TABLE projects_task ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+        "CREATE INDEX IF NOT EXISTS projects_task_search_idx "
+        "ON projects_task USING GIN (search_vector)",
+        "ALTER TABLE projects_comment ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(comment, '')), 'A')) STORED",
+        "CREATE INDEX IF NOT EXISTS projects_comment_search_idx "
+        "ON projects_comment USING GIN (search_vector)",
+    ],
+}
+
+UNINSTALL = {
+    "sqlite": [
+        f"DROP {kind} IF EXISTS {name}"
+        for table in ("projects_project", "projects_task", "projects_comment")
+        for kind, name in (
+            ("TRIGGER", f"{table}_fts_ai"),
+            ("TRIGGER", f"{table}_fts_ad"),
+            ("TRIGGER", f"{table}_fts_au"),
+            ("TABLE", f"{table}_fts"),
+        )
+    ],
+    "postgresql": [
+        statement
+        for table in ("projects_project", "projects_task", "projects_comment")
+        for statement in (
+            f"DROP INDEX IF EXISTS {table}_search_idx",
+            f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector",
+        )
+    ],
+}
+
+
+def install(apps, schema_editor):
+    for statement in INSTALL.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def uninstall(apps, schema_editor):
+    for statement in UNINSTALL.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_remove_comment_task_comment_task'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from projects.stats import rebuild
+
+
+def populate_stats(apps, schema_editor):
+    rebuild(
+        apps.get_model('projects', 'Task'),
+        apps.get_model('projects', 'ProjectTaskStats'),
+        apps.get_model('projects', 'ProjectDueDateStats'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectTaskStats',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_stats', serialize=False, to='projects.project')),
+                ('pending', models.IntegerField(default=0)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('aborted', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProjectDueDateStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('planned_end', models.DateField()),
+                ('open_tasks', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='due_date_stats', to='projects.project')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('project', 'planned_end'), name='unique_project_due_date')],
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+# The auto-created M2M table cannot declare Meta.indexes; this one lets
+# "tasks assigned to X" read task ids straight from the index.
+ASSIGNED_TO_INDEX = models.Index(
+    fields=["employee", "task"], name="task_assigned_to_employee_idx"
+)
+
+
+def _assigned_to_through(apps):
+    return apps.get_model("projects", "Task")._meta.get_field("assigned_to").remote_field.through
+
+
+def add_assigned_to_index(apps, schema_editor):
+    schema_editor.add_index(_assigned_to_through(apps), ASSIGNED_TO_INDEX)
+
+
+def remove_assigned_to_index(apps, schema_editor):
+    schema_editor.remove_index(_assigned_to_through(apps), ASSIGNED_TO_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0012_alter_designation_created_by_alter_level_created_by'),
+        ('projects', '0009_project_task_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['task', 'created_at'], name='comment_task_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalproject',
+            index=models.Index(fields=['id', 'history_date', 'history_id'], name='projects_hi_id_85ad47_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicaltask',
+            index=models.Index(fields=['id', 'history_date', 'history_id'], name='projects_hi_id_46124f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created_at', 'id'], name='project_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'status'], name='task_project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['created_at', 'id'], name='task_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'in_progress'])), fields=['planned_end'], name='task_open_planned_end_idx'),
+        ),
+        migrations.RunPython(add_assigned_to_index, remove_assigned_to_index),
+    ]
@@ -1,7 +1,7 @@
 from django.db import models
 from django.conf import settings
 from organization.models import Employee
-from simple_history.models import HistoricalRecords
+from Pulse.history import IndexedHistoricalRecords
 
 
 class Project(models.Model):
@@ -22,7 +22,12 @@ class Project(models.Model):
     members = models.ManyToManyField(
         Employee, related_name="project_members", blank=True
     )
-    history = HistoricalRecords()
+    history = IndexedHistoricalRecords()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="project_created_at_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -62,7 +67,19 @@ class Task(models.Model):
     ]
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
-    history = HistoricalRecords()
+    history = IndexedHistoricalRecords()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "status"], name="task_project_status_idx"),
+            models.Index(fields=["created_at", "id"], name="task_created_at_idx"),
+            # Overdue lookups only ever look at open tasks
+            models.Index(
+                fields=["planned_end"],
+                condition=models.Q(status__in=["pending", "in_progress"]),
+                name="task_open_planned_end_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.project.name})"
@@ -81,5 +98,52 @@ class Comment(models.Model):
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["task", "created_at"], name="comment_task_created_at_idx"),
+        ]
+
     def __str__(self):
         return f"Comment on {self.task}"
+
+
+class ProjectTaskStats(models.Model):
+    """
+    Denormalized task counts per project, kept current by ``projects.stats``.
+    """
+    project = models.OneToOneField(
+        Project, on_delete=models.CASCADE, primary_key=True, related_name="task_stats"
+    )
+    pending = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    aborted = models.IntegerField(default=0)
+
+    @property
+    def total(self):
+        return self.pending + self.in_progress + self.completed + self.aborted
+
+    def __str__(self):
+        return f"Task stats for project {self.project_id}"
+
+
+class ProjectDueDateStats(models.Model):
+    """
+    Number of open (pending / in progress) tasks of a project per planned
+    end date, so overdue counts are a range sum instead of a task scan.
+    """
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="due_date_stats"
+    )
+    planned_end = models.DateField()
+    open_tasks = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "planned_end"], name="unique_project_due_date"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.open_tasks} open task(s) due {self.planned_end}"
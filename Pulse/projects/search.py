@@ -0,0 +1,201 @@
+"""
+Full-text search over projects, tasks and comments.
+
+The index lives in the database and is kept current by the database itself,
+so bulk writes are covered as well as ``save()``:
+
+* SQLite: an external-content FTS5 table per model, maintained by triggers.
+* PostgreSQL: a generated ``tsvector`` column per model with a GIN index.
+
+``FullTextSearchFilter`` is a drop-in replacement for DRF's ``SearchFilter``
+that queries the index and ranks the results, falling back to the regular
+``icontains`` search when no index is installed for the model.
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+
+# db_table -> indexed columns, in weight order
+SEARCH_INDEXES = {
+    "projects_project": ("name", "description"),
+    "projects_task": ("title", "description"),
+    "projects_comment": ("comment",),
+}
+
+
+class SQLiteSearchBackend:
+    vendor = "sqlite"
+
+    def index_name(self, table):
+        return f"{table}_fts"
+
+    def install(self, schema_editor, table, columns):
+        fts = self.index_name(table)
+        cols = ", ".join(columns)
+        new = ", ".join(f"new.{c}" for c in columns)
+        old = ", ".join(f"old.{c}" for c in columns)
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{cols}, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    def uninstall(self, schema_editor, table, columns):
+        fts = self.index_name(table)
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+    def is_installed(self, connection, table):
+        return self.index_name(table) in connection.introspection.table_names()
+
+    def to_query(self, terms):
+        # Every term must match (as a prefix); quotes keep FTS5 syntax inert
+        return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+    def search(self, queryset, terms):
+        table = queryset.model._meta.db_table
+        fts = self.index_name(table)
+        query = self.to_query(terms)
+        weights = ", ".join(
+            str(float(len(SEARCH_INDEXES[table]) - i)) for i in range(len(SEARCH_INDEXES[table]))
+        )
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [query])
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({fts}, {weights}) FROM {fts} "
+                f'WHERE {fts} MATCH %s AND {fts}.rowid = "{table}"."id"',
+                [query],
+                output_field=FloatField(),
+            )
+        )
+
+
+class PostgresSearchBackend:
+    vendor = "postgresql"
+    config = "english"
+    column = "search_vector"
+
+    def index_name(self, table):
+        return f"{table}_search_idx"
+
+    def install(self, schema_editor, table, columns):
+        vector = " || ".join(
+            f"setweight(to_tsvector('{self.config}', coalesce({c}, '')), '{'ABCD'[min(i, 3)]}')"
+            for i, c in enumerate(columns)
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {self.column} tsvector "
+            f"GENERATED ALWAYS AS ({vector}) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.index_name(table)} "
+            f"ON {table} USING GIN ({self.column})"
+        )
+
+    def uninstall(self, schema_editor, table, columns):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {self.index_name(table)}")
+        schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {self.column}")
+
+    def is_installed(self, connection, table):
+        with connection.cursor() as cursor:
+            description = connection.introspection.get_table_description(cursor, table)
+        return any(col.name == self.column for col in description)
+
+    def to_query(self, terms):
+        lexemes = [word for term in terms for word in re.findall(r"\w+", term)]
+        return " & ".join(f"{word}:*" for word in lexemes)
+
+    def search(self, queryset, terms):
+        # Needs psycopg, so only imported once PostgreSQL is in use
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+        table = queryset.model._meta.db_table
+        query = self.to_query(terms)
+        if not query:
+            return queryset.none()
+        # The generated column is not a model field; referencing it keeps the
+        # match on its GIN index instead of computing vectors per row
+        vector = RawSQL(f'"{table}".{self.column}', [], output_field=SearchVectorField())
+        tsquery = SearchQuery(query, search_type="raw", config=self.config)
+        return queryset.alias(search_vector=vector).filter(
+            search_vector=tsquery
+        ).annotate(search_rank=SearchRank(vector, tsquery))
+
+
+SEARCH_BACKENDS = {
+    backend.vendor: backend
+    for backend in (SQLiteSearchBackend(), PostgresSearchBackend())
+}
+
+_installed = {}
+
+
+def get_search_backend(model, using="default"):
+    """
+    Return the backend serving ``model`` on ``using``, or None if not indexed.
+    """
+    table = model._meta.db_table
+    if table not in SEARCH_INDEXES:
+        return None
+    connection = connections[using]
+    backend = SEARCH_BACKENDS.get(connection.vendor)
+    if backend is None:
+        return None
+    key = (using, connection.settings_dict["NAME"], table)
+    if key not in _installed:
+        _installed[key] = backend.is_installed(connection, table)
+    return backend if _installed[key] else None
+
+
+def install_search_indexes(schema_editor):
+    backend = SEARCH_BACKENDS.get(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    for table, columns in SEARCH_INDEXES.items():
+        backend.install(schema_editor, table, columns)
+    _installed.clear()
+
+
+def uninstall_search_indexes(schema_editor):
+    backend = SEARCH_BACKENDS.get(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    for table, columns in SEARCH_INDEXES.items():
+        backend.uninstall(schema_editor, table, columns)
+    _installed.clear()
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``SearchFilter`` backed by the full-text index.
+
+    Results are annotated with ``search_rank`` and returned best match first
+    unless the request asks for an explicit ``ordering``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        backend = get_search_backend(queryset.model, queryset.db)
+        if backend is None:
+            return super().filter_queryset(request, queryset, view)
+
+        return backend.search(queryset, terms).order_by("-search_rank", "pk")
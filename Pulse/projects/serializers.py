@@ -1,9 +1,13 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
+
+from Pulse.serializers import DynamicFieldsMixin
 from .models import Project, Task, Comment
 from organization.models import Employee
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     task = serializers.HyperlinkedRelatedField(
         view_name="task-detail",
         read_only=True,
@@ -24,7 +28,7 @@ class CommentSerializer(serializers.ModelSerializer):
         ]
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     history = serializers.HyperlinkedIdentityField(
         view_name="project-history-list",
         lookup_field="pk",
@@ -62,13 +66,24 @@ class ProjectSerializer(serializers.ModelSerializer):
             "member_ids",
             "history",
         ]
+        expandable_fields = {
+            "members": "organization.serializers.EmployeeSerializer",
+        }
 
     def create(self, validated_data):
         validated_data["created_by"] = self.context["request"].user
         return super().create(validated_data)
 
 
-class ProjectHistorySerializer(serializers.ModelSerializer):
+class ProjectSummarySerializer(serializers.Serializer):
+    project = serializers.IntegerField()
+    total = serializers.IntegerField()
+    by_status = serializers.DictField(child=serializers.IntegerField())
+    overdue = serializers.IntegerField()
+    completion_ratio = serializers.FloatField()
+
+
+class ProjectHistorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     history_user = serializers.StringRelatedField(read_only=True)
     history_date = serializers.DateTimeField(read_only=True)
 
@@ -80,7 +95,18 @@ class ProjectHistorySerializer(serializers.ModelSerializer):
         return obj.history_user.username if obj.history_user else None
 
 
-class TaskSerializer(serializers.ModelSerializer):
+def comment_count_annotation():
+    comments = (
+        Comment.objects.filter(task=OuterRef("pk"))
+        .order_by()
+        .values("task")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(comments), 0)
+
+
+class TaskSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     history = serializers.HyperlinkedIdentityField(
         view_name="task-history-list",
         lookup_field="pk",
@@ -91,6 +117,7 @@ class TaskSerializer(serializers.ModelSerializer):
         lookup_field="pk",
         lookup_url_kwarg="task_pk",
     )
+    comment_count = serializers.SerializerMethodField()
     project = serializers.HyperlinkedRelatedField(
         view_name="project-detail", read_only=True
     )
@@ -105,6 +132,12 @@ class TaskSerializer(serializers.ModelSerializer):
     )
 
     # Write-only relation fields
+    project_id = serializers.PrimaryKeyRelatedField(
+        source="project",
+        queryset=Project.objects.all(),
+        write_only=True,
+        required=False,
+    )
     assigned_by_id = serializers.PrimaryKeyRelatedField(
         source="assigned_by",
         queryset=Employee.objects.all(),
@@ -124,6 +157,7 @@ class TaskSerializer(serializers.ModelSerializer):
         fields = [
             "url",
             "project",
+            "project_id",
             "title",
             "description",
             "planned_start",
@@ -138,15 +172,80 @@ class TaskSerializer(serializers.ModelSerializer):
             "assigned_to",
             "assigned_to_ids",
             "task_comments",
+            "comment_count",
             "history",
         ]
+        eager_loading_annotations = {"comment_count": comment_count_annotation}
+        expandable_fields = {
+            "project": ProjectSerializer,
+            "assigned_by": "organization.serializers.EmployeeSerializer",
+            "assigned_to": "organization.serializers.EmployeeSerializer",
+        }
+
+    def get_comment_count(self, obj) -> int:
+        count = getattr(obj, "comment_count", None)
+        if count is None:
+            count = obj.comments.count()
+        return count
 
     def create(self, validated_data):
         validated_data["created_by"] = self.context["request"].user
         return super().create(validated_data)
 
 
-class TaskHistorySerializer(serializers.ModelSerializer):
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves primary keys from ``context["preloaded"][model]`` when present,
+    so validating many rows does not cost one query per row.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get("preloaded", {}).get(self.queryset.model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return preloaded[int(data)]
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class TaskBulkItemSerializer(TaskSerializer):
+    """
+    One row of a bulk task request: ``TaskSerializer`` validation with
+    relation lookups served from the preloaded rows.
+    """
+
+    project_id = PreloadedPrimaryKeyRelatedField(
+        source="project",
+        queryset=Project.objects.all(),
+        write_only=True,
+        required=False,
+    )
+    assigned_by_id = PreloadedPrimaryKeyRelatedField(
+        source="assigned_by",
+        queryset=Employee.objects.all(),
+        write_only=True,
+        required=False,
+    )
+    assigned_to_ids = PreloadedPrimaryKeyRelatedField(
+        source="assigned_to",
+        many=True,
+        queryset=Employee.objects.all(),
+        write_only=True,
+        required=False,
+    )
+
+    def validate(self, attrs):
+        if self.instance is None and "project" not in attrs:
+            raise serializers.ValidationError({"project_id": "This field is required."})
+        return attrs
+
+
+class TaskHistorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     history_user = serializers.StringRelatedField(read_only=True)
     history_date = serializers.DateTimeField(read_only=True)
 
@@ -156,3 +255,28 @@ class TaskHistorySerializer(serializers.ModelSerializer):
 
     def get_changed_by(self, obj):
         return obj.history_user.username if obj.history_user else None
+
+
+class TaskActivitySerializer(serializers.Serializer):
+    """
+    Renders ``(kind, obj)`` activity entries as ``{"type", "timestamp", "data"}``
+    with the history or comment serializer matching the kind.
+    """
+
+    type = serializers.ChoiceField(choices=["history", "comment"])
+    timestamp = serializers.DateTimeField()
+    data = serializers.JSONField()
+
+    def to_representation(self, instance):
+        kind, obj = instance
+        if kind == "comment":
+            timestamp = obj.created_at
+            data = CommentSerializer(obj, context=self.context).data
+        else:
+            timestamp = obj.history_date
+            data = TaskHistorySerializer(obj, context=self.context).data
+        return {
+            "type": kind,
+            "timestamp": self.fields["timestamp"].to_representation(timestamp),
+            "data": data,
+        }
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import stats
+from .models import Task
+
+
+@receiver(post_init, sender=Task)
+def remember_task_state(sender, instance, **kwargs):
+    stats.snapshot(instance)
+
+
+@receiver(pre_save, sender=Task)
+def load_task_state(sender, instance, raw=False, **kwargs):
+    # Instances loaded with deferred fields have no snapshot to diff against
+    if raw or instance._state.adding or getattr(instance, "_stats_state", None):
+        return
+    row = (
+        Task.objects.filter(pk=instance.pk)
+        .values_list("project_id", "status", "planned_end")
+        .first()
+    )
+    instance._stats_state = stats.TaskState(*row) if row else None
+
+
+@receiver(post_save, sender=Task)
+def update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else getattr(instance, "_stats_state", None)
+    stats.record_changes([(old, stats.task_state(instance))])
+    stats.snapshot(instance)
+
+
+@receiver(post_delete, sender=Task)
+def update_stats_on_delete(sender, instance, **kwargs):
+    old = getattr(instance, "_stats_state", None) or stats.task_state(instance)
+    stats.record_changes([(old, None)])
@@ -0,0 +1,154 @@
+"""
+Incremental maintenance of the per-project task statistics.
+
+A task contributes to the counters through its ``(project_id, status,
+planned_end)`` state. Every write is reduced to a list of ``(old, new)``
+state pairs whose deltas are applied with ``F()`` updates, one statement per
+touched project or due date, inside the task write that already bumps the
+Task version. ``rebuild`` recomputes everything from scratch and bumps the
+versions of the statistics tables it rewrote.
+"""
+from collections import Counter, namedtuple
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from Pulse.etags import bump_version
+
+STATUSES = ("pending", "in_progress", "completed", "aborted")
+OPEN_STATUSES = ("pending", "in_progress")
+
+TaskState = namedtuple("TaskState", ["project_id", "status", "planned_end"])
+
+
+def task_state(task):
+    return TaskState(task.project_id, task.status, task.planned_end)
+
+
+def snapshot(task):
+    """
+    Remember the persisted state of ``task`` so the next save can diff it.
+    """
+    deferred = task.get_deferred_fields()
+    if task.pk is None or deferred.intersection(("project_id", "status", "planned_end")):
+        task._stats_state = None
+    else:
+        task._stats_state = task_state(task)
+
+
+def record_changes(changes):
+    """
+    Apply the counter deltas for an iterable of ``(old, new)`` task states;
+    either side may be None for a create or a delete.
+    """
+    from .models import ProjectDueDateStats, ProjectTaskStats
+
+    status_deltas = Counter()
+    due_deltas = Counter()
+    for old, new in changes:
+        if old == new:
+            continue
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            if state.status in STATUSES:
+                status_deltas[(state.project_id, state.status)] += sign
+            if state.status in OPEN_STATUSES and state.planned_end is not None:
+                due_deltas[(state.project_id, state.planned_end)] += sign
+
+    status_deltas = {key: delta for key, delta in status_deltas.items() if delta}
+    due_deltas = {key: delta for key, delta in due_deltas.items() if delta}
+    if not status_deltas and not due_deltas:
+        return
+
+    by_project = {}
+    for (project_id, status), delta in status_deltas.items():
+        by_project.setdefault(project_id, {})[status] = F(status) + delta
+
+    with transaction.atomic():
+        ProjectTaskStats.objects.bulk_create(
+            [ProjectTaskStats(project_id=project_id) for project_id in by_project],
+            ignore_conflicts=True,
+        )
+        for project_id, updates in by_project.items():
+            ProjectTaskStats.objects.filter(project_id=project_id).update(**updates)
+
+        ProjectDueDateStats.objects.bulk_create(
+            [
+                ProjectDueDateStats(project_id=project_id, planned_end=planned_end)
+                for project_id, planned_end in due_deltas
+            ],
+            ignore_conflicts=True,
+        )
+        for (project_id, planned_end), delta in due_deltas.items():
+            ProjectDueDateStats.objects.filter(
+                project_id=project_id, planned_end=planned_end
+            ).update(open_tasks=F("open_tasks") + delta)
+
+
+def project_summary(project_id, today=None):
+    """
+    Counts by status, overdue count and completion ratio for one project.
+    """
+    from .models import ProjectDueDateStats, ProjectTaskStats
+
+    stats = ProjectTaskStats.objects.filter(project_id=project_id).first()
+    by_status = {status: getattr(stats, status, 0) for status in STATUSES}
+    total = sum(by_status.values())
+
+    overdue = 0
+    if by_status["pending"] or by_status["in_progress"]:
+        overdue = ProjectDueDateStats.objects.filter(
+            project_id=project_id, planned_end__lt=today or date.today()
+        ).aggregate(total=Sum("open_tasks"))["total"] or 0
+
+    return {
+        "project": project_id,
+        "total": total,
+        "by_status": by_status,
+        "overdue": overdue,
+        "completion_ratio": round(by_status["completed"] / total, 4) if total else 0.0,
+    }
+
+
+def rebuild(task_model=None, stats_model=None, due_model=None):
+    """
+    Recompute all statistics from the task table. Returns the number of
+    projects and due-date rows written.
+    """
+    if task_model is None:
+        from .models import ProjectDueDateStats, ProjectTaskStats, Task
+
+        task_model, stats_model, due_model = Task, ProjectTaskStats, ProjectDueDateStats
+
+    counts = task_model.objects.values("project").annotate(
+        **{status: Count("id", filter=Q(status=status)) for status in STATUSES}
+    ).order_by()
+    due = task_model.objects.filter(
+        status__in=OPEN_STATUSES, planned_end__isnull=False
+    ).values("project", "planned_end").annotate(open_tasks=Count("id")).order_by()
+
+    with transaction.atomic():
+        stats_model.objects.all().delete()
+        due_model.objects.all().delete()
+        stats = stats_model.objects.bulk_create(
+            [
+                stats_model(project_id=row["project"], **{s: row[s] for s in STATUSES})
+                for row in counts
+            ],
+            batch_size=1000,
+        )
+        buckets = due_model.objects.bulk_create(
+            [
+                due_model(
+                    project_id=row["project"],
+                    planned_end=row["planned_end"],
+                    open_tasks=row["open_tasks"],
+                )
+                for row in due
+            ],
+            batch_size=1000,
+        )
+        bump_version(stats_model, due_model)
+    return len(stats), len(buckets)
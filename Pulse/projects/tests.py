@@ -109,4 +109,890 @@ class TestCommentAPI:
         
         response = api_client.post(url, {"comment": "Should fail"})
         assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert "Only employees can comment" in str(response.data)
\ No newline at end of file
+        assert "Only employees can comment" in str(response.data)
+
+### --- Eager Loading Tests ---
+
+@pytest.fixture
+def employees(db):
+    return [
+        Employee.objects.create(
+            user=User.objects.create_user(username=f"member{i}", password="password")
+        )
+        for i in range(3)
+    ]
+
+
+def _list_query_count(client, url, **params):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, {"limit": 100, **params})
+    assert response.status_code == status.HTTP_200_OK
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+class TestEagerLoading:
+    def _seed(self, employees, count):
+        project = Project.objects.create(name="Eager")
+        project.members.set(employees)
+        for i in range(count):
+            task = Task.objects.create(project=project, title=f"Task {i}", assigned_by=employees[0])
+            task.assigned_to.set(employees)
+        return project
+
+    def test_plan_from_serializer_fields(self):
+        from Pulse.eager_loading import build_plan
+        from .serializers import TaskSerializer, TaskHistorySerializer
+
+        plan = build_plan(TaskSerializer())
+        assert plan.select_related == set()
+        assert plan.prefetch_related == {"assigned_to"}
+
+        plan = build_plan(TaskHistorySerializer())
+        assert plan.select_related == {"history_user"}
+
+    def test_task_list_query_count_is_constant(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        url = reverse('task-list')
+
+        self._seed(employees, 5)
+        small_page = _list_query_count(api_client, url)
+        Task.objects.bulk_create(
+            Task(project_id=Task.objects.first().project_id, title=f"Bulk {i}")
+            for i in range(95)
+        )
+        for task in Task.objects.filter(title__startswith="Bulk"):
+            task.assigned_to.set(employees)
+        full_page = _list_query_count(api_client, url)
+
+        # COUNT(*), the page of tasks and one prefetch for assigned_to
+        assert small_page == full_page == 3
+
+    def test_project_list_query_count_is_constant(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        url = reverse('project-list')
+
+        self._seed(employees, 0)
+        one_project = _list_query_count(api_client, url)
+        for i in range(20):
+            Project.objects.create(name=f"Project {i}").members.set(employees)
+
+        assert _list_query_count(api_client, url) == one_project == 3
+
+    def test_nested_list_query_count_is_constant(self, api_client, employees):
+        from organization.models import Designation, Level
+
+        api_client.force_authenticate(user=employees[0].user)
+        task = Task.objects.create(project=Project.objects.create(name="Nested"), title="T")
+        objects = {
+            "project-history-list": ("project_pk", task.project),
+            "task-history-list": ("task_pk", task),
+            "employee-history-list": ("employee_pk", employees[1]),
+            "designation-history-list": ("designation_pk", Designation.objects.create(title="D")),
+            "level-history-list": ("level_pk", Level.objects.create(level=1, description="L")),
+        }
+
+        def grow(count):
+            for _, obj in objects.values():
+                while obj.history.count() < count:
+                    obj.save()
+                # Rendered as the user's username
+                obj.history.update(history_user=employees[0].user)
+            while task.comments.count() < count:
+                Comment.objects.create(task=task, created_by=employees[0], comment="C")
+
+        def query_counts():
+            counts = {
+                name: _list_query_count(api_client, reverse(name, kwargs={kwarg: obj.pk}))
+                for name, (kwarg, obj) in objects.items()
+            }
+            counts["task-comments-list"] = _list_query_count(
+                api_client, reverse("task-comments-list", kwargs={"task_pk": task.pk})
+            )
+            return counts
+
+        grow(2)
+        few = query_counts()
+        grow(20)
+        assert query_counts() == few
+
+
+### --- Keyset Pagination Tests ---
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    def _walk(self, api_client, url, params):
+        """
+        Follow ``next`` from the first page; returns the titles, the last
+        response and the number of queries of every page.
+        """
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        titles, queries = [], []
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = api_client.get(url, params)
+            queries.append(len(ctx.captured_queries))
+            assert not any(q["sql"].startswith("SELECT COUNT(") for q in ctx.captured_queries)
+            assert response.status_code == status.HTTP_200_OK
+            assert "count" not in response.data
+            titles += [row["title"] for row in response.data["results"]]
+            url, params = response.data["next"], None
+        return titles, response, queries
+
+    def test_cursor_walk_matches_ordering(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Keyset")
+        for i in range(7):
+            Task.objects.create(project=project, title=f"Task {i % 3}-{i}")
+
+        url = reverse('task-list')
+        titles, last, queries = self._walk(api_client, url, {"pagination": "cursor", "limit": 3})
+        assert titles == [t.title for t in Task.objects.order_by("created_at", "id")]
+        assert len(set(queries)) == 1
+
+        titles, last, queries = self._walk(
+            api_client, url, {"pagination": "cursor", "limit": 2, "ordering": "-title"}
+        )
+        assert titles == sorted(titles, reverse=True)
+        assert len(titles) == 7
+        assert len(set(queries)) == 1
+
+        # Walking back from the last page returns the preceding rows
+        response = api_client.get(last.data["previous"])
+        assert [row["title"] for row in response.data["results"]] == titles[-3:-1]
+
+    def test_nullable_ordering_field(self, api_client, employees):
+        from datetime import date
+
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Dates")
+        for i in range(5):
+            Task.objects.create(
+                project=project,
+                title=f"Task {i}",
+                planned_end=date(2024, 1, i + 1) if i % 2 else None,
+            )
+
+        titles, _, _ = self._walk(
+            api_client, reverse('task-list'),
+            {"pagination": "cursor", "limit": 2, "ordering": "-planned_end"},
+        )
+        assert titles == ["Task 3", "Task 1", "Task 4", "Task 2", "Task 0"]
+
+    def test_deep_pages_cost_the_same_as_the_first(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Deep")
+        Task.objects.bulk_create(Task(project=project, title=f"Task {i}") for i in range(100))
+        for task in Task.objects.all():
+            task.assigned_to.set(employees[:1])
+
+        titles, _, queries = self._walk(
+            api_client, reverse('task-list'), {"pagination": "cursor", "limit": 5}
+        )
+        assert len(titles) == 100
+        assert len(queries) == 20
+        # The 20th page runs the same queries as the first
+        assert len(set(queries)) == 1
+
+    @pytest.mark.parametrize("payload", [
+        "garbage",
+        {"o": "created_at,id", "p": 5},
+        {"o": "created_at,id", "p": [{"x": 1}, 2]},
+        {"o": "created_at,id", "p": ["notadate", 1]},
+        {"o": "created_at,id", "p": ["2024-01-01T00:00:00+00:00", "one"]},
+        {"o": "created_at,id", "p": [None]},
+        {"o": "-title,id", "p": ["a", 1]},
+        [1, 2],
+    ])
+    def test_invalid_cursor(self, api_client, employees, payload):
+        import base64
+        import json
+
+        api_client.force_authenticate(user=employees[0].user)
+        if not isinstance(payload, str):
+            payload = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        response = api_client.get(reverse('task-list'), {"cursor": payload})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+### --- Full-Text Search Tests ---
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    def test_ranked_task_search(self, api_client, employees):
+        from .search import get_search_backend
+
+        assert get_search_backend(Task) is not None
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Search")
+        Task.objects.create(project=project, title="Write docs", description="Deploy notes")
+        Task.objects.create(project=project, title="Deploy pipeline", description="CI")
+        Task.objects.create(project=project, title="Unrelated", description="Nothing here")
+
+        response = api_client.get(reverse('task-list'), {"search": "deplo"})
+        titles = [row["title"] for row in response.data["results"]]
+        assert titles == ["Deploy pipeline", "Write docs"]
+
+    def test_index_follows_updates_and_deletes(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Alpha launch")
+        url = reverse('project-list')
+
+        assert api_client.get(url, {"search": "alpha"}).data["count"] == 1
+        project.name = "Beta launch"
+        project.save()
+        assert api_client.get(url, {"search": "alpha"}).data["count"] == 0
+        assert api_client.get(url, {"search": "beta launch"}).data["count"] == 1
+
+        Project.objects.filter(pk=project.pk).delete()
+        assert api_client.get(url, {"search": "beta"}).data["count"] == 0
+
+    def test_comment_search(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        task = Task.objects.create(project=Project.objects.create(name="P"), title="T")
+        Comment.objects.create(task=task, created_by=employees[0], comment="Blocked on review")
+        Comment.objects.create(task=task, created_by=employees[0], comment="Looks good")
+
+        url = reverse('task-comments-list', kwargs={'task_pk': task.pk})
+        response = api_client.get(url, {"search": "review"})
+        assert [row["comment"] for row in response.data["results"]] == ["Blocked on review"]
+
+
+### --- Bulk Task Tests ---
+
+@pytest.mark.django_db
+class TestBulkTasks:
+    def test_bulk_create_and_update(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Bulk")
+        existing = Task.objects.create(project=project, title="Existing")
+        url = reverse('task-bulk')
+
+        rows = [
+            {"project_id": project.pk, "title": f"New {i}",
+             "assigned_by_id": employees[0].pk,
+             "assigned_to_ids": [e.pk for e in employees]}
+            for i in range(20)
+        ]
+        rows.append({"id": existing.pk, "status": "completed", "assigned_to_ids": [employees[1].pk]})
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.post(url, rows, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [r["status"] for r in response.data] == ["created"] * 20 + ["updated"]
+        assert len(ctx.captured_queries) < 20
+
+        created = Task.objects.filter(title__startswith="New")
+        assert created.count() == 20
+        assert all(t.created_by == employees[0].user for t in created)
+        assert Task.assigned_to.through.objects.filter(task__in=created).count() == 60
+        assert Task.history.filter(title__startswith="New", history_type="+").count() == 20
+
+        existing.refresh_from_db()
+        assert existing.status == "completed"
+        assert list(existing.assigned_to.all()) == [employees[1]]
+        assert existing.history.filter(history_type="~").count() == 1
+
+    def test_invalid_row_writes_nothing(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Bulk")
+        rows = [
+            {"project_id": project.pk, "title": "Fine"},
+            {"project_id": project.pk, "title": "Bad", "status": "unknown"},
+            {"title": "No project"},
+            {"id": 99999, "status": "completed"},
+        ]
+
+        response = api_client.post(reverse('task-bulk'), rows, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [r["status"] for r in response.data] == ["valid", "invalid", "invalid", "invalid"]
+        assert "status" in response.data[1]["errors"]
+        assert "project_id" in response.data[2]["errors"]
+        assert not Task.objects.exists()
+
+    def test_repeated_id_is_rejected(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        task = Task.objects.create(project=Project.objects.create(name="Bulk"), title="Once")
+        rows = [
+            {"id": task.pk, "status": "in_progress"},
+            {"id": str(task.pk), "status": "completed"},
+        ]
+
+        response = api_client.post(reverse('task-bulk'), rows, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [r["status"] for r in response.data] == ["valid", "invalid"]
+        assert response.data[1]["errors"]["id"] == [f"Task {task.pk} is already updated by row 0."]
+        task.refresh_from_db()
+        assert task.status == "pending"
+        assert task.history.count() == 1
+
+
+### --- Sparse Fieldset Tests ---
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def test_compact_representation(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Compact")
+        task = Task.objects.create(project=project, title="T", assigned_by=employees[0])
+        task.assigned_to.set(employees[:2])
+
+        response = api_client.get(reverse('task-list'), {"repr": "compact"})
+        row = response.data["results"][0]
+        assert row["id"] == task.pk
+        assert row["project"] == project.pk
+        assert row["assigned_by"] == employees[0].pk
+        assert sorted(row["assigned_to"]) == [e.pk for e in employees[:2]]
+        assert "url" not in row and "history" not in row and "task_comments" not in row
+
+    def test_fields_skip_unrequested_prefetch(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Sparse")
+        Task.objects.create(project=project, title="T").assigned_to.set(employees)
+
+        url = reverse('task-list')
+        response = api_client.get(url, {"fields": "title,status"})
+        assert response.data["results"] == [{"title": "T", "status": "pending"}]
+
+        # COUNT(*) and the page itself; assigned_to is not prefetched
+        assert _list_query_count(api_client, url, fields="title,status") == 2
+        assert _list_query_count(api_client, url, fields="title,assigned_to") == 3
+
+
+### --- Project Statistics Tests ---
+
+@pytest.mark.django_db
+class TestProjectStats:
+    def test_counters_follow_task_changes(self, api_client, employees):
+        from datetime import date, timedelta
+        from .stats import project_summary, rebuild
+
+        yesterday = date.today() - timedelta(days=1)
+        project = Project.objects.create(name="Stats")
+        late = Task.objects.create(project=project, title="Late", planned_end=yesterday)
+        Task.objects.create(project=project, title="Open")
+        done = Task.objects.create(project=project, title="Done", status="completed")
+
+        summary = project_summary(project.pk)
+        assert summary["by_status"]["pending"] == 2
+        assert summary["overdue"] == 1
+
+        late.status = "in_progress"
+        late.save()
+        assert project_summary(project.pk)["overdue"] == 1
+
+        late.status = "completed"
+        late.save()
+        Task.objects.get(pk=done.pk).delete()
+        summary = project_summary(project.pk)
+        assert summary["by_status"] == {"pending": 1, "in_progress": 0, "completed": 1, "aborted": 0}
+        assert summary["overdue"] == 0
+        assert summary["completion_ratio"] == 0.5
+
+        # Bulk writes go through the same deltas
+        api_client.force_authenticate(user=employees[0].user)
+        api_client.post(reverse('task-bulk'), [
+            {"project_id": project.pk, "title": "Bulk late", "planned_end": str(yesterday)},
+            {"id": late.pk, "status": "aborted"},
+        ], format="json")
+        incremental = project_summary(project.pk)
+        assert incremental["by_status"]["aborted"] == 1
+        assert incremental["overdue"] == 1
+
+        rebuild()
+        assert project_summary(project.pk) == incremental
+
+    def test_summary_endpoint(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Summary")
+        Task.objects.create(project=project, title="T", status="completed")
+
+        response = api_client.get(reverse('project-summary', args=[project.pk]))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["total"] == 1
+        assert response.data["completion_ratio"] == 1.0
+
+        response = api_client.get(reverse('project-summary', args=[project.pk + 1]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+### --- Conditional GET Tests ---
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_not_modified_until_a_write(self, api_client, employees):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        api_client.force_authenticate(user=employees[0].user)
+        task = Task.objects.create(project=Project.objects.create(name="ETag"), title="T")
+        url = reverse('task-detail', args=[task.pk])
+
+        etag = api_client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert len(ctx.captured_queries) == 0
+
+        task.assigned_to.add(employees[0])
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    def test_list_pages_served_from_cache(self, api_client, employees, settings):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        settings.RESPONSE_CACHE_TIMEOUT = 60
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Cached")
+        url = reverse('project-list')
+
+        first = api_client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            second = api_client.get(url)
+        assert len(ctx.captured_queries) == 0
+        assert second.data == first.data
+
+        project.name = "Renamed"
+        project.save()
+        assert api_client.get(url).data["results"][0]["name"] == "Renamed"
+
+    def test_no_etag_without_version_counters(self, api_client, employees, settings):
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        settings.RESPONSE_CACHE_TIMEOUT = 60
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Uncounted")
+        url = reverse('project-detail', args=[project.pk])
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH="*")
+        assert response.status_code == status.HTTP_200_OK
+        assert "ETag" not in response
+
+
+### --- Export Tests ---
+
+@pytest.mark.django_db
+class TestExport:
+    def test_csv_export_uses_list_filters(self, api_client, employees):
+        import csv
+        import io
+
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Export")
+        other = Project.objects.create(name="Other")
+        for i in range(5):
+            Task.objects.create(project=project, title=f"Task {i}").assigned_to.set(employees[:2])
+        Task.objects.create(project=other, title="Elsewhere")
+
+        response = api_client.get(reverse('task-export'), {"project": project.pk})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert [r["title"] for r in rows] == [f"Task {i}" for i in range(5)]
+        assert rows[0]["assigned_to"] == f"{employees[0].pk} {employees[1].pk}"
+
+    def test_ndjson_export(self, api_client, employees):
+        import json
+
+        api_client.force_authenticate(user=employees[0].user)
+        Project.objects.create(name="A").members.set(employees)
+
+        response = api_client.get(reverse('project-export'), {"file_format": "ndjson"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        record = json.loads(lines[0])
+        assert record["name"] == "A"
+        assert record["members"] == [e.pk for e in employees]
+
+        response = api_client.get(reverse('project-export'), {"file_format": "xml"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+### --- Activity Feed Tests ---
+
+@pytest.mark.django_db
+class TestTaskActivity:
+    def _timeline(self, employees):
+        task = Task.objects.create(project=Project.objects.create(name="Feed"), title="T")
+        Comment.objects.create(task=task, created_by=employees[0], comment="first")
+        task.status = "in_progress"
+        task.save()
+        Comment.objects.create(task=task, created_by=employees[1], comment="second")
+        task.status = "completed"
+        task.save()
+        return task
+
+    def test_merges_history_and_comments_newest_first(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        task = self._timeline(employees)
+        url = reverse('task-activity', args=[task.pk])
+
+        entries = []
+        response = api_client.get(url, {"limit": 2})
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data["results"]) <= 2
+            entries += response.data["results"]
+            if not response.data["next"]:
+                break
+            response = api_client.get(response.data["next"])
+
+        assert [e["type"] for e in entries] == [
+            "history", "comment", "history", "comment", "history"
+        ]
+        assert entries[0]["data"]["status"] == "completed"
+        assert entries[1]["data"]["comment"] == "second"
+        timestamps = [e["timestamp"] for e in entries]
+        assert timestamps == sorted(timestamps, reverse=True)
+
+    def test_page_query_count(self, api_client, employees):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        api_client.force_authenticate(user=employees[0].user)
+        task = self._timeline(employees)
+        url = reverse('task-activity', args=[task.pk])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(url, {"repr": "compact"})
+        assert len(response.data["results"]) == 5
+        # The task lookup and one query per source
+        assert len(ctx.captured_queries) == 3
+
+    def test_invalid_cursor_and_missing_task(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        task = self._timeline(employees)
+
+        response = api_client.get(reverse('task-activity', args=[task.pk]), {"cursor": "bogus"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = api_client.get(reverse('task-activity', args=[task.pk + 1]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_limit_is_validated_and_capped(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        url = reverse('task-activity', args=[self._timeline(employees).pk])
+
+        for limit in ("0", "-1", "abc"):
+            response = api_client.get(url, {"limit": limit})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert "limit" in response.data
+        assert len(api_client.get(url, {"limit": 1000}).data["results"]) == 5
+
+    def test_comment_count_is_annotated(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        task = self._timeline(employees)
+        Task.objects.create(project=task.project, title="Quiet")
+
+        response = api_client.get(reverse('task-list'), {"fields": "title,comment_count"})
+        counts = {row["title"]: row["comment_count"] for row in response.data["results"]}
+        assert counts == {"T": 2, "Quiet": 0}
+
+        response = api_client.get(reverse('task-detail', args=[task.pk]))
+        assert response.data["comment_count"] == 2
+
+
+### --- Index Benchmark Tests ---
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_indexes_restores_indexes():
+    import io
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    out = io.StringIO()
+    call_command(
+        "benchmark_indexes", seed_tasks=50, employees=3, repeat=1, in_place=True, stdout=out
+    )
+    assert "project+status" in out.getvalue()
+    assert "assigned_to+status" in out.getvalue()
+
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, Task._meta.db_table)
+        through = connection.introspection.get_constraints(
+            cursor, Task.assigned_to.through._meta.db_table
+        )
+    assert {"task_project_status_idx", "task_open_planned_end_idx"} <= set(constraints)
+    assert "task_assigned_to_employee_idx" in through
+
+
+def test_benchmark_indexes_needs_rows_for_a_throwaway_database():
+    from django.core.management import CommandError, call_command
+
+    with pytest.raises(CommandError):
+        call_command("benchmark_indexes")
+
+
+### --- Expand Tests ---
+
+@pytest.mark.django_db
+class TestExpand:
+    def _seed(self, employees, count):
+        project = Project.objects.get_or_create(name="Expand")[0]
+        for i in range(count):
+            task = Task.objects.create(project=project, title=f"Task {i}", assigned_by=employees[0])
+            task.assigned_to.set(employees)
+
+    def test_embeds_relations(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        self._seed(employees, 1)
+
+        response = api_client.get(
+            reverse('task-list'), {"expand": "project,assigned_to.user"}
+        )
+        row = response.data["results"][0]
+        assert row["project"]["name"] == "Expand"
+        assert [e["user"]["username"] for e in row["assigned_to"]] == [
+            "member0", "member1", "member2"
+        ]
+        # Not expanded, still a link
+        assert row["assigned_by"].startswith("http")
+
+    def test_query_count_is_constant(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        url = reverse('task-list')
+        params = {"expand": "project,assigned_to.user,assigned_by"}
+
+        self._seed(employees, 2)
+        small = _list_query_count(api_client, url, **params)
+        self._seed(employees, 20)
+        assert _list_query_count(api_client, url, **params) == small
+
+    def test_depth_limit(self, api_client, employees, settings):
+        api_client.force_authenticate(user=employees[0].user)
+        settings.EXPAND_MAX_DEPTH = 1
+
+        response = api_client.get(reverse('task-list'), {"expand": "assigned_to.user"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_expanded_models_are_part_of_the_etag(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        self._seed(employees, 1)
+        url = reverse('task-list')
+
+        etag = api_client.get(url, {"expand": "project"})["ETag"]
+        Project.objects.filter(name="Expand").get().save()
+        response = api_client.get(url, {"expand": "project"}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+
+### --- History Retention Tests ---
+
+def _prune(*args, **options):
+    import io
+
+    from django.core.management import call_command
+
+    out = io.StringIO()
+    call_command("prune_history", *args, stdout=out, **options)
+    return out.getvalue()
+
+
+@pytest.fixture
+def tracked_task(db):
+    return Task.objects.create(project=Project.objects.create(name="Retention"), title="T")
+
+
+def test_prune_history_compacts_noop_saves(tracked_task, tmp_path):
+    for _ in range(3):
+        tracked_task.save()
+    tracked_task.status = "completed"
+    tracked_task.save()
+    tracked_task.save()
+    assert tracked_task.history.count() == 6
+
+    _prune("projects.Task", archive_dir=tmp_path)
+
+    assert [row.history_type for row in tracked_task.history.order_by("history_date")] == ["+", "~"]
+    assert tracked_task.history.first().status == "completed"
+
+
+def test_prune_history_archives_old_rows(tracked_task, tmp_path):
+    import gzip
+    import json
+    from datetime import timedelta
+
+    from django.utils.timezone import now
+
+    for status_name in ("in_progress", "completed"):
+        tracked_task.status = status_name
+        tracked_task.save()
+    tracked_task.history.update(history_date=now() - timedelta(days=400))
+    latest = tracked_task.history.first()
+
+    out = _prune("projects.Task", archive_dir=tmp_path, dry_run=True)
+    assert "2 row(s) archived" in out and tracked_task.history.count() == 3
+
+    _prune("projects.Task", archive_dir=tmp_path, batch_size=1)
+
+    assert list(tracked_task.history.values_list("history_id", flat=True)) == [latest.history_id]
+    [archive] = tmp_path.glob("*.ndjson.gz")
+    with gzip.open(archive, "rt") as archive_file:
+        rows = [json.loads(line) for line in archive_file]
+    assert [row["status"] for row in rows] == ["pending", "in_progress"]
+    assert all(row["id"] == tracked_task.pk for row in rows)
+
+
+def test_prune_history_rejects_untracked_models(db):
+    from django.core.management.base import CommandError
+
+    with pytest.raises(CommandError):
+        _prune("projects.Comment")
+
+
+def test_retention_skips_apps_that_are_not_installed(settings):
+    from Pulse.history import retention_policies
+
+    settings.HISTORY_RETENTION = {
+        "projects.Task": {"days": 30},
+        "billing.Invoice": {"days": 30},
+    }
+    assert [policy.model for policy in retention_policies()] == [Task]
+    with pytest.raises(LookupError):
+        retention_policies(["billing.Invoice"])
+
+
+### --- History Diff Tests ---
+
+@pytest.mark.django_db
+class TestHistoryDiff:
+    def test_diff_lists_changed_fields_only(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        task = Task.objects.create(project=Project.objects.create(name="Diff"), title="T")
+        task.status = "in_progress"
+        task.save()
+        task.title = "Renamed"
+        task.status = "completed"
+        task.save()
+        url = reverse('task-history-list', kwargs={'task_pk': task.pk})
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(url, {"diff": "true", "limit": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        # count, page, record before the page
+        assert len(ctx.captured_queries) == 3
+        newest, middle = response.data["results"]
+        assert newest["history_type"] == "~"
+        assert newest["changes"] == {
+            "title": {"old": "T", "new": "Renamed"},
+            "status": {"old": "in_progress", "new": "completed"},
+        }
+        assert set(middle["changes"]) == {"status"}
+
+        created = api_client.get(url, {"diff": "true", "offset": 2}).data["results"][0]
+        assert created["history_type"] == "+"
+        assert created["changes"]["title"] == {"old": None, "new": "T"}
+
+    def test_snapshots_without_diff(self, api_client, employees):
+        api_client.force_authenticate(user=employees[0].user)
+        task = Task.objects.create(project=Project.objects.create(name="Diff"), title="T")
+
+        url = reverse('task-history-list', kwargs={'task_pk': task.pk})
+        [record] = api_client.get(url).data["results"]
+        assert record["title"] == "T" and "changes" not in record
+
+
+### --- As Of Tests ---
+
+@pytest.mark.django_db
+class TestAsOf:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def _backdate(self, obj, days):
+        """Move the history rows written in the last minute ``days`` back."""
+        from datetime import timedelta
+
+        from django.utils.timezone import now
+
+        obj.history.filter(history_date__gte=now() - timedelta(minutes=1)).update(
+            history_date=now() - timedelta(days=days)
+        )
+
+    def test_task_list_as_of(self, api_client, employees):
+        from datetime import date, timedelta
+
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Audit")
+        kept = Task.objects.create(project=project, title="Kept")
+        gone = Task.objects.create(project=project, title="Gone")
+        self._backdate(kept, 10)
+        self._backdate(gone, 10)
+        kept.status = "completed"
+        kept.save()
+        self._backdate(kept, 5)
+        gone.delete()
+        Task.objects.create(project=project, title="Later")
+
+        url = reverse('task-list')
+        week_ago = (date.today() - timedelta(days=7)).isoformat()
+        rows = api_client.get(url, {"as_of": week_ago}).data["results"]
+        assert {(r["title"], r["status"]) for r in rows} == {("Kept", "pending"), ("Gone", "pending")}
+
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        rows = api_client.get(url, {"as_of": yesterday, "status": "completed"}).data["results"]
+        assert [(r["title"], r["id"]) for r in rows] == [("Kept", kept.pk)]
+
+        assert api_client.get(url, {"as_of": "yesterday"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_filters_apply_or_are_rejected(self, api_client, employees):
+        from django.utils.timezone import now
+
+        api_client.force_authenticate(user=employees[0].user)
+        project = Project.objects.create(name="Audit")
+        mine = Task.objects.create(project=project, title="mine")
+        mine.assigned_to.add(employees[0])
+        Task.objects.create(project=project, title="other")
+
+        url = reverse('task-list')
+        as_of = now().isoformat()
+        rows = api_client.get(url, {"as_of": as_of, "search": "mine"}).data["results"]
+        assert [r["title"] for r in rows] == ["mine"]
+
+        # Membership changes are not recorded, so the past cannot be filtered
+        response = api_client.get(url, {"as_of": as_of, "assigned_to": employees[0].pk})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "assigned_to" in response.data
+
+    def test_past_snapshots_are_cached_until_history_is_pruned(self, api_client, employees, tmp_path):
+        import io
+
+        from django.core.management import call_command
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        api_client.force_authenticate(user=employees[0].user)
+        task = Task.objects.create(project=Project.objects.create(name="Audit"), title="T")
+        self._backdate(task, 400)
+        task.status = "completed"
+        task.save()
+        self._backdate(task, 300)
+
+        url = reverse('task-list')
+        params = {"as_of": task.history.earliest("history_date").history_date.isoformat()}
+        assert api_client.get(url, params).data["results"][0]["status"] == "pending"
+        with CaptureQueriesContext(connection) as ctx:
+            api_client.get(url, params)
+        assert not ctx.captured_queries
+
+        # Archiving the creation row changes what the past looked like
+        call_command("prune_history", "projects.Task", archive_dir=tmp_path, stdout=io.StringIO())
+        assert api_client.get(url, params).data["results"] == []
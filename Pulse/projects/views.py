@@ -1,27 +1,67 @@
-from rest_framework import filters, viewsets
+from django.shortcuts import get_object_or_404
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from drf_spectacular.utils import extend_schema
 
+from Pulse.eager_loading import EagerLoadingMixin
+from Pulse.etags import ConditionalGetMixin
+from Pulse.history import AsOfMixin, HistoryDiffMixin
+from Pulse.pagination import KeysetPagination
 from organization.models import Employee
+from . import activity, stats
+from .bulk import BulkTaskWriter
+from .export import (
+    FORMATS,
+    PROJECT_COLUMNS,
+    TASK_COLUMNS,
+    export_projects,
+    export_tasks,
+    streaming_export,
+)
 from .models import Project, Task, Comment
+from .search import FullTextSearchFilter
 from .serializers import (
     TaskSerializer,
     TaskHistorySerializer,
     ProjectSerializer,
     ProjectHistorySerializer,
+    ProjectSummarySerializer,
     CommentSerializer,
+    TaskActivitySerializer,
 )
 
 
+def _export(view, request, queryset, prepare, columns, filename):
+    """
+    Stream ``queryset`` filtered like the view's list, as CSV or NDJSON.
+    """
+    file_format = request.query_params.get("file_format", "csv")
+    if file_format not in FORMATS:
+        raise ValidationError({"file_format": f"Expected one of: {', '.join(FORMATS)}."})
+
+    queryset = prepare(view.filter_queryset(queryset))
+    if not queryset.query.order_by:
+        queryset = queryset.order_by("pk")
+    return streaming_export(queryset, columns, file_format, filename)
+
+
 @extend_schema(tags=["Project"])
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(AsOfMixin, ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
+    as_of_serializer_class = ProjectHistorySerializer
+    etag_models = (Project, Employee)
+    pagination_class = KeysetPagination
+    keyset_ordering = ("created_at", "id")
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
         filters.OrderingFilter,
     ]
 
@@ -48,25 +88,56 @@ class ProjectViewSet(viewsets.ModelViewSet):
         "created_at",
     ]
 
+    @extend_schema(responses=ProjectSummarySerializer)
+    @action(detail=True, methods=["get"])
+    def summary(self, request, pk=None):
+        """
+        Task counts by status, overdue tasks and completion ratio, read from
+        the denormalized statistics tables.
+        """
+        if not str(pk).isdigit():
+            raise NotFound()
+        summary = stats.project_summary(int(pk))
+        if not summary["total"] and not Project.objects.filter(pk=pk).exists():
+            raise NotFound()
+        return Response(ProjectSummarySerializer(summary).data)
+
+    @extend_schema(responses={(200, "text/csv"): bytes, (200, "application/x-ndjson"): bytes})
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream all matching projects; ``?file_format=csv`` (default) or ``ndjson``.
+        """
+        return _export(
+            self, request, Project.objects.all(), export_projects, PROJECT_COLUMNS, "projects"
+        )
+
 
 @extend_schema(tags=["Project History"])
-class ProjectHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class ProjectHistoryViewSet(HistoryDiffMixin, EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Project.history.all()
     serializer_class = ProjectHistorySerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-history_date", "-history_id")
 
     def get_queryset(self):
-        return Project.history.filter(id=self.kwargs["project_pk"]).order_by(
+        return super().get_queryset().filter(id=self.kwargs["project_pk"]).order_by(
             "-history_date"
         )
 
 
 @extend_schema(tags=["Task"])
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(AsOfMixin, ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    as_of_serializer_class = TaskHistorySerializer
+    etag_models = (Task, Employee, Comment)
+    pagination_class = KeysetPagination
+    keyset_ordering = ("created_at", "id")
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
         filters.OrderingFilter,
     ]
 
@@ -99,21 +170,94 @@ class TaskViewSet(viewsets.ModelViewSet):
         "actual_time",
     ]
 
+    bulk_max_items = 1000
+    activity_max_limit = 100
+
+    @extend_schema(request=TaskSerializer(many=True))
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Create (rows without ``id``) and update (rows with ``id``) many tasks
+        in one transaction. Nothing is written unless every row is valid.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError("Expected a list of tasks.")
+        if len(request.data) > self.bulk_max_items:
+            raise ValidationError(f"At most {self.bulk_max_items} tasks per request.")
+
+        writer = BulkTaskWriter(request.data, request)
+        if not writer.validate():
+            return Response(writer.results, status=status.HTTP_400_BAD_REQUEST)
+        return Response(writer.save(), status=status.HTTP_200_OK)
+
+    @extend_schema(responses={(200, "text/csv"): bytes, (200, "application/x-ndjson"): bytes})
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream all matching tasks (accepts the list filters, e.g. ``?project=``);
+        ``?file_format=csv`` (default) or ``ndjson``.
+        """
+        return _export(self, request, Task.objects.all(), export_tasks, TASK_COLUMNS, "tasks")
+
+    @extend_schema(responses=TaskActivitySerializer(many=True))
+    @action(detail=True, methods=["get"])
+    def activity(self, request, pk=None):
+        """
+        History records and comments of the task merged newest first;
+        follow ``next`` (a ``?cursor=``) for older entries.
+        """
+        task = get_object_or_404(Task.objects.only("pk"), pk=pk)
+        self.check_object_permissions(request, task)
+
+        limit = request.query_params.get("limit", str(api_settings.PAGE_SIZE))
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValidationError({"limit": "Expected a positive integer."})
+        limit = min(int(limit), self.activity_max_limit)
+
+        position = activity.decode_cursor(request.query_params.get("cursor"))
+        entries, next_key = activity.task_activity(task.pk, position, limit)
+
+        next_link = None
+        if next_key is not None:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), "cursor", activity.encode_cursor(next_key)
+            )
+        serializer = TaskActivitySerializer(
+            entries, many=True, context=self.get_serializer_context()
+        )
+        return Response({"next": next_link, "results": serializer.data})
+
 
 @extend_schema(tags=["Task History"])
-class TaskHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class TaskHistoryViewSet(HistoryDiffMixin, EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Task.history.all()
     serializer_class = TaskHistorySerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-history_date", "-history_id")
 
     def get_queryset(self):
-        return Task.history.filter(id=self.kwargs["task_pk"]).order_by("-history_date")
+        return super().get_queryset().filter(id=self.kwargs["task_pk"]).order_by(
+            "-history_date"
+        )
 
 
 @extend_schema(tags=["Task Comment"])
-class TaskCommentViewSet(viewsets.ModelViewSet):
+class TaskCommentViewSet(ConditionalGetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    etag_models = (Comment,)
+
+    filter_backends = [
+        DjangoFilterBackend,
+        FullTextSearchFilter,
+    ]
+
+    search_fields = [
+        "comment",
+    ]
 
     def get_queryset(self):
-        return Comment.objects.filter(task_id=self.kwargs["task_pk"])
+        return super().get_queryset().filter(task_id=self.kwargs["task_pk"])
 
     def perform_create(self, serializer):
         if not hasattr(self.request.user, "employee"):
@@ -1,8 +1,10 @@
 from django.contrib.auth.models import User, Group
 from rest_framework import serializers
 
+from Pulse.serializers import DynamicFieldsMixin
 
-class UserSerializer(serializers.HyperlinkedModelSerializer):
+
+class UserSerializer(DynamicFieldsMixin, serializers.HyperlinkedModelSerializer):
     password = serializers.CharField(
         write_only=True,
         required=False,
@@ -58,7 +60,7 @@ class UserSerializer(serializers.HyperlinkedModelSerializer):
         return instance
 
 
-class GroupSerializer(serializers.HyperlinkedModelSerializer):
+class GroupSerializer(DynamicFieldsMixin, serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Group
         fields = ['url', 'name']
@@ -3,11 +3,13 @@ from rest_framework import filters
 from rest_framework import viewsets
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
+
+from Pulse.eager_loading import EagerLoadingMixin
 from .serializers import UserSerializer, GroupSerializer
 
 
 @extend_schema(tags=['Users'])
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -17,6 +19,6 @@ class UserViewSet(viewsets.ModelViewSet):
 
 
 @extend_schema(tags=['Groups'])
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer